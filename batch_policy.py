@@ -0,0 +1,66 @@
+"""
+Failure handling for unattended batch runs.
+Decides whether a failed job is retried, skipped or stops the batch, and how
+long a job may run before it is considered hung.
+"""
+import json
+import shutil
+import subprocess
+
+# Failure policies (values shown in the GUI)
+SKIP = "Skip"
+RETRY = "Retry"
+STOP = "Stop"
+POLICIES = [SKIP, RETRY, STOP]
+
+DEFAULT_MAX_RETRIES = 2
+
+# Exponential backoff between retries: 5s, 10s, 20s, ... capped at 5 minutes
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 300.0
+
+# Wall-clock budget per job: fixed allowance for model load/download plus a
+# multiple of the media length (transcription is normally much faster than real time)
+TIMEOUT_BASE = 600.0
+TIMEOUT_REALTIME_FACTOR = 2.0
+
+
+def backoff_delay(attempt):
+    """Seconds to wait before retry number `attempt` (1-based)."""
+    return min(BACKOFF_BASE * (2 ** (attempt - 1)), BACKOFF_MAX)
+
+
+def should_retry(policy, attempts, max_retries=DEFAULT_MAX_RETRIES):
+    """`attempts` is the number of failed runs of the job, including the one just failed."""
+    return policy == RETRY and attempts <= max_retries
+
+
+def job_timeout(media_duration):
+    """Wall-clock timeout in seconds for a file of the given length, or None if unknown."""
+    if not media_duration:
+        return None
+    return TIMEOUT_BASE + media_duration * TIMEOUT_REALTIME_FACTOR
+
+
+def probe_media_duration(path, timeout=15):
+    """Media length in seconds via ffprobe. Returns None if it cannot be determined."""
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    try:
+        out = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "json", path],
+            capture_output=True, text=True, timeout=timeout
+        )
+        return float(json.loads(out.stdout)["format"]["duration"])
+    except Exception:
+        return None
+
+
+def format_failure_report(failures):
+    """Human readable summary of (path, error) pairs."""
+    lines = [f"{len(failures)} file(s) failed:"]
+    for path, error in failures:
+        first_line = error.strip().splitlines()[0] if error.strip() else "Unknown error"
+        lines.append(f" - {path}: {first_line}")
+    return "\n".join(lines)
@@ -0,0 +1,333 @@
+"""
+Micro-benchmarks for the MLX changes bundled in macos15_mlx.
+Models are built at Whisper large-v3 size with lazily initialised weights,
+so nothing is downloaded and little memory is used unless a benchmark
+evaluates arrays. Run with the bundled package first on the path to measure
+it rather than the installed mlx:
+
+    PYTHONPATH=macos15_mlx python benchmark_mlx.py validate
+    PYTHONPATH=macos15_mlx python benchmark_mlx.py tree
+    PYTHONPATH=macos15_mlx python benchmark_mlx.py quantize
+    PYTHONPATH=macos15_mlx python benchmark_mlx.py kv-cache
+    PYTHONPATH=macos15_mlx python benchmark_mlx.py pos-encoding
+    PYTHONPATH=macos15_mlx python benchmark_mlx.py compile --model mlx-community/whisper-large-v3
+    PYTHONPATH=macos15_mlx python benchmark_mlx.py precision --model mlx-community/whisper-large-v3 --audio sample.wav
+
+Running the same benchmark without PYTHONPATH measures the installed mlx
+for comparison.
+"""
+import time
+import argparse
+import statistics
+
+# Whisper large-v3
+LARGE_V3_DIMS = {
+    "n_mels": 128, "n_audio_ctx": 1500, "n_audio_state": 1280, "n_audio_head": 20, "n_audio_layer": 32,
+    "n_vocab": 51866, "n_text_ctx": 448, "n_text_state": 1280, "n_text_head": 20, "n_text_layer": 32,
+}
+
+
+def timeit(func, repeat):
+    """Median wall time of `func()` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def build_whisper(dims=LARGE_V3_DIMS):
+    import mlx.core as mx
+    from mlx_whisper.whisper import Whisper, ModelDimensions
+    return Whisper(ModelDimensions(**dims), mx.float16)
+
+
+def print_rows(title, rows):
+    print(title)
+    for label, ms in rows:
+        print(f"  {label:<36} {ms:10.3f} ms")
+
+
+def bench_validate(args):
+    """Strict weight validation: re-flattening the parameters vs the cached parameter index."""
+    import mlx.core as mx
+    import mlx.nn as nn
+    from mlx.utils import tree_flatten
+
+    model = build_whisper()
+    shapes = {name: shape for name, (shape, _) in model.parameter_index().items()}
+    weights = [(name, mx.zeros(shape, dtype)) for name, (shape, dtype) in model.parameter_index().items()]
+
+    def flatten_check():
+        current = tree_flatten(model.parameters(), destination={})
+        assert current.keys() == shapes.keys()
+        for name, value in current.items():
+            assert value.shape == shapes[name]
+
+    def cold_index_check():
+        nn.Module._structure_version += 1
+        model._check_weight_shapes(shapes)
+
+    print_rows(f"Strict validation, {len(shapes)} parameters:", [
+        ("tree_flatten(parameters())", timeit(flatten_check, args.repeat)),
+        ("parameter index (rebuilt)", timeit(cold_index_check, args.repeat)),
+        ("parameter index (cached)", timeit(lambda: model._check_weight_shapes(shapes), args.repeat)),
+        ("load_weights(list, strict=True)", timeit(lambda: model.load_weights(weights), args.repeat)),
+    ])
+
+
+def build_chain(depth):
+    """A module tree `depth` levels deep, one small Linear per level."""
+    import mlx.nn as nn
+    root = node = nn.Module()
+    for _ in range(depth):
+        node.child = nn.Linear(8, 8)
+        node = node.child
+    return root
+
+
+def build_wide(width):
+    """A module with `width` small Linear layers in one list."""
+    import mlx.nn as nn
+    root = nn.Module()
+    root.layers = [nn.Linear(8, 8) for _ in range(width)]
+    return root
+
+
+def bench_tree(args):
+    """tree_flatten / tree_unflatten / tree_map on wide, deep and Whisper-sized parameter trees."""
+    from mlx.utils import tree_flatten, tree_unflatten, tree_map, tree_map_with_path
+
+    trees = [
+        ("whisper large-v3", build_whisper()),
+        ("wide (5000 layers)", build_wide(5000)),
+        ("deep (200 levels)", build_chain(200)),
+    ]
+    for label, model in trees:
+        params = model.parameters()
+        flat = tree_flatten(params)
+        print_rows(f"{label}, {len(flat)} parameters:", [
+            ("parameters()", timeit(model.parameters, args.repeat)),
+            ("tree_flatten", timeit(lambda: tree_flatten(params), args.repeat)),
+            ("tree_flatten(destination={})", timeit(lambda: tree_flatten(params, destination={}), args.repeat)),
+            ("tree_unflatten", timeit(lambda: tree_unflatten(flat), args.repeat)),
+            ("tree_map", timeit(lambda: tree_map(lambda x: x, params), args.repeat)),
+            ("tree_map_with_path", timeit(lambda: tree_map_with_path(lambda path, x: x, params), args.repeat)),
+            ("update(parameters())", timeit(lambda: model.update(params), args.repeat)),
+        ])
+
+
+def bench_quantize(args):
+    """Leaf module replacement and nn.quantize on Whisper large-v3, alone and for a batch of models."""
+    import mlx.nn as nn
+    from mlx.utils import tree_map_with_path
+
+    def tree_replace(model):
+        # What nn.quantize did before Module.replace_leaf_modules
+        leaves = model.leaf_modules()
+        leaves = tree_map_with_path(lambda path, m: m, leaves, is_leaf=nn.Module.is_module)
+        model.update_modules(leaves)
+
+    model = build_whisper()
+    print_rows("Leaf module replacement (every module kept), whisper large-v3:", [
+        ("leaf_modules + update_modules", timeit(lambda: tree_replace(model), args.repeat)),
+        ("replace_leaf_modules", timeit(lambda: model.replace_leaf_modules(lambda path, m: m), args.repeat)),
+    ])
+
+    # nn.quantize replaces layers in place, so every run needs fresh models
+    # (weights stay lazy: this times the module walk and graph building)
+    rows = []
+    for count in [1, 2, 4]:
+        times = []
+        for _ in range(min(args.repeat, 5)):
+            models = [build_whisper() for _ in range(count)]
+            start = time.perf_counter()
+            for model in models:
+                nn.quantize(model, group_size=64, bits=4)
+            times.append((time.perf_counter() - start) * 1000)
+        rows.append((f"nn.quantize, {count} model{'s' if count > 1 else ''}", statistics.median(times)))
+    print_rows("Quantizing whisper large-v3 (4-bit):", rows)
+
+
+# Whisper large-v3 decoder attention, 4 of its 32 layers
+DECODER_LAYERS = 4
+DECODE_LENGTHS = [16, 64, 128, 256, 448]
+
+
+def build_decoder():
+    import mlx.core as mx
+    import mlx.nn as nn
+    dims, heads = LARGE_V3_DIMS["n_text_state"], LARGE_V3_DIMS["n_text_head"]
+    decoder = nn.TransformerDecoder(DECODER_LAYERS, dims, heads)
+    decoder.set_dtype(mx.float16)
+    mx.eval(decoder.parameters())
+    memory = mx.random.normal((1, LARGE_V3_DIMS["n_audio_ctx"], dims)).astype(mx.float16)
+    return decoder, memory
+
+
+def bench_kv_cache(args):
+    """
+    Cost of decoding one more token at a given length: recomputing the prefix,
+    with a self-attention KV cache, and also with the cross-attention memory
+    projected once per window.
+    """
+    import mlx.core as mx
+    import mlx.nn as nn
+
+    decoder, memory = build_decoder()
+    dims = LARGE_V3_DIMS["n_text_state"]
+
+    def cached_step(x, memory, length, use_memory_cache):
+        # Fill the caches with the first length - 1 positions, then time the last one.
+        # Rewinding the offset reuses the same preallocated slot on every run.
+        mask = nn.MultiHeadAttention.create_additive_causal_mask(length - 1, mx.float16)
+        cache = decoder.make_cache()
+        memory_cache = decoder.make_memory_cache() if use_memory_cache else None
+        mx.eval(decoder(x[:, :-1], memory, mask, None, cache=cache, memory_cache=memory_cache))
+
+        def step():
+            for c in cache:
+                c.offset = length - 1
+            mx.eval(decoder(x[:, -1:], memory, None, None, cache=cache, memory_cache=memory_cache))
+        return timeit(step, args.repeat)
+
+    print(f"Per-token decode cost, {DECODER_LAYERS} decoder layers at large-v3 width (ms):")
+    print(f"  {'length':<10} {'recompute':>12} {'KV cache':>12} {'+ memory':>12}")
+    for length in DECODE_LENGTHS:
+        x = mx.random.normal((1, length, dims)).astype(mx.float16)
+        mask = nn.MultiHeadAttention.create_additive_causal_mask(length, mx.float16)
+        full = timeit(lambda: mx.eval(decoder(x, memory, mask, None)), args.repeat)
+        cached = cached_step(x, memory, length, False)
+        with_memory = cached_step(x, memory, length, True)
+        print(f"  {length:<10} {full:12.3f} {cached:12.3f} {with_memory:12.3f}  (x{full / with_memory:.1f})")
+
+    # Several windows decoded together, 5 beams each sharing their window's memory
+    windows, beams, length = 4, 5, 128
+    batch_memory = mx.random.normal((windows,) + memory.shape[1:]).astype(mx.float16)
+    x = mx.random.normal((windows * beams, length, dims)).astype(mx.float16)
+    print(f"  {windows} windows x {beams} beams, token {length}: "
+          f"{cached_step(x, batch_memory, length, True):.3f} ms per step")
+
+
+def bench_pos_encoding(args):
+    """Sinusoidal positional encodings computed per call vs looked up in the shared table."""
+    import mlx.core as mx
+    import mlx.nn as nn
+
+    dims = LARGE_V3_DIMS["n_audio_state"]
+    computed = nn.SinusoidalPositionalEncoding(dims)
+    tabled = nn.SinusoidalPositionalEncoding(dims, max_position=LARGE_V3_DIMS["n_audio_ctx"])
+    rows = []
+    for length in (1, LARGE_V3_DIMS["n_text_ctx"], LARGE_V3_DIMS["n_audio_ctx"]):
+        positions = mx.arange(length)
+        mx.eval(tabled(positions))  # Build the table outside the timing
+        rows += [
+            (f"{length} positions: sin/cos", timeit(lambda: mx.eval(computed(positions)), args.repeat)),
+            (f"{length} positions: table gather", timeit(lambda: mx.eval(tabled(positions)), args.repeat)),
+            (f"{length} positions: table slice", timeit(lambda: mx.eval(tabled.encode(0, length)), args.repeat)),
+        ]
+    print_rows(f"Positional encoding, {dims} dims:", rows)
+
+
+def bench_compile(args):
+    """Transcription with the eager model against the compiled, shape-bucketed graphs (first run includes tracing)."""
+    import mlx_whisper
+    from mlx_whisper.transcribe import ModelHolder
+    import compiled_model
+    import model_loader
+    import model_resolver
+    import quantize_model
+
+    model_path = model_resolver.find_local_model(args.model)
+    if model_path is None:
+        print(f"{args.model} is not downloaded; transcribe with it once first")
+        return
+    audio = quantize_model.load_benchmark_audio(args.audio)
+    model = model_loader.load_model(model_path)
+    compiled = compiled_model.CompiledWhisper(model)
+    # transcribe is slow; a few runs are enough for the median
+    repeat = min(args.repeat, 3)
+
+    def run(installed):
+        # The worker installs its model in ModelHolder the same way (model_cache.ModelCache)
+        ModelHolder.model, ModelHolder.model_path = installed, model_path
+        mlx_whisper.transcribe(audio, path_or_hf_repo=model_path, verbose=None)
+
+    try:
+        eager = timeit(lambda: run(model), repeat)
+        start = time.perf_counter()
+        run(compiled)
+        first = (time.perf_counter() - start) * 1000
+        steady = timeit(lambda: run(compiled), repeat)
+    finally:
+        ModelHolder.model = ModelHolder.model_path = None
+
+    print(f"mlx_whisper.transcribe with {args.model} on {args.audio or 'silence'} (ms):")
+    print(f"  {'eager':>10} {'first':>10} {'compiled':>10} {'speedup':>8}")
+    print(f"  {eager:10.1f} {first:10.1f} {steady:10.1f} {eager / steady:7.2f}x")
+    print("Compiled graph calls:\n" + compiled.report())
+
+
+def bench_precision(args):
+    """Resident memory and speed of a cached model loaded in each weight precision, against the default."""
+    import model_loader
+    import model_resolver
+    import quantize_model
+
+    model_path = model_resolver.find_local_model(args.model)
+    if model_path is None:
+        print(f"{args.model} is not downloaded; transcribe with it once first")
+        return
+    audio = quantize_model.load_benchmark_audio(args.audio)
+    results = {}
+    for precision in model_loader.PRECISIONS:
+        results[precision] = quantize_model.benchmark(model_path, audio, precision)
+
+    baseline = results[model_loader.DEFAULT_PRECISION]
+    print(f"{args.model} on {args.audio or 'silence'} (ratios against {model_loader.DEFAULT_PRECISION} precision):")
+    rows = [
+        ("Resident memory", "resident_memory", lambda v: f"{v / 1024 ** 2:,.0f} MB"),
+        ("Peak memory", "peak_memory", lambda v: f"{v / 1024 ** 2:,.0f} MB"),
+        ("Load time", "load", lambda v: f"{v:.2f}s"),
+        ("Inference", "inference", lambda v: f"{v:.2f}s"),
+        ("Real-time factor", "rtf", lambda v: f"{v:.4f}"),
+    ]
+    print(f"  {'':<18}" + "".join(f"{precision:>24}" for precision in results))
+    for label, key, fmt in rows:
+        cells = []
+        for result in results.values():
+            ratio = result[key] / baseline[key] if baseline[key] else 0
+            cells.append(f"{fmt(result[key])} (x{ratio:.2f})")
+        print(f"  {label:<18}" + "".join(f"{cell:>24}" for cell in cells))
+
+
+BENCHMARKS = {
+    "validate": bench_validate,
+    "tree": bench_tree,
+    "quantize": bench_quantize,
+    "kv-cache": bench_kv_cache,
+    "pos-encoding": bench_pos_encoding,
+    "compile": bench_compile,
+    "precision": bench_precision,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the bundled MLX changes.")
+    parser.add_argument("benchmark", nargs="*", help=f"Benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all).")
+    parser.add_argument("-n", "--repeat", type=int, default=20, help="Timed runs per measurement (median is reported).")
+    parser.add_argument("--model", default="mlx-community/whisper-large-v3", help="Cached repo id or local model folder for model benchmarks.")
+    parser.add_argument("--audio", help="Audio file for model benchmarks (default: silence).")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmark if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    for name in args.benchmark or sorted(BENCHMARKS):
+        BENCHMARKS[name](args)
+        print()
+
+
+if __name__ == "__main__":
+    main()
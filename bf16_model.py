@@ -0,0 +1,37 @@
+"""
+bfloat16 Whisper models behind the float16 interface mlx_whisper expects.
+mlx_whisper casts the mel spectrogram to float16 and requires float16 audio
+features back from the encoder (DecodingTask._get_audio_features). With
+bfloat16 weights a float16 input is promoted to float32 instead, so the
+encoder and decoder here cast their inputs to bfloat16 and their outputs
+(audio features, logits, cross-attention weights) back to float16. Everything
+in between, including the decoder's KV cache, stays in bfloat16.
+"""
+import mlx.core as mx
+from mlx_whisper import whisper
+
+
+class AudioEncoder(whisper.AudioEncoder):
+    def __call__(self, x):
+        return super().__call__(x.astype(mx.bfloat16)).astype(mx.float16)
+
+
+class TextDecoder(whisper.TextDecoder):
+    def __call__(self, x, xa, kv_cache=None):
+        logits, kv_cache, cross_qk = super().__call__(x, xa.astype(mx.bfloat16), kv_cache)
+        cross_qk = [qk.astype(mx.float16) if qk is not None else None for qk in cross_qk]
+        return logits.astype(mx.float16), kv_cache, cross_qk
+
+
+class Whisper(whisper.Whisper):
+    """Whisper built for bfloat16 weights (load them with Module.load_weights as usual)."""
+
+    def __init__(self, dims):
+        super().__init__(dims, mx.bfloat16)
+        # Same layers and parameter names as the stock model, with casting at the boundaries
+        self.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer, mx.bfloat16
+        )
+        self.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer, mx.bfloat16
+        )
@@ -0,0 +1,116 @@
+"""
+Incremental scanner for the Hugging Face model cache.
+A lighter replacement for huggingface_hub.scan_cache_dir for the Model Cache
+Manager. Repos are reported one at a time as they are found, so the dialog
+can show them while the scan runs on a background thread. Each repo's
+summary is memoized against the modification times of its folders, so a
+rescan only walks repos that changed since the last one.
+"""
+import os
+import shutil
+import threading
+
+from downloader import default_cache_dir
+
+
+class CachedRepo:
+    """Summary of one cached model repo."""
+
+    def __init__(self, repo_id, path, size_on_disk, revisions, nb_files):
+        self.repo_id = repo_id
+        self.path = path
+        self.size_on_disk = size_on_disk
+        self.revisions = revisions  # Snapshot commit hashes
+        self.nb_files = nb_files
+
+
+# repo path -> (mtime key, CachedRepo)
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def mtime_key(repo_path):
+    """
+    Modification times of the folders a download or delete changes. Adding or
+    removing a blob, snapshot or ref updates the mtime of its parent folder.
+    """
+    key = []
+    for name in ("", "blobs", "snapshots", "refs"):
+        try:
+            key.append(os.stat(os.path.join(repo_path, name)).st_mtime_ns)
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+def _summarize(repo_id, repo_path):
+    size = 0
+    nb_files = 0
+    try:
+        with os.scandir(os.path.join(repo_path, "blobs")) as entries:
+            for entry in entries:
+                # Skip partial downloads (<etag>.part, <etag>.incomplete, ...)
+                if "." in entry.name or not entry.is_file(follow_symlinks=False):
+                    continue
+                size += entry.stat(follow_symlinks=False).st_size
+                nb_files += 1
+    except OSError:
+        pass
+    try:
+        revisions = sorted(os.listdir(os.path.join(repo_path, "snapshots")))
+    except OSError:
+        revisions = []
+    return CachedRepo(repo_id, repo_path, size, revisions, nb_files)
+
+
+def scan_repo(repo_id, repo_path):
+    """Summary of one repo folder, reused from the last scan if its folders have not changed."""
+    key = mtime_key(repo_path)
+    with _memo_lock:
+        memoized = _memo.get(repo_path)
+    if memoized and memoized[0] == key:
+        return memoized[1]
+    repo = _summarize(repo_id, repo_path)
+    with _memo_lock:
+        _memo[repo_path] = (key, repo)
+    return repo
+
+
+def scan_cache(on_repo=None, cache_dir=None, should_stop=None):
+    """
+    Scan the model repos in the HF cache, calling on_repo(CachedRepo) for each
+    as soon as it is known. Returns the list of repos. `should_stop()` is
+    checked between repos so a superseded scan can end early.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    repos = []
+    try:
+        entries = sorted(entry.name for entry in os.scandir(cache_dir) if entry.name.startswith("models--"))
+    except FileNotFoundError:
+        return repos
+
+    for name in entries:
+        if should_stop and should_stop():
+            break
+        repo_id = name[len("models--"):].replace("--", "/")
+        repo = scan_repo(repo_id, os.path.join(cache_dir, name))
+        repos.append(repo)
+        if on_repo:
+            on_repo(repo)
+
+    # Drop memo entries for repos that no longer exist
+    with _memo_lock:
+        for path in [path for path in _memo if os.path.dirname(path) == cache_dir and not os.path.isdir(path)]:
+            del _memo[path]
+    return repos
+
+
+def delete_repos(repos):
+    """Remove whole repo folders from the cache. Returns the bytes freed."""
+    freed = 0
+    for repo in repos:
+        shutil.rmtree(repo.path)
+        freed += repo.size_on_disk
+        with _memo_lock:
+            _memo.pop(repo.path, None)
+    return freed
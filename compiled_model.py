@@ -0,0 +1,166 @@
+"""
+Compiled, shape-bucketed inference for loaded Whisper models.
+mx.compile traces a function once per input shape. The wrapper pads inputs
+into a small set of shape buckets so a transcription only ever triggers a
+handful of traces:
+
+- encoder: the batch of 30 s windows is padded to BATCH_BUCKETS (mlx_whisper
+  already pads every window, including the last, to 3000 frames);
+- decoder prompt pass (first call per window, no KV cache yet): the token
+  count is padded to TOKEN_BUCKETS. The decoder is causal, so padding after
+  the real tokens leaves their logits unchanged; the padded positions are
+  trimmed from the logits, the self-attention cache and the cross-attention
+  weights.
+
+Per-token decoder steps run eagerly: mlx_whisper grows the KV cache by
+concatenation, so every step has a new shape and would re-trace.
+
+A CompiledWhisper is kept next to its model in the worker's model cache, so
+traces are reused for every file transcribed with that model. If a compiled
+call fails, the wrapper logs it and falls back to the eager model for good.
+"""
+import time
+
+BATCH_BUCKETS = [1, 2, 4, 8, 16]
+TOKEN_BUCKETS = [4, 8, 16, 32, 64, 128, 224, 448]
+
+
+def bucket(size, buckets):
+    """Smallest bucket that fits `size`, or None if it is larger than all of them."""
+    for candidate in buckets:
+        if size <= candidate:
+            return candidate
+    return None
+
+
+class CompiledWhisper:
+    """
+    Stands in for an mlx_whisper Whisper model (all other attributes are the
+    model's) with compiled `encoder` and `decoder` callables.
+    """
+
+    def __init__(self, model):
+        import mlx.core as mx
+
+        self.model = model
+        self.encoder = _CompiledEncoder(self, mx.compile(model.encoder))
+        self.decoder = _CompiledDecoder(self, mx.compile(lambda tokens, xa: model.decoder(tokens, xa)))
+        self.failed = False
+        # (kind, bucket shape) -> {"first": s, "calls": n, "steady": s}
+        self.stats = {}
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    # mlx_whisper's Whisper methods that call self.encoder / self.decoder;
+    # defined here so they run against the compiled callables, not the model's
+    def decode(self, mel, options=None, **kwargs):
+        from mlx_whisper.decoding import decode, DecodingOptions
+        return decode(self, mel, options or DecodingOptions(), **kwargs)
+
+    def detect_language(self, mel, tokenizer=None):
+        from mlx_whisper.decoding import detect_language
+        return detect_language(self, mel, tokenizer)
+
+    def embed_audio(self, mel):
+        return self.encoder(mel)
+
+    def logits(self, tokens, audio_features):
+        return self.decoder(tokens, audio_features)[0]
+
+    def forward_with_cross_qk(self, mel, tokens):
+        logits, _, cross_qk = self.decoder(tokens, self.encoder(mel))
+        return logits, cross_qk
+
+    def __call__(self, mel, tokens):
+        return self.decoder(tokens, self.encoder(mel))[0]
+
+    def _run(self, kind, shape, func, *args):
+        """Call a compiled function, timing first (tracing) and later calls per bucket shape."""
+        import mlx.core as mx
+
+        start = time.perf_counter()
+        result = func(*args)
+        mx.eval(result)
+        elapsed = time.perf_counter() - start
+        entry = self.stats.get((kind, shape))
+        if entry is None:
+            self.stats[(kind, shape)] = {"first": elapsed, "calls": 1, "steady": 0.0}
+        else:
+            entry["calls"] += 1
+            entry["steady"] += elapsed
+        return result
+
+    def _fail(self, kind, error):
+        self.failed = True
+        print(f"Compiled {kind} failed ({error}); using the uncompiled model from now on")
+
+    def report(self):
+        """Trace (first call) time against the average later call, per bucket."""
+        lines = []
+        for (kind, shape), entry in sorted(self.stats.items()):
+            line = f"  {kind} {shape}: first call {entry['first'] * 1000:.1f} ms"
+            if entry["calls"] > 1:
+                steady = entry["steady"] / (entry["calls"] - 1)
+                line += f", then {steady * 1000:.1f} ms avg over {entry['calls'] - 1} calls"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class _CompiledEncoder:
+    def __init__(self, owner, compiled):
+        self.owner = owner
+        self.compiled = compiled
+
+    def __getattr__(self, name):
+        return getattr(self.owner.model.encoder, name)
+
+    def __call__(self, mel):
+        import mlx.core as mx
+
+        owner = self.owner
+        size = mel.shape[0]
+        padded = bucket(size, BATCH_BUCKETS)
+        if owner.failed or padded is None:
+            return owner.model.encoder(mel)
+        try:
+            if padded != size:
+                mel = mx.concatenate([mel, mx.zeros((padded - size,) + mel.shape[1:], mel.dtype)])
+            return owner._run("encoder", tuple(mel.shape), self.compiled, mel)[:size]
+        except Exception as e:
+            owner._fail("encoder", e)
+            return owner.model.encoder(mel[:size])
+
+
+class _CompiledDecoder:
+    def __init__(self, owner, compiled):
+        self.owner = owner
+        self.compiled = compiled
+
+    def __getattr__(self, name):
+        return getattr(self.owner.model.decoder, name)
+
+    def __call__(self, tokens, xa, kv_cache=None):
+        import mlx.core as mx
+
+        owner = self.owner
+        length = tokens.shape[-1]
+        padded = bucket(length, [size for size in TOKEN_BUCKETS if size <= owner.model.dims.n_text_ctx])
+        # Only the prompt pass has a bucketable shape (see module docstring)
+        if owner.failed or kv_cache is not None or padded is None:
+            return owner.model.decoder(tokens, xa, kv_cache=kv_cache)
+        try:
+            if padded != length:
+                # Repeat the last token; causal attention keeps it out of the real positions
+                tokens = mx.concatenate([tokens, mx.repeat(tokens[:, -1:], padded - length, axis=1)], axis=1)
+            logits, kv_cache, cross_qk = owner._run(
+                "decoder prompt", (tokens.shape[0], padded, xa.shape[0]), self.compiled, tokens, xa
+            )
+            if padded == length:
+                return logits, kv_cache, cross_qk
+            kv_cache = [((k[:, :length], v[:, :length]), cross_kv) for (k, v), cross_kv in kv_cache]
+            cross_qk = [qk[..., :length, :] if qk is not None else None for qk in cross_qk]
+            return logits[:, :length], kv_cache, cross_qk
+        except Exception as e:
+            owner._fail("decoder", e)
+            return owner.model.decoder(tokens[:, :length], xa, kv_cache=None)
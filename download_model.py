@@ -2,7 +2,7 @@ import os
 import shutil
 from pathlib import Path
 import truststore
-import huggingface_hub
+import downloader
 
 # Inject truststore to handle corporate SSL
 truststore.inject_into_ssl()
@@ -16,11 +16,17 @@ def clear_cache(repo_id):
     else:
         print(f"No cache found at: {repo_dir}")
 
+def print_progress(event):
+    if event["event"] == "progress":
+        print(f"\r{event['downloaded'] / 1024 ** 2:,.1f} / {event['total'] / 1024 ** 2:,.1f} MB", end="", flush=True)
+    elif event["event"] == "file_done":
+        print(f"\rVerified {event['file']}" + " " * 20)
+
 def download_model(repo_id):
     print(f"Downloading {repo_id}...")
     try:
-        # snapshot_download will download all files in the repo
-        path = huggingface_hub.snapshot_download(repo_id=repo_id)
+        # Parallel, resumable download of all files in the repo, verified against the Hub's hashes
+        path = downloader.download_snapshot(repo_id, progress=print_progress)
         print(f"Successfully downloaded to: {path}")
     except Exception as e:
         print(f"Download failed: {e}")
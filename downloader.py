@@ -0,0 +1,395 @@
+"""
+Model downloader.
+Fetches every file of a Hugging Face model repo into the standard HF cache
+layout (blobs/, snapshots/<commit>/, refs/), so mlx_whisper and
+huggingface_hub find the model there afterwards.
+
+Large files are split into byte ranges that are fetched in parallel. Finished
+ranges are recorded next to the partial file, so an interrupted download
+resumes where it stopped. Each file is checked against the size and hash the
+Hub publishes before it is moved into the cache. Progress is reported to a
+callback as byte counts.
+
+The Hub address can be overridden (--endpoint or HF_ENDPOINT), so a local
+HTTP server can stand in for huggingface.co:
+
+    python downloader.py mlx-community/whisper-large-v3-turbo
+    python downloader.py --endpoint http://127.0.0.1:8000 mlx-community/whisper-tiny
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_ENDPOINT = "https://huggingface.co"
+
+# Files larger than this are fetched as several parallel ranges
+CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_WORKERS = 8
+READ_SIZE = 1024 * 1024
+TIMEOUT = 30
+MAX_REDIRECTS = 5
+# Attempts per chunk before the download is given up (resumable later)
+CHUNK_ATTEMPTS = 3
+
+# Minimum interval between progress callbacks (the last one is always sent)
+PROGRESS_INTERVAL = 0.2
+
+
+class DownloadError(Exception):
+    pass
+
+
+def default_cache_dir():
+    """The Hugging Face hub cache directory, honouring HF_HUB_CACHE / HF_HOME."""
+    try:
+        from huggingface_hub.constants import HF_HUB_CACHE
+        return HF_HUB_CACHE
+    except ImportError:
+        if os.environ.get("HF_HUB_CACHE"):
+            return os.environ["HF_HUB_CACHE"]
+        hf_home = os.environ.get("HF_HOME", os.path.join(os.path.expanduser("~/.cache"), "huggingface"))
+        return os.path.join(hf_home, "hub")
+
+
+def repo_cache_dir(repo_id, cache_dir=None):
+    return os.path.join(cache_dir or default_cache_dir(), "models--" + repo_id.replace("/", "--"))
+
+
+def _auth_headers():
+    token = os.environ.get("HF_TOKEN")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _open(url, headers=None, method="GET", auth=True):
+    """
+    Open `url`, following redirects by hand so the Authorization header is only
+    sent to the Hub itself and not to the storage host it redirects to.
+    `auth=False` is for URLs already resolved to another host.
+    Returns the response; its .url is the final address.
+    """
+    headers = dict(headers or {})
+    host = urllib.parse.urlsplit(url).netloc if auth else None
+    for _ in range(MAX_REDIRECTS + 1):
+        request_headers = dict(headers)
+        if urllib.parse.urlsplit(url).netloc == host:
+            request_headers.update(_auth_headers())
+        request = urllib.request.Request(url, headers=request_headers, method=method)
+        try:
+            return _opener.open(request, timeout=TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code in (301, 302, 303, 307, 308) and e.headers.get("Location"):
+                url = urllib.parse.urljoin(url, e.headers["Location"])
+                e.close()
+                continue
+            raise DownloadError(f"HTTP {e.code} for {url}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise DownloadError(f"Could not reach {url}: {getattr(e, 'reason', e)}") from e
+    raise DownloadError(f"Too many redirects for {url}")
+
+
+def fetch_file_list(repo_id, revision="main", endpoint=None):
+    """
+    Ask the Hub for the commit a revision points to and every file in it.
+    Returns (commit, files) where files are dicts with name, size, etag and
+    hash ("sha256" for LFS files, "git-sha1" for the rest).
+    """
+    endpoint = (endpoint or os.environ.get("HF_ENDPOINT") or DEFAULT_ENDPOINT).rstrip("/")
+    url = f"{endpoint}/api/models/{repo_id}/revision/{urllib.parse.quote(revision, safe='')}?blobs=true"
+    with _open(url, {"Accept": "application/json"}) as response:
+        body = response.read()
+    try:
+        info = json.loads(body)
+        commit = info["sha"]
+        siblings = info["siblings"]
+    except (ValueError, KeyError, TypeError):
+        # Typically a proxy or firewall page instead of the API response
+        raise DownloadError(f"Unexpected response from {url} (not a model description)")
+
+    files = []
+    for sibling in siblings:
+        lfs = sibling.get("lfs")
+        if lfs:
+            files.append({"name": sibling["rfilename"], "size": lfs["size"], "etag": lfs["sha256"], "hash": "sha256"})
+        else:
+            files.append({"name": sibling["rfilename"], "size": sibling["size"], "etag": sibling["blobId"], "hash": "git-sha1"})
+    return commit, files
+
+
+def file_url(repo_id, commit, filename, endpoint=None):
+    endpoint = (endpoint or os.environ.get("HF_ENDPOINT") or DEFAULT_ENDPOINT).rstrip("/")
+    return f"{endpoint}/{repo_id}/resolve/{commit}/{urllib.parse.quote(filename)}"
+
+
+def verify_file(path, size, etag, hash_type):
+    """Check a downloaded file against the size and hash published by the Hub."""
+    if os.path.getsize(path) != size:
+        return False
+    if hash_type == "sha256":
+        digest = hashlib.sha256()
+    else:
+        # Git blob id: sha1 over a "blob <size>\0" header and the content
+        digest = hashlib.sha1(f"blob {size}\0".encode("ascii"))
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest() == etag
+
+
+class _Progress:
+    """Thread-safe byte counter that forwards throttled events to a callback."""
+
+    def __init__(self, callback, repo_id, total, done):
+        self.callback = callback
+        self.repo_id = repo_id
+        self.total = total
+        self.downloaded = done
+        self.last_sent = 0.0
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        if self.callback:
+            self.callback(dict(event=event, repo_id=self.repo_id, downloaded=self.downloaded, total=self.total, **fields))
+
+    def add(self, count):
+        with self._lock:
+            self.downloaded += count
+            now = time.monotonic()
+            if now - self.last_sent < PROGRESS_INTERVAL:
+                return
+            self.last_sent = now
+            self.emit("progress")
+
+
+class _PartialFile:
+    """
+    A blob being downloaded: `<etag>.part` holds the data at its final offsets
+    and `<etag>.part.json` lists the chunks that are complete on disk.
+    """
+
+    def __init__(self, blob_path, size):
+        self.path = blob_path + ".part"
+        self.state_path = self.path + ".json"
+        self.size = size
+        self.chunks = [(start, min(start + CHUNK_SIZE, size)) for start in range(0, size, CHUNK_SIZE)] or [(0, 0)]
+        self.done = set()
+        self._lock = threading.Lock()
+
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            if state.get("size") == size and state.get("chunk_size") == CHUNK_SIZE and os.path.getsize(self.path) == size:
+                self.done = set(state["done"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        os.ftruncate(self.fd, size)
+
+    def pending(self):
+        return [i for i in range(len(self.chunks)) if i not in self.done]
+
+    def completed_bytes(self):
+        return sum(self.chunks[i][1] - self.chunks[i][0] for i in self.done)
+
+    def mark_done(self, index):
+        # Data must be on disk before the state file claims it
+        os.fsync(self.fd)
+        with self._lock:
+            self.done.add(index)
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"size": self.size, "chunk_size": CHUNK_SIZE, "done": sorted(self.done)}, f)
+            os.replace(tmp_path, self.state_path)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def discard(self):
+        for path in (self.path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _fetch_chunk(url, partial, index, progress, ranged, auth):
+    for attempt in range(1, CHUNK_ATTEMPTS + 1):
+        try:
+            return _fetch_chunk_once(url, partial, index, progress, ranged, auth)
+        except DownloadError:
+            if attempt == CHUNK_ATTEMPTS:
+                raise
+            time.sleep(attempt)
+
+
+def _fetch_chunk_once(url, partial, index, progress, ranged, auth):
+    start, end = partial.chunks[index]
+    headers = {"Range": f"bytes={start}-{end - 1}"} if ranged else {}
+    offset = start
+    try:
+        with _open(url, headers, auth=auth) as response:
+            if ranged and response.status != 206:
+                raise DownloadError(f"Server ignored the byte range request for {url}")
+            while True:
+                try:
+                    block = response.read(READ_SIZE)
+                except (OSError, http.client.HTTPException) as e:
+                    raise DownloadError(f"Connection lost while downloading {url}: {e}") from e
+                if not block:
+                    break
+                os.pwrite(partial.fd, block, offset)
+                offset += len(block)
+                progress.add(len(block))
+        if offset != end:
+            raise DownloadError(f"Connection closed early while downloading {url}")
+    except BaseException:
+        # An unfinished chunk is fetched again from its start next time
+        progress.add(start - offset)
+        raise
+    partial.mark_done(index)
+
+
+def _probe_ranges(url):
+    """Resolve redirects once and check the server answers byte range requests."""
+    with _open(url, {"Range": "bytes=0-0"}) as response:
+        return response.url, response.status == 206
+
+
+def _link_snapshot(repo_dir, commit, filename, blob_path):
+    pointer = os.path.join(repo_dir, "snapshots", commit, filename)
+    os.makedirs(os.path.dirname(pointer), exist_ok=True)
+    if os.path.lexists(pointer):
+        os.remove(pointer)
+    os.symlink(os.path.relpath(blob_path, os.path.dirname(pointer)), pointer)
+
+
+def download_snapshot(repo_id, revision="main", cache_dir=None, endpoint=None,
+                      max_workers=DEFAULT_WORKERS, progress=None):
+    """
+    Download a model repo into the HF cache and return its snapshot folder.
+
+    Files already in the cache are skipped and partial files are resumed.
+    `progress` is called from worker threads with dicts carrying "event"
+    ("start", "progress", "file_done", "done"), "repo_id", "downloaded" and
+    "total" (bytes), plus "file" for file_done and "path" for done.
+    Raises DownloadError on network, size or hash failures.
+    """
+    commit, files = fetch_file_list(repo_id, revision, endpoint)
+    repo_dir = repo_cache_dir(repo_id, cache_dir)
+    blobs_dir = os.path.join(repo_dir, "blobs")
+    os.makedirs(blobs_dir, exist_ok=True)
+
+    # Work out what is already present before any bytes are fetched
+    todo = []
+    already = 0
+    for entry in files:
+        blob_path = os.path.join(blobs_dir, entry["etag"])
+        if os.path.exists(blob_path) and os.path.getsize(blob_path) == entry["size"]:
+            _link_snapshot(repo_dir, commit, entry["name"], blob_path)
+            already += entry["size"]
+            continue
+        partial = _PartialFile(blob_path, entry["size"])
+        already += partial.completed_bytes()
+        todo.append((entry, blob_path, partial))
+
+    tracker = _Progress(progress, repo_id, sum(entry["size"] for entry in files), already)
+    tracker.emit("start", files=len(files))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        jobs = []
+        for entry, blob_path, partial in todo:
+            url = file_url(repo_id, commit, entry["name"], endpoint)
+            ranged = False
+            auth = True
+            if len(partial.chunks) > 1:
+                resolved, ranged = _probe_ranges(url)
+                # The token stays with the Hub when the file is served from another host
+                auth = urllib.parse.urlsplit(resolved).netloc == urllib.parse.urlsplit(url).netloc
+                url = resolved
+                if not ranged:
+                    # Whole file in one request; nothing from earlier attempts can be reused
+                    tracker.add(-partial.completed_bytes())
+                    partial.chunks = [(0, entry["size"])]
+                    partial.done = set()
+            futures = [executor.submit(_fetch_chunk, url, partial, i, tracker, ranged, auth) for i in partial.pending()]
+            jobs.append((entry, blob_path, partial, futures))
+
+        for entry, blob_path, partial, futures in jobs:
+            for future in futures:
+                future.result()
+            partial.close()
+            if not verify_file(partial.path, entry["size"], entry["etag"], entry["hash"]):
+                partial.discard()
+                raise DownloadError(f"{entry['name']} failed the size/hash check; it will be downloaded again")
+            os.replace(partial.path, blob_path)
+            partial.discard()
+            _link_snapshot(repo_dir, commit, entry["name"], blob_path)
+            tracker.emit("file_done", file=entry["name"])
+    finally:
+        # On failure, queued chunks never start; finished ones are kept for the next attempt
+        executor.shutdown(wait=True, cancel_futures=True)
+        for _, _, partial in todo:
+            partial.close()
+
+    # Point the revision at the commit just downloaded, as huggingface_hub does
+    if revision != commit:
+        refs_path = os.path.join(repo_dir, "refs", revision)
+        os.makedirs(os.path.dirname(refs_path), exist_ok=True)
+        with open(refs_path, "w") as f:
+            f.write(commit)
+
+    snapshot_path = os.path.join(repo_dir, "snapshots", commit)
+    tracker.emit("done", path=snapshot_path)
+    return snapshot_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download a model into the Hugging Face cache.")
+    parser.add_argument("repo_id", help="Model repo, e.g. mlx-community/whisper-large-v3-turbo")
+    parser.add_argument("--revision", default="main")
+    parser.add_argument("--endpoint", default=None, help="Hub address (default: HF_ENDPOINT or huggingface.co).")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS, help="Parallel connections.")
+    args = parser.parse_args()
+
+    import truststore
+    truststore.inject_into_ssl()
+
+    def show(event):
+        if event["event"] in ("progress", "start"):
+            percent = 100 * event["downloaded"] / event["total"] if event["total"] else 100
+            print(f"\r{event['downloaded'] / 1024 ** 2:,.1f} / {event['total'] / 1024 ** 2:,.1f} MB ({percent:.0f}%)", end="", flush=True)
+        elif event["event"] == "file_done":
+            print(f"\r{event['file']}: verified" + " " * 20)
+
+    try:
+        path = download_snapshot(args.repo_id, args.revision, args.cache_dir, args.endpoint, args.workers, show)
+    except DownloadError as e:
+        print(f"\nDownload failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nDownloaded to: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,23 @@ import subprocess
 import multiprocessing
 import queue
 import json
-from huggingface_hub import try_to_load_from_cache, scan_cache_dir
+import time
+from job_store import JobStore, FINISHED_JOB_MAX_AGE
+import batch_policy
+from run_manifest import RunManifest
+import writers
+from transcript_index import TranscriptIndex, format_ms
+from result_viewer import ResultViewer
+import segment_store
+import model_cache
+import compiled_model
+import model_loader
+import model_resolver
+import network_probe
+import cache_scanner
+import local_models
+import quantize_model
+from segment_store import SegmentStore
 
 # Inject system trust store for corporate proxies/SSL inspection
 truststore.inject_into_ssl()
@@ -27,20 +43,18 @@ truststore.inject_into_ssl()
 os.environ["PATH"] += os.pathsep + "/opt/homebrew/bin" + os.pathsep + "/usr/local/bin"
 
 CONFIG_FILE = os.path.expanduser("~/.mlx_whisper_config.json")
+# Settings changes are written this long after the last one (milliseconds)
+CONFIG_SAVE_DELAY = 500
 
 # Configuration
 ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
 
-def transcription_worker(result_queue, audio_path, model_name, language_code, language_name):
+def setup_worker_environment():
     """
-    Worker process for transcription.
-    Runs in a separate process to allow termination (Stop button).
+    Prepare a freshly spawned worker process.
+    Must run BEFORE mlx_whisper is imported in the subprocess.
     """
-    import sys
-    import os
-    import time
-    
     # Set up MLX metallib path BEFORE importing mlx_whisper in subprocess
     if getattr(sys, 'frozen', False):
         if hasattr(sys, '_MEIPASS'):
@@ -66,37 +80,160 @@ def transcription_worker(result_queue, audio_path, model_name, language_code, la
             # Also set DYLD_LIBRARY_PATH to ensure linked libraries are found if needed
             # os.environ["DYLD_LIBRARY_PATH"] = os.path.join(contents_dir, "Frameworks")
     
-    # Re-import necessary modules in the new process
-    import mlx_whisper
-    import truststore
-    
     # Re-inject truststore and path
     truststore.inject_into_ssl()
     # Ensure PATH is correct in the subprocess
     if "/opt/homebrew/bin" not in os.environ["PATH"]:
         os.environ["PATH"] += os.pathsep + "/opt/homebrew/bin" + os.pathsep + "/usr/local/bin"
 
-    class QueueLogger:
-        def __init__(self, queue):
-            self.queue = queue
-        def write(self, msg):
-            # Filter out empty newlines to reduce queue traffic
-            if msg:
-                self.queue.put(("log", msg))
-        def flush(self):
-            pass
+
+class QueueLogger:
+    """File-like object forwarding worker output to the GUI as log messages."""
+    def __init__(self, queue):
+        self.queue = queue
+    def write(self, msg):
+        # Filter out empty newlines to reduce queue traffic
+        if msg:
+            self.queue.put(("log", msg))
+    def flush(self):
+        pass
+
+
+def model_worker(task_queue, result_queue, memory_budget=None, compile_graphs=True):
+    """
+    Long-lived worker process.
+    Keeps recently used models loaded (up to `memory_budget` bytes, with their compiled
+    graphs unless `compile_graphs` is off) and handles tasks in order:
+      ("preload", model_name, precision) - load the model and run a tiny warmup inference
+      ("transcribe", args...)  - transcribe one file (see transcription_worker)
+      ("update", model_name)   - check the Hub for a newer snapshot and download missing files
+      ("quantize", model_name, bits, audio_path) - create and benchmark a quantized variant
+      ("exit",)
+    The GUI kills and respawns the process to stop a running job.
+    """
+    setup_worker_environment()
 
     # Redirect stdout/stderr to the queue
     sys.stdout = QueueLogger(result_queue)
     sys.stderr = QueueLogger(result_queue)
 
+    models = model_cache.ModelCache(memory_budget, compile_graphs)
+    pending = []
+    while True:
+        task = pending.pop(0) if pending else task_queue.get()
+        # Collect anything else already queued so stale preloads can be skipped
+        try:
+            while True:
+                pending.append(task_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if task[0] == "exit":
+            break
+        elif task[0] == "preload":
+            # A newer preload request supersedes this one
+            if any(t[0] == "preload" for t in pending):
+                continue
+            preload_model(result_queue, models, *task[1:])
+        elif task[0] == "transcribe":
+            transcription_worker(result_queue, models, *task[1:])
+        elif task[0] == "update":
+            update_model(result_queue, task[1])
+        elif task[0] == "quantize":
+            quantize_worker(result_queue, models, *task[1:])
+
+
+def preload_model(result_queue, models, model_name, precision):
+    """Load a model into the worker and run a short warmup so kernels are compiled."""
+    import numpy as np
+    import mlx_whisper
+    from mlx_whisper.audio import SAMPLE_RATE
+
+    try:
+        start_time = time.time()
+        model_path = model_resolver.find_local_model(model_name)
+        if model_path is None:
+            raise RuntimeError("the model is not fully downloaded yet")
+        # Models still resident in the cache were warmed up when first loaded
+        warm = models.is_resident(model_path, precision)
+        models.get(model_path, precision)
+        if not warm:
+            # One second of silence exercises the encoder and a few decoder steps
+            mlx_whisper.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), path_or_hf_repo=model_path, verbose=None)
+        result_queue.put(("model_ready", (model_name, precision, time.time() - start_time)))
+    except Exception as e:
+        result_queue.put(("model_error", (model_name, str(e))))
+
+
+def update_model(result_queue, model_name):
+    """Download the latest snapshot of a Hub model (only files that changed are fetched)."""
+    try:
+        path = model_resolver.resolve_model(model_name, refresh=True, progress=lambda event: result_queue.put(("download", event)))
+        result_queue.put(("model_updated", (model_name, path)))
+    except Exception as e:
+        result_queue.put(("update_error", (model_name, str(e))))
+
+
+def quantize_worker(result_queue, models, model_name, bits, audio_path):
+    """Create a quantized variant of a model and compare it with the original on `audio_path` (or silence)."""
+    try:
+        # The source and its quantized copy are both in memory while quantizing; make room in the cache's budget
+        model_path = model_resolver.find_local_model(model_name)
+        if model_path:
+            models.reserve(2 * model_cache.estimate_model_size(model_path))
+        output_dir, report = quantize_model.create_variant(model_name, bits, audio_path=audio_path)
+        result_queue.put(("quantized", (model_name, output_dir, report)))
+    except Exception as e:
+        result_queue.put(("quantize_error", (model_name, str(e))))
+
+
+def transcription_worker(result_queue, models, audio_path, model_name, precision, language_code, language_name):
+    """
+    Transcribe one file inside the worker process.
+    Runs in a separate process to allow termination (Stop button).
+    """
+    import mlx_whisper
+    import resource
+    import mlx.core as mx
+    from mlx_whisper.audio import load_audio, SAMPLE_RATE
+
+    mx.reset_peak_memory()
+
+    def peak_stats():
+        # ru_maxrss is in bytes on macOS and covers the worker's whole lifetime, not just this file
+        return {"peak_memory": mx.get_peak_memory(), "worker_peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
     try:
         print(f"Starting transcription for: {audio_path}")
-        print(f"Loading model ({model_name})...")
+
+        # Resolve the model to a local folder so loading never touches the network.
+        # Only a model that is not fully cached is downloaded, before the job timeout is armed.
+        model_path = model_resolver.find_local_model(model_name)
+        if model_path is None:
+            print(f"Downloading model ({model_name})...")
+            stage_start = time.time()
+            model_path = model_resolver.resolve_model(model_name, progress=lambda event: result_queue.put(("download", event)))
+            result_queue.put(("stats", {"download": time.time() - stage_start}))
+
+        # Report media length first so the GUI can arm the per-job timeout
+        result_queue.put(("media_duration", batch_policy.probe_media_duration(audio_path)))
+
+        start_time = time.time()
+
+        # Stage 1: decode audio (FFmpeg -> 16 kHz mono)
+        stage_start = time.time()
+        audio = load_audio(audio_path)
+        result_queue.put(("stats", {"decode": time.time() - stage_start, "media_duration": len(audio) / SAMPLE_RATE}))
+
+        # Stage 2: load model (instant if it is still resident in the worker's model cache)
+        print(f"Loading model ({model_name}, {precision} precision)...")
+        stage_start = time.time()
+        model = models.get(model_path, precision)
+        result_queue.put(("stats", {"model_load": time.time() - stage_start}))
 
         transcribe_args = {
-            "audio": audio_path,
-            "path_or_hf_repo": model_name,
+            "audio": audio,
+            "path_or_hf_repo": model_path,
             "verbose": True
         }
         
@@ -106,16 +243,23 @@ def transcription_worker(result_queue, audio_path, model_name, language_code, la
         else:
             print("Language: Auto-detect")
 
-        # Run transcription
-        start_time = time.time()
+        # Stage 3: run transcription
+        stage_start = time.time()
         result = mlx_whisper.transcribe(**transcribe_args)
         end_time = time.time()
         duration = end_time - start_time
+        result_queue.put(("stats", {"inference": end_time - stage_start}))
+        if isinstance(model, compiled_model.CompiledWhisper) and model.stats:
+            print("Compiled graph timings (first call includes tracing):\n" + model.report())
         
-        # Send result back
-        result_queue.put(("success", (result["text"], duration)))
+        # Send result back in compact columnar form (pickles as a few flat arrays),
+        # after the memory stats so the GUI has them when it handles the result
+        store = SegmentStore.from_result(result)
+        result_queue.put(("stats", peak_stats()))
+        result_queue.put(("success", (store, duration)))
         
     except Exception as e:
+        result_queue.put(("stats", peak_stats()))
         result_queue.put(("error", str(e)))
 
 
@@ -156,7 +300,7 @@ class CacheManagerDialog(ctk.CTkToplevel):
         # Cache location info
         self.cache_path_label = ctk.CTkLabel(
             self,
-            text=f"Cache Location: ~/.cache/huggingface/hub",
+            text=f"Cache Location: {cache_scanner.default_cache_dir().replace(os.path.expanduser('~'), '~', 1)}",
             text_color="gray",
             font=ctk.CTkFont(size=12)
         )
@@ -183,8 +327,11 @@ class CacheManagerDialog(ctk.CTkToplevel):
         )
         self.close_button.pack(pady=(0, 20))
         
-        # Load cache info
+        # Load cache info (scanned on a background thread)
         self.model_checkboxes = {}
+        self.model_rows = {}
+        self.total_size = 0
+        self.scan_generation = 0
         self.refresh_cache_list()
         
         # Center window
@@ -205,110 +352,162 @@ class CacheManagerDialog(ctk.CTkToplevel):
             return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
     
     def refresh_cache_list(self):
-        """Refresh the list of cached models."""
+        """Rescan the cache in the background; rows are added as repos are found."""
         # Clear existing widgets
         for widget in self.scroll_frame.winfo_children():
             widget.destroy()
         self.model_checkboxes.clear()
-        
-        try:
-            cache_info = scan_cache_dir()
-            
-            # Filter for whisper models (mlx-community)
-            whisper_repos = [repo for repo in cache_info.repos 
-                           if 'whisper' in repo.repo_id.lower() or 'mlx-community' in repo.repo_id.lower()]
-            
-            if not whisper_repos:
-                no_model_label = ctk.CTkLabel(
-                    self.scroll_frame,
-                    text="No Whisper models found in cache.\n\nModels will appear here after downloading.",
-                    text_color="gray"
-                )
-                no_model_label.pack(pady=50)
-                self.total_size_label.configure(text="Total: 0 MB")
-                return
-            
-            total_size = 0
-            
-            for repo in sorted(whisper_repos, key=lambda r: r.size_on_disk, reverse=True):
-                total_size += repo.size_on_disk
-                
-                # Create frame for each model
-                model_frame = ctk.CTkFrame(self.scroll_frame)
-                model_frame.pack(fill="x", padx=5, pady=5)
-                model_frame.grid_columnconfigure(1, weight=1)
-                
-                # Checkbox for selection
-                var = ctk.BooleanVar(value=False)
-                checkbox = ctk.CTkCheckBox(
-                    model_frame,
-                    text="",
-                    variable=var,
-                    width=20
-                )
-                checkbox.grid(row=0, column=0, padx=(10, 5), pady=10)
-                
-                # Store reference for deletion
-                self.model_checkboxes[repo.repo_id] = {
-                    'var': var,
-                    'repo': repo
-                }
-                
-                # Model name and size
-                info_frame = ctk.CTkFrame(model_frame, fg_color="transparent")
-                info_frame.grid(row=0, column=1, sticky="ew", padx=5, pady=5)
-                
-                name_label = ctk.CTkLabel(
-                    info_frame,
-                    text=repo.repo_id,
-                    font=ctk.CTkFont(size=13, weight="bold"),
-                    anchor="w"
-                )
-                name_label.pack(fill="x", anchor="w")
-                
-                size_label = ctk.CTkLabel(
-                    info_frame,
-                    text=f"Size: {self.format_size(repo.size_on_disk)}",
-                    text_color="gray",
-                    font=ctk.CTkFont(size=12),
-                    anchor="w"
-                )
-                size_label.pack(fill="x", anchor="w")
-                
-                # Delete button for individual model
-                delete_btn = ctk.CTkButton(
-                    model_frame,
-                    text="Delete",
-                    command=lambda r=repo: self.delete_single_model(r),
-                    width=70,
-                    height=28,
-                    fg_color="#DC2626",
-                    hover_color="#B91C1C"
-                )
-                delete_btn.grid(row=0, column=2, padx=10, pady=10)
-            
-            # Update total size
-            self.total_size_label.configure(text=f"Total: {self.format_size(total_size)}")
-            
-            # Add delete selected button if there are models
-            if whisper_repos:
-                delete_selected_btn = ctk.CTkButton(
-                    self.scroll_frame,
-                    text="Delete Selected",
-                    command=self.delete_selected_models,
-                    fg_color="#DC2626",
-                    hover_color="#B91C1C"
-                )
-                delete_selected_btn.pack(pady=15)
-                
-        except Exception as e:
+        self.model_rows = {}
+        self.total_size = 0
+        self.total_size_label.configure(text="Total: Scanning...")
+
+        # A newer refresh supersedes a scan that is still running
+        self.scan_generation += 1
+        generation = self.scan_generation
+
+        def on_repo(repo):
+            if self.is_whisper_repo(repo):
+                self.parent.post_to_ui(lambda result, error: self.add_model_row(generation, repo))
+
+        self.parent.run_in_background(
+            lambda repos, error: self.on_scan_done(generation, repos, error),
+            cache_scanner.scan_cache, on_repo, None, lambda: generation != self.scan_generation
+        )
+
+    def is_whisper_repo(self, repo):
+        return 'whisper' in repo.repo_id.lower() or 'mlx-community' in repo.repo_id.lower()
+
+    def is_current_scan(self, generation):
+        return generation == self.scan_generation and self.winfo_exists()
+
+    def add_model_row(self, generation, repo):
+        if not self.is_current_scan(generation):
+            return
+        self.total_size += repo.size_on_disk
+        self.total_size_label.configure(text=f"Total: {self.format_size(self.total_size)} (scanning...)")
+
+        # Create frame for each model
+        model_frame = ctk.CTkFrame(self.scroll_frame)
+        model_frame.pack(fill="x", padx=5, pady=5)
+        model_frame.grid_columnconfigure(1, weight=1)
+        self.model_rows[repo.repo_id] = model_frame
+
+        # Checkbox for selection
+        var = ctk.BooleanVar(value=False)
+        checkbox = ctk.CTkCheckBox(
+            model_frame,
+            text="",
+            variable=var,
+            width=20
+        )
+        checkbox.grid(row=0, column=0, padx=(10, 5), pady=10)
+
+        # Store reference for deletion
+        self.model_checkboxes[repo.repo_id] = {
+            'var': var,
+            'repo': repo
+        }
+
+        # Model name and size
+        info_frame = ctk.CTkFrame(model_frame, fg_color="transparent")
+        info_frame.grid(row=0, column=1, sticky="ew", padx=5, pady=5)
+
+        name_label = ctk.CTkLabel(
+            info_frame,
+            text=repo.repo_id,
+            font=ctk.CTkFont(size=13, weight="bold"),
+            anchor="w"
+        )
+        name_label.pack(fill="x", anchor="w")
+
+        size_label = ctk.CTkLabel(
+            info_frame,
+            text=f"Size: {self.format_size(repo.size_on_disk)}",
+            text_color="gray",
+            font=ctk.CTkFont(size=12),
+            anchor="w"
+        )
+        size_label.pack(fill="x", anchor="w")
+
+        # Delete button for individual model
+        delete_btn = ctk.CTkButton(
+            model_frame,
+            text="Delete",
+            command=lambda r=repo: self.delete_single_model(r),
+            width=70,
+            height=28,
+            fg_color="#DC2626",
+            hover_color="#B91C1C"
+        )
+        delete_btn.grid(row=0, column=2, padx=10, pady=10)
+
+    def on_scan_done(self, generation, repos, error):
+        if not self.is_current_scan(generation):
+            return
+        if error:
             error_label = ctk.CTkLabel(
                 self.scroll_frame,
-                text=f"Error loading cache: {e}",
+                text=f"Error loading cache: {error}",
                 text_color="red"
             )
             error_label.pack(pady=50)
-    
+            self.total_size_label.configure(text=f"Total: {self.format_size(self.total_size)}")
+            return
+
+        if not self.model_rows:
+            no_model_label = ctk.CTkLabel(
+                self.scroll_frame,
+                text="No Whisper models found in cache.\n\nModels will appear here after downloading.",
+                text_color="gray"
+            )
+            no_model_label.pack(pady=50)
+            self.total_size_label.configure(text="Total: 0 MB")
+            return
+
+        # Rows were added in discovery order; show the largest models first
+        ordered = sorted(self.model_checkboxes.items(), key=lambda item: item[1]['repo'].size_on_disk, reverse=True)
+        for repo_id, _ in ordered:
+            self.model_rows[repo_id].pack_forget()
+        for repo_id, _ in ordered:
+            self.model_rows[repo_id].pack(fill="x", padx=5, pady=5)
+
+        # Update total size
+        self.total_size_label.configure(text=f"Total: {self.format_size(self.total_size)}")
+
+        # Add delete selected button if there are models
+        delete_selected_btn = ctk.CTkButton(
+            self.scroll_frame,
+            text="Delete Selected",
+            command=self.delete_selected_models,
+            fg_color="#DC2626",
+            hover_color="#B91C1C"
+        )
+        delete_selected_btn.pack(pady=15)
+
+    def delete_repos(self, repos, description):
+        """Delete repo folders in the background, then report and rescan (only changed repos are walked again)."""
+        self.total_size_label.configure(text="Deleting...")
+
+        def on_deleted(freed_size, error):
+            if not self.winfo_exists():
+                return
+            if error:
+                messagebox.showerror("Error", f"Failed to delete {description}:\n{error}", parent=self)
+            else:
+                messagebox.showinfo(
+                    "Deleted",
+                    f"Successfully deleted {description}\n\nFreed: {self.format_size(freed_size)}",
+                    parent=self
+                )
+
+            # Refresh the list
+            self.refresh_cache_list()
+
+            # Update cache status in main window
+            self.parent.on_model_change(self.parent.model_var.get())
+
+        self.parent.run_in_background(on_deleted, cache_scanner.delete_repos, repos)
+
     def delete_single_model(self, repo):
         """Delete a single model from cache."""
         confirm = messagebox.askyesno(
@@ -316,37 +515,10 @@ class CacheManagerDialog(ctk.CTkToplevel):
             f"Are you sure you want to delete:\n\n{repo.repo_id}\n\nSize: {self.format_size(repo.size_on_disk)}\n\nThis action cannot be undone.",
             parent=self
         )
-        
+
         if confirm:
-            try:
-                # Get all revision commit hashes for this repo
-                revision_hashes = [rev.commit_hash for rev in repo.revisions]
-                
-                # Delete using the cache API
-                cache_info = scan_cache_dir()
-                delete_strategy = cache_info.delete_revisions(*revision_hashes)
-                
-                # Show what will be freed
-                freed_size = delete_strategy.expected_freed_size
-                
-                # Execute deletion
-                delete_strategy.execute()
-                
-                messagebox.showinfo(
-                    "Deleted",
-                    f"Successfully deleted {repo.repo_id}\n\nFreed: {self.format_size(freed_size)}",
-                    parent=self
-                )
-                
-                # Refresh the list
-                self.refresh_cache_list()
-                
-                # Update cache status in main window
-                self.parent.on_model_change(self.parent.model_var.get())
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete model:\n{e}", parent=self)
-    
+            self.delete_repos([repo], repo.repo_id)
+
     def delete_selected_models(self):
         """Delete all selected models."""
         selected = [(repo_id, data) for repo_id, data in self.model_checkboxes.items() 
@@ -367,33 +539,7 @@ class CacheManagerDialog(ctk.CTkToplevel):
         )
         
         if confirm:
-            try:
-                # Collect all revision hashes
-                all_hashes = []
-                for _, data in selected:
-                    for rev in data['repo'].revisions:
-                        all_hashes.append(rev.commit_hash)
-                
-                # Delete using the cache API
-                cache_info = scan_cache_dir()
-                delete_strategy = cache_info.delete_revisions(*all_hashes)
-                freed_size = delete_strategy.expected_freed_size
-                delete_strategy.execute()
-                
-                messagebox.showinfo(
-                    "Deleted",
-                    f"Successfully deleted {len(selected)} model(s)\n\nFreed: {self.format_size(freed_size)}",
-                    parent=self
-                )
-                
-                # Refresh the list
-                self.refresh_cache_list()
-                
-                # Update cache status in main window
-                self.parent.on_model_change(self.parent.model_var.get())
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete models:\n{e}", parent=self)
+            self.delete_repos([data['repo'] for _, data in selected], f"{len(selected)} model(s)")
 
 
 class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
@@ -494,8 +640,14 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         self.cache_manage_button = ctk.CTkButton(self.model_frame, text="Manage Cache", command=self.show_cache_manager, width=100, fg_color="#6B7280")
         self.cache_manage_button.grid(row=0, column=4, padx=(0, 10), sticky="w")
 
+        self.update_model_button = ctk.CTkButton(self.model_frame, text="Update", command=self.update_model, width=70, fg_color="#6B7280")
+        self.update_model_button.grid(row=0, column=5, padx=(0, 10), sticky="w")
+
+        self.quantize_button = ctk.CTkButton(self.model_frame, text="Quantize...", command=self.create_quantized_variant, width=90, fg_color="#6B7280")
+        self.quantize_button.grid(row=0, column=6, padx=(0, 10), sticky="w")
+
         self.cache_status_label = ctk.CTkLabel(self.model_frame, text="Checking...", text_color="gray")
-        self.cache_status_label.grid(row=0, column=5, padx=(0, 0), sticky="w")
+        self.cache_status_label.grid(row=0, column=7, padx=(0, 0), sticky="w")
 
         # Row 1: Path/URL Display
         self.path_label = ctk.CTkLabel(self.model_frame, text="Source:", font=ctk.CTkFont(size=12))
@@ -511,24 +663,61 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
             hover_color=("gray85", "gray25"),
             command=self.open_source
         )
-        self.model_source_link.grid(row=1, column=1, columnspan=5, padx=(0, 0), pady=(5, 0), sticky="ew")
+        self.model_source_link.grid(row=1, column=1, columnspan=7, padx=(0, 0), pady=(5, 0), sticky="ew")
 
         # Row 2: Model Info
         self.model_info_label = ctk.CTkLabel(self.model_frame, text="", text_color="gray", font=ctk.CTkFont(size=12))
-        self.model_info_label.grid(row=2, column=0, columnspan=6, padx=(0, 10), pady=(5, 0), sticky="w")
+        self.model_info_label.grid(row=2, column=0, columnspan=8, padx=(0, 10), pady=(5, 0), sticky="w")
 
         # Variables
         self.selected_file = None
-        self.file_queue = []  # Queue for batch processing
+        self.file_queue = []  # Queue for batch processing (job rows from job_store)
+        self.job_store = JobStore()
+        self.transcript_index = TranscriptIndex()
         self.batch_total_files = 0
         self.batch_total_duration = 0.0
         self.is_transcribing = False
+        self.failure_policy_var = ctk.StringVar(value=batch_policy.SKIP)
+        self.max_retries = batch_policy.DEFAULT_MAX_RETRIES
+        self.batch_failures = []  # (path, error) pairs for the end-of-batch report
+        self.job_deadline = None
+        self.retry_after_id = None
+        self.run_manifest = None
+        self.job_stats = {}  # Per-stage timings/memory reported by the worker for the current file
+        self.output_format_vars = {fmt: ctk.BooleanVar(value=fmt in writers.DEFAULT_FORMATS) for fmt in writers.FORMATS}
+        self.job_active = False  # A file has been handed to the worker and not finished yet
+        self.job_model = None  # Model, precision and language the current file runs with
+        self.job_precision = None
+        self.job_language_code = None
         self.process = None
+        self.task_queue = None
         self.result_queue = None
+        self.loaded_model = None
+        self.preloading_model = None
+        self.model_memory_budget = model_cache.default_budget()  # Bytes of unified memory for resident models
+        self.compile_graphs = True  # Run models through compiled, shape-bucketed graphs (compiled_model)
+        self.deferred_messages = []  # Worker messages read by drain_stats, handled next by check_queue
+        self.background_results = queue.Queue()  # (callback, result, error) from run_in_background threads
+        self.network_verdict = None  # Hugging Face reachability (network_probe), checked in the background
+        self.cache_status = {}  # model name -> last known availability (True/False), refreshed in the background
+        self.model_precisions = {}  # model name -> weight precision (model_loader.PRECISIONS) if not the default
+        self.precision_var = ctk.StringVar(value=model_loader.DEFAULT_PRECISION)
+        self.local_model_index = local_models.LocalModelIndex()
+        self.local_models = {}  # path -> index entry of local model folders offered in the dropdown
+        self.local_scan_generation = 0
+        self.save_config_after_id = None
+        self.config_lock = threading.Lock()
+        self.config_version = 0  # Incremented per save so an older write never replaces a newer one
+        self.config_written_version = 0
         # Remember last visited directory for models
         self.last_model_dir = os.path.join(os.getcwd(), "models") if os.path.exists(os.path.join(os.getcwd(), "models")) else os.getcwd()
 
+        # Offer local models found in earlier sessions right away; missing ones are pruned in the background
+        self.add_local_models(self.local_model_index.models())
+        self.run_in_background(lambda missing, error: self.remove_local_models(missing or []), self.local_model_index.prune_missing)
+
         # Load saved configuration (before initial on_model_change to avoid overwriting)
+        # The resident worker is started by the first preload request
         self.load_config()
 
         # Initial check (if load_config didn't trigger it, or to ensure UI update)
@@ -552,6 +741,44 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         )
         self.language_menu.grid(row=0, column=1, padx=(0, 10), sticky="w")
 
+        self.precision_label = ctk.CTkLabel(self.options_frame, text="Precision:", font=ctk.CTkFont(weight="bold"))
+        self.precision_label.grid(row=0, column=2, padx=(10, 10), sticky="w")
+
+        # Remembered per model; fp16/bf16 halve the memory of float32 checkpoints
+        self.precision_menu = ctk.CTkOptionMenu(
+            self.options_frame,
+            values=model_loader.PRECISIONS,
+            variable=self.precision_var,
+            command=self.on_precision_change,
+            width=90
+        )
+        self.precision_menu.grid(row=0, column=3, padx=(0, 10), sticky="w")
+
+        self.failure_policy_label = ctk.CTkLabel(self.options_frame, text="On Error:", font=ctk.CTkFont(weight="bold"))
+        self.failure_policy_label.grid(row=0, column=4, padx=(10, 10), sticky="w")
+
+        self.failure_policy_menu = ctk.CTkOptionMenu(
+            self.options_frame,
+            values=batch_policy.POLICIES,
+            variable=self.failure_policy_var,
+            command=lambda _: self.schedule_save_config(),
+            width=100
+        )
+        self.failure_policy_menu.grid(row=0, column=5, padx=(0, 10), sticky="w")
+
+        self.output_format_label = ctk.CTkLabel(self.options_frame, text="Output:", font=ctk.CTkFont(weight="bold"))
+        self.output_format_label.grid(row=0, column=6, padx=(10, 10), sticky="w")
+
+        for i, fmt in enumerate(writers.FORMATS):
+            checkbox = ctk.CTkCheckBox(
+                self.options_frame,
+                text=fmt.upper(),
+                variable=self.output_format_vars[fmt],
+                command=self.schedule_save_config,
+                width=60
+            )
+            checkbox.grid(row=0, column=7 + i, padx=(0, 5), sticky="w")
+
         # Status / Result Area (Tabs)
         self.tabview = ctk.CTkTabview(self, width=500, height=200)
         self.tabview.grid(row=4, column=0, padx=20, pady=10, sticky="nsew")
@@ -559,6 +786,7 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         
         self.tab_logs = self.tabview.add("Logs")
         self.tab_result = self.tabview.add("Result")
+        self.tab_search = self.tabview.add("Search")
         
         # Log Textbox
         self.tabview.set("Logs")
@@ -567,9 +795,25 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         self.log_textbox.insert("0.0", "Ready to transcribe.\n")
         self.log_textbox.configure(state="disabled")
 
-        # Result Textbox
-        self.result_textbox = ctk.CTkTextbox(self.tab_result, width=500, height=150)
-        self.result_textbox.pack(expand=True, fill="both")
+        # Result Viewer (renders only the visible part of long transcripts)
+        self.result_viewer = ResultViewer(self.tab_result)
+        self.result_viewer.pack(expand=True, fill="both")
+
+        # Search (transcript index)
+        self.search_frame = ctk.CTkFrame(self.tab_search, fg_color="transparent")
+        self.search_frame.pack(fill="x", pady=(0, 5))
+        self.search_frame.grid_columnconfigure(0, weight=1)
+
+        self.search_entry = ctk.CTkEntry(self.search_frame, placeholder_text="Search all transcripts...")
+        self.search_entry.grid(row=0, column=0, padx=(0, 10), sticky="ew")
+        self.search_entry.bind("<Return>", lambda _: self.search_transcripts())
+
+        self.search_button = ctk.CTkButton(self.search_frame, text="Search", command=self.search_transcripts, width=80)
+        self.search_button.grid(row=0, column=1)
+
+        self.search_textbox = ctk.CTkTextbox(self.tab_search, width=500, height=120)
+        self.search_textbox.pack(expand=True, fill="both")
+        self.search_textbox.configure(state="disabled")
 
         # Action Buttons
         self.button_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -586,6 +830,56 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         self.drop_target_register(DND_FILES)
         self.dnd_bind('<<Drop>>', self.drop_file)
 
+        # Restore unfinished jobs from a previous session
+        self.restore_pending_jobs()
+        self.run_in_background(
+            lambda removed, error: error and self.log_message(f"Could not prune the transcript cache: {error}"),
+            segment_store.prune_cache
+        )
+
+        # Find out early whether Hugging Face is reachable, without blocking the UI
+        self.run_in_background(self.on_network_verdict, network_probe.check)
+
+        # Poll the worker for log, progress and preload messages
+        self.after(100, self.check_queue)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def queue_files(self, files):
+        """Replace the current batch with new files (persisted in the job store)."""
+        self.job_store.cancel(job["id"] for job in self.file_queue)
+        self.file_queue = self.job_store.add_jobs(files)
+        self.batch_total_files = len(files)
+        self.batch_total_duration = 0.0
+        self.batch_failures = []
+
+    def restore_pending_jobs(self):
+        """Reload jobs left over from the last run. Resume automatically if a batch was interrupted mid-file."""
+        try:
+            self.job_store.clear_finished(older_than=time.time() - FINISHED_JOB_MAX_AGE)
+            interrupted = self.job_store.requeue_interrupted()
+            pending = self.job_store.pending_jobs()
+        except Exception as e:
+            self.log_message(f"Failed to restore job queue: {e}")
+            return
+
+        if not pending:
+            return
+
+        self.file_queue = list(pending)
+        self.batch_total_files = len(pending)
+        self.batch_total_duration = 0.0
+        self.batch_failures = []
+        self.selected_file = pending[0]["path"]
+        self.file_path_entry.delete(0, "end")
+        self.file_path_entry.insert(0, f"{len(pending)} files restored from previous session")
+        self.log_message(f"Restored {len(pending)} pending file(s) from previous session:")
+        for job in pending:
+            self.log_message(f" - {os.path.basename(job['path'])}")
+
+        if interrupted:
+            self.log_message("Previous batch was interrupted. Resuming...")
+            self.after(500, self.start_transcription_thread)
+
     def drop_file(self, event):
         # Parse dropped files (handles spaces and multiple files)
         try:
@@ -597,9 +891,7 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         if not files:
             return
 
-        self.file_queue = list(files)
-        self.batch_total_files = len(files)
-        self.batch_total_duration = 0.0
+        self.queue_files(files)
         
         # Update UI
         self.file_path_entry.delete(0, "end")
@@ -622,38 +914,91 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
                     config = json.load(f)
                     
                 # Restore last model directory
-                if "last_model_dir" in config and os.path.isdir(config["last_model_dir"]):
+                if config.get("failure_policy") in batch_policy.POLICIES:
+                    self.failure_policy_var.set(config["failure_policy"])
+                if isinstance(config.get("max_retries"), int):
+                    self.max_retries = config["max_retries"]
+                if isinstance(config.get("model_memory_budget_gb"), (int, float)):
+                    self.model_memory_budget = int(config["model_memory_budget_gb"] * 1024 ** 3)
+                if isinstance(config.get("compile_graphs"), bool):
+                    self.compile_graphs = config["compile_graphs"]
+                if isinstance(config.get("output_formats"), list):
+                    for fmt, var in self.output_format_vars.items():
+                        var.set(fmt in config["output_formats"])
+                if isinstance(config.get("model_precisions"), dict):
+                    self.model_precisions = {
+                        name: precision for name, precision in config["model_precisions"].items()
+                        if precision in model_loader.PRECISIONS
+                    }
+
+                if "last_model_dir" in config:
                     self.last_model_dir = config["last_model_dir"]
                 
-                # Restore last selected model
+                # Restore last selected model (__init__ then checks its status once, in the background)
                 if "last_model" in config:
                     last_model = config["last_model"]
-                    # If it's a local path, ensure it exists and add to dropdown
-                    if os.path.isdir(last_model):
+                    # A local path is added to the dropdown; a missing folder shows up in its status
+                    if os.path.isabs(last_model):
                         if last_model not in self.model_select_menu._values:
                             current_values = self.model_select_menu._values
                             self.model_select_menu.configure(values=[last_model] + current_values)
                         self.model_var.set(last_model)
-                        self.on_model_change(last_model)
                     # If it's a HF repo, just set it
                     elif last_model in self.model_select_menu._values:
                         self.model_var.set(last_model)
-                        self.on_model_change(last_model)
                         
             except Exception as e:
                 print(f"Failed to load config: {e}")
 
-    def save_config(self):
-        """Save configuration to JSON file."""
+    def schedule_save_config(self):
+        """Save the configuration shortly, coalescing bursts of changes into one write."""
+        if self.save_config_after_id is not None:
+            self.after_cancel(self.save_config_after_id)
+        self.save_config_after_id = self.after(CONFIG_SAVE_DELAY, self.save_config)
+
+    def save_config(self, wait=False):
+        """Save configuration to JSON file (written atomically on a background thread unless `wait`)."""
+        if self.save_config_after_id is not None:
+            self.after_cancel(self.save_config_after_id)
+            self.save_config_after_id = None
+        self.config_version += 1
         config = {
             "last_model_dir": self.last_model_dir,
-            "last_model": self.model_var.get()
+            "last_model": self.model_var.get(),
+            "failure_policy": self.failure_policy_var.get(),
+            "max_retries": self.max_retries,
+            "output_formats": self.get_output_formats(),
+            "model_precisions": dict(self.model_precisions),
+            "model_memory_budget_gb": round(self.model_memory_budget / 1024 ** 3, 2),
+            "compile_graphs": self.compile_graphs
         }
-        try:
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(config, f)
-        except Exception as e:
-            print(f"Failed to save config: {e}")
+        if wait:
+            self.write_config(config, self.config_version)
+        else:
+            threading.Thread(target=self.write_config, args=(config, self.config_version), daemon=True).start()
+
+    def write_config(self, config, version):
+        with self.config_lock:
+            if version < self.config_written_version:
+                return
+            try:
+                tmp_path = f"{CONFIG_FILE}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(config, f)
+                os.replace(tmp_path, CONFIG_FILE)
+                self.config_written_version = version
+            except Exception as e:
+                print(f"Failed to save config: {e}")
+
+    def on_close(self):
+        # Write a pending settings change before the app exits
+        if self.save_config_after_id is not None:
+            self.save_config(wait=True)
+        self.destroy()
+
+    def get_output_formats(self):
+        formats = [fmt for fmt, var in self.output_format_vars.items() if var.get()]
+        return formats or list(writers.DEFAULT_FORMATS)
 
     def select_local_model(self):
         folder_path = filedialog.askdirectory(title="Select Model Folder", initialdir=self.last_model_dir)
@@ -662,47 +1007,84 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         
         # Update last visited directory (parent of the selected folder)
         self.last_model_dir = os.path.dirname(folder_path)
-        self.save_config()
-
-        # Check if config.json exists, if not search subdirectories
-        found_paths = []
-        
-        # Check root first
-        if os.path.exists(os.path.join(folder_path, "config.json")):
-            found_paths.append(folder_path)
-        else:
-            self.log_message("Searching for models in subdirectories...")
-            for root, dirs, files in os.walk(folder_path):
-                if "config.json" in files:
-                    found_paths.append(root)
-                    # Don't traverse inside a model folder (optimization)
-                    dirs[:] = []
-        
-        if not found_paths:
-            messagebox.showwarning("Invalid Model Folder", "Could not find 'config.json' in the selected folder or its subdirectories.\nPlease select a valid Hugging Face model folder.")
-            return
-
-        # Sort paths to ensure consistent order
-        found_paths.sort()
+        self.schedule_save_config()
+
+        # Models an earlier scan found under this folder are offered at once;
+        # a background scan then adds new ones and drops ones that are gone
+        folder_path = os.path.abspath(folder_path)
+        known = self.local_model_index.models(folder_path)
+        if known:
+            self.add_local_models(known)
+            self.select_found_local_model(folder_path, known)
+
+        self.log_message("Searching for models in subdirectories...")
+        self.local_scan_generation += 1
+        generation = self.local_scan_generation
+
+        def on_model(model):
+            def add(result, error):
+                if generation == self.local_scan_generation:
+                    self.add_local_models([model])
+            self.post_to_ui(add)
+
+        self.run_in_background(
+            lambda found, error: self.on_local_models_found(generation, folder_path, bool(known), found, error),
+            self.local_model_index.discover, folder_path, local_models.DEFAULT_MAX_DEPTH,
+            on_model, lambda: generation != self.local_scan_generation
+        )
 
-        # Update dropdown with found local models
+    def add_local_models(self, models):
+        """Add local model folders to the top of the dropdown (index entries hold their config details)."""
+        for model in models:
+            self.local_models[model["path"]] = model
+        paths = [model["path"] for model in models]
         current_values = self.model_select_menu._values
         # Add new paths to the top, removing duplicates
-        new_values = found_paths + [v for v in current_values if v not in found_paths]
+        new_values = paths + [v for v in current_values if v not in paths]
         self.model_select_menu.configure(values=new_values)
 
-        # Select the first found model (or the one that matches current selection if possible?)
-        # For now, just select the first one found, but let user switch.
-        target_path = found_paths[0]
+    def remove_local_models(self, paths):
+        """Drop vanished local folders from the dropdown (the selected one stays and shows as missing)."""
+        paths = [path for path in paths if path != self.model_var.get()]
+        for path in paths:
+            self.local_models.pop(path, None)
+        self.model_select_menu.configure(values=[v for v in self.model_select_menu._values if v not in paths])
+
+    def select_found_local_model(self, folder_path, models):
+        # Select the first model found; the others can be picked from the dropdown
+        target_path = models[0]["path"]
         self.model_var.set(target_path)
         self.on_model_change(target_path)
-        
+
         self.log_message(f"Selected local model path: {target_path}")
-        if len(found_paths) > 1:
-            self.log_message(f"Found {len(found_paths)} models in the folder. You can switch between them in the dropdown.")
+        if len(models) > 1:
+            self.log_message(f"Found {len(models)} models in the folder. You can switch between them in the dropdown.")
         elif target_path != folder_path:
             self.log_message(f"(Auto-detected model inside subfolder)")
 
+    def on_local_models_found(self, generation, folder_path, already_selected, found, error):
+        # The user has since picked another folder; its scan owns the dropdown now
+        if generation != self.local_scan_generation:
+            return
+        if error:
+            self.log_message(f"Could not search {folder_path}: {error}")
+            return
+        found_paths = {model["path"] for model in found}
+        gone = [path for path in self.local_models if path not in found_paths
+                and (path == folder_path or path.startswith(folder_path.rstrip(os.sep) + os.sep))]
+        self.remove_local_models(gone)
+
+        if not found:
+            if not already_selected:
+                messagebox.showwarning("Invalid Model Folder", "Could not find 'config.json' in the selected folder or its subdirectories.\nPlease select a valid Hugging Face model folder.")
+            return
+        self.add_local_models(found)
+        if not already_selected or self.model_var.get() in gone:
+            self.select_found_local_model(folder_path, found)
+        else:
+            # Details may have changed since the index entry was shown
+            self.on_model_change(self.model_var.get())
+
     def show_cache_manager(self):
         """Show cache management dialog."""
         CacheManagerDialog(self)
@@ -720,14 +1102,17 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
 
     def on_model_change(self, model_name):
         # Save the new selection
-        self.save_config()
+        self.schedule_save_config()
+        self.precision_var.set(self.model_precision(model_name))
 
         # Update URL/Path display
-        if os.path.isdir(model_name):
+        if os.path.isabs(model_name):
             self.current_source = model_name
             self.model_source_link.configure(text=model_name)
-            self.cache_status_label.configure(text="Local Folder", text_color="blue")
-            self.model_info_label.configure(text="Local Model (Details unknown)")
+            if model_name in self.local_models:
+                self.model_info_label.configure(text=local_models.describe(self.local_models[model_name]))
+            else:
+                self.model_info_label.configure(text="Local Model (Details unknown)")
         else:
             url = f"https://huggingface.co/{model_name}"
             self.current_source = url
@@ -736,13 +1121,61 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
             # Update Info
             info_text = self.MODEL_INFO.get(model_name, "No information available")
             self.model_info_label.configure(text=info_text)
-            
-            # Check cache status
-            cached_path = try_to_load_from_cache(repo_id=model_name, filename="config.json")
-            if cached_path:
-                self.cache_status_label.configure(text="✓ Cached", text_color="green")
+
+        # Show the last known status at once; the cache is checked off the Tk thread
+        # (memoized per model until its cache folders change)
+        if model_name in self.cache_status:
+            self.show_cache_status(model_name, self.cache_status[model_name])
+        else:
+            self.cache_status_label.configure(text="Checking...", text_color="gray")
+        self.run_in_background(
+            lambda path, error: self.on_cache_status(model_name, path, error),
+            model_resolver.cached_snapshot_status, model_name
+        )
+
+    def model_precision(self, model_name):
+        return self.model_precisions.get(model_name, model_loader.DEFAULT_PRECISION)
+
+    def on_precision_change(self, precision):
+        """Remember the weight precision for the selected model and reload it in that precision."""
+        model_name = self.model_var.get()
+        if precision == model_loader.DEFAULT_PRECISION:
+            self.model_precisions.pop(model_name, None)
+        else:
+            self.model_precisions[model_name] = precision
+        self.schedule_save_config()
+        if model_name in (self.loaded_model, self.preloading_model):
+            self.loaded_model = None
+            self.preloading_model = None
+        if self.cache_status.get(model_name):
+            self.request_preload(model_name)
+
+    def on_cache_status(self, model_name, path, error):
+        if error:
+            print(f"Could not check cache status of {model_name}: {error}")
+        self.cache_status[model_name] = path is not None
+        if model_name != self.model_var.get():
+            return
+        self.show_cache_status(model_name, path is not None)
+
+        # Load the model in the background (never start a download just for preloading)
+        if path is not None and model_name != self.loaded_model:
+            self.request_preload(model_name)
+
+    def show_cache_status(self, model_name, available):
+        if model_name == self.loaded_model:
+            self.cache_status_label.configure(text="✓ Ready", text_color="green")
+        elif os.path.isabs(model_name):
+            if available:
+                self.cache_status_label.configure(text="Local Folder", text_color="blue")
             else:
-                self.cache_status_label.configure(text="⚠ Not Cached", text_color="orange")
+                self.cache_status_label.configure(text="⚠ Folder not found", text_color="red")
+        elif available:
+            self.cache_status_label.configure(text="✓ Cached", text_color="green")
+        elif self.network_verdict and self.network_verdict["verdict"] != network_probe.ONLINE:
+            self.cache_status_label.configure(text=f"⚠ Not Cached ({self.network_verdict['verdict']})", text_color="red")
+        else:
+            self.cache_status_label.configure(text="⚠ Not Cached", text_color="orange")
 
     def open_source(self):
         if hasattr(self, 'current_source') and self.current_source:
@@ -756,9 +1189,7 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
             filetypes=[("Audio/Video Files", "*.mp3 *.wav *.m4a *.mp4 *.flac *.mov"), ("All Files", "*.*")]
         )
         if file_paths:
-            self.file_queue = list(file_paths)
-            self.batch_total_files = len(file_paths)
-            self.batch_total_duration = 0.0
+            self.queue_files(file_paths)
             
             # Update UI
             self.file_path_entry.delete(0, "end")
@@ -773,6 +1204,34 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
                 for f in file_paths:
                     self.log_message(f" - {os.path.basename(f)}")
 
+    def post_to_ui(self, callback, result=None, error=None):
+        """Schedule callback(result, error) on the Tk thread (safe to call from any thread)."""
+        self.background_results.put((callback, result, error))
+
+    def run_in_background(self, callback, func, *args):
+        """Run func(*args) on a thread; callback(result, error) is then called on the Tk thread by check_queue."""
+        def run():
+            try:
+                result = func(*args)
+            except Exception as e:
+                self.post_to_ui(callback, None, e)
+            else:
+                self.post_to_ui(callback, result)
+        threading.Thread(target=run, daemon=True).start()
+
+    def on_network_verdict(self, verdict, error):
+        if error:
+            self.log_message(f"Could not check Hugging Face reachability: {error}")
+            return
+        self.network_verdict = verdict
+        if verdict["verdict"] == network_probe.ONLINE:
+            return
+        self.log_message(f"Hugging Face is {verdict['verdict']}: {verdict['detail']}\n"
+                         "Using cached and local models only; uncached models fail immediately.")
+        model_name = self.model_var.get()
+        if self.cache_status.get(model_name) is False:
+            self.show_cache_status(model_name, False)
+
     def log_message(self, message):
         self.log_textbox.configure(state="normal")
         self.log_textbox.insert("end", message + "\n")
@@ -786,14 +1245,18 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         
         # If queue is empty but selected_file is set (legacy/manual browse), add it
         if not self.file_queue and self.selected_file:
-            self.file_queue = [self.selected_file]
-            self.batch_total_files = 1
-            self.batch_total_duration = 0.0
+            self.queue_files([self.selected_file])
 
         if self.is_transcribing:
             return
 
         self.is_transcribing = True
+        try:
+            self.run_manifest = RunManifest()
+            self.log_message(f"Run manifest: {self.run_manifest.path}")
+        except Exception as e:
+            self.run_manifest = None
+            self.log_message(f"Could not create run manifest: {e}")
         self.transcribe_button.configure(text="Stop Transcription", fg_color="red", hover_color="darkred", command=self.stop_transcription)
         self.browse_button.configure(state="disabled")
         
@@ -804,12 +1267,13 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         self.process_next_in_queue()
 
     def process_next_in_queue(self):
+        self.retry_after_id = None
         if not self.file_queue:
-            self.log_message("Batch processing complete.")
-            self.reset_ui()
+            self.finish_batch()
             return
 
-        current_file = self.file_queue[0] # Peek, remove on success/error
+        job = self.file_queue[0] # Peek, remove on success/error
+        current_file = job["path"]
         self.log_message(f"\n--- Starting: {os.path.basename(current_file)} ---")
         
         # Prepare arguments
@@ -820,21 +1284,37 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         if language_selection != "Auto":
             language_code = self.LANGUAGE_CODES.get(language_selection)
 
-        # Create Queue
-        self.result_queue = multiprocessing.Queue()
+        self.job_store.mark_running(job["id"], model_name, language_code)
 
-        # Start Process
+        self.job_model = model_name
+        self.job_precision = self.model_precision(model_name)
+        self.job_language_code = language_code
+        self.job_deadline = None
+        self.job_stats = {}
+        self.job_active = True
+
+        # Hand the file to the resident worker (it keeps the model loaded between files)
+        if not (self.process and self.process.is_alive()):
+            self.start_worker()
+        self.task_queue.put(("transcribe", audio_path, model_name, self.job_precision, language_code, language_selection))
+
+    def start_worker(self):
+        """Spawn the long-lived worker process with fresh queues."""
+        self.task_queue = multiprocessing.Queue()
+        self.result_queue = multiprocessing.Queue()
+        self.deferred_messages = []
         self.process = multiprocessing.Process(
-            target=transcription_worker,
-            args=(self.result_queue, audio_path, model_name, language_code, language_selection)
+            target=model_worker,
+            args=(self.task_queue, self.result_queue, self.model_memory_budget, self.compile_graphs),
+            daemon=True
         )
         self.process.start()
+        self.loaded_model = None
+        self.preloading_model = None
+        # A quantization running in a previous worker is gone
+        self.quantize_button.configure(state="normal")
 
-        # Start polling the queue
-        self.after(100, self.check_queue)
-        self.after(100, self.check_queue)
-
-    def stop_transcription(self):
+    def kill_process(self):
         if self.process and self.process.is_alive():
             # Try terminate first (SIGTERM)
             self.process.terminate()
@@ -843,51 +1323,251 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
             if self.process.is_alive():
                 # Force kill if still alive (SIGKILL)
                 self.process.kill()
+
+    def restart_worker(self):
+        """Kill the worker (e.g. to stop a running job) and start a fresh one with the current model preloaded."""
+        self.kill_process()
+        self.start_worker()
+        model_name = self.model_var.get()
+        if self.cache_status.get(model_name):
+            self.request_preload(model_name)
+
+    def request_preload(self, model_name):
+        """Ask the worker to load and warm up a model in the background."""
+        if not (self.process and self.process.is_alive()):
+            self.start_worker()
+        elif model_name in (self.loaded_model, self.preloading_model):
+            return
+        self.preloading_model = model_name
+        self.task_queue.put(("preload", model_name, self.model_precision(model_name)))
+        if model_name == self.model_var.get():
+            self.cache_status_label.configure(text="⏳ Loading model...", text_color="gray")
+
+    def update_model(self):
+        """Check the Hub for a newer snapshot of the selected model (cached models are otherwise used offline)."""
+        model_name = self.model_var.get()
+        if os.path.isabs(model_name):
+            messagebox.showinfo("Update Model", "Local folders are used as they are and cannot be updated.")
+            return
+        if not (self.process and self.process.is_alive()):
+            self.start_worker()
+        self.task_queue.put(("update", model_name))
+        self.cache_status_label.configure(text="⏳ Checking for updates...", text_color="gray")
+
+    def create_quantized_variant(self):
+        """Quantize the selected model into a new local model and benchmark it against the original."""
+        model_name = self.model_var.get()
+        if not self.cache_status.get(model_name):
+            messagebox.showwarning("Create Quantized Variant", "The model has to be downloaded first (transcribe a file with it or click Update).")
+            return
+        dialog = ctk.CTkInputDialog(
+            text=f"Create a quantized variant of\n{model_name}\n\nBits per weight ({' or '.join(map(str, quantize_model.BITS))}):",
+            title="Create Quantized Variant"
+        )
+        value = dialog.get_input()
+        if not value:
+            return
+        try:
+            bits = int(value)
+        except ValueError:
+            bits = None
+        if bits not in quantize_model.BITS:
+            messagebox.showwarning("Create Quantized Variant", f"Bits must be {' or '.join(map(str, quantize_model.BITS))}.")
+            return
+
+        if not (self.process and self.process.is_alive()):
+            self.start_worker()
+        # Benchmark on the selected file if there is one, so the comparison reflects real audio
+        self.task_queue.put(("quantize", model_name, bits, self.selected_file))
+        self.quantize_button.configure(state="disabled")
+        self.log_message(f"Creating {bits}-bit variant of {model_name} (runs after any current job)...")
+
+    def on_quantized(self, model_name, output_dir, report):
+        self.quantize_button.configure(state="normal")
+        self.log_message(quantize_model.format_report(report))
+        # The worker may have evicted resident models to make room
+        self.loaded_model = None
+
+        def on_indexed(found, error):
+            if error:
+                self.log_message(f"Could not add {output_dir} to the model list: {error}")
+                return
+            self.add_local_models(found)
+            self.log_message(f"Quantized model added to the model list: {output_dir}")
+            # Select the variant so the model info line shows its measured comparison
+            # (a running batch keeps the model the user chose for it)
+            if found and not self.is_transcribing:
+                self.model_var.set(found[0]["path"])
+                self.on_model_change(found[0]["path"])
+
+        self.run_in_background(on_indexed, self.local_model_index.discover, output_dir)
+        messagebox.showinfo("Quantized Variant Created", quantize_model.format_report(report) + f"\n\nSaved to:\n{output_dir}")
+
+    def stop_transcription(self):
+        waiting_for_retry = self.retry_after_id is not None
+        if waiting_for_retry:
+            self.after_cancel(self.retry_after_id)
+            self.retry_after_id = None
+
+        if waiting_for_retry or self.job_active:
+            # During a retry backoff no job is running; keep the worker and its loaded models
+            if self.job_active:
+                self.job_active = False
+                self.restart_worker()
+
+            # Keep the interrupted file queued so the batch can be restarted
+            if self.file_queue:
+                self.job_store.mark_queued(self.file_queue[0]["id"])
             
             self.log_message("\n[Stopped] Transcription stopped by user.")
             self.reset_ui()
 
+    def handle_worker_message(self, msg_type, content):
+        """Dispatch one message from the worker. Returns True when a job finished."""
+        if msg_type == "log":
+            self.log_message_no_newline(content)
+        elif msg_type == "stats":
+            self.job_stats.update(content)
+        elif msg_type == "media_duration":
+            self.job_stats.setdefault("media_duration", content)
+            timeout = batch_policy.job_timeout(content)
+            if timeout:
+                self.job_deadline = time.time() + timeout
+        elif msg_type == "download":
+            self.show_download_progress(content)
+        elif msg_type == "model_ready":
+            model_name, precision, seconds = content
+            self.log_message(f"Model ready: {model_name} ({precision} precision, loaded and warmed up in {seconds:.1f}s)")
+            # A preload in a precision that has since been changed is not the model the next job uses
+            if precision != self.model_precision(model_name):
+                return False
+            self.loaded_model = model_name
+            if self.preloading_model == model_name:
+                self.preloading_model = None
+            if model_name == self.model_var.get():
+                self.cache_status_label.configure(text="✓ Ready", text_color="green")
+        elif msg_type == "model_error":
+            model_name, error = content
+            if self.preloading_model == model_name:
+                self.preloading_model = None
+            self.log_message(f"Could not preload {model_name}: {error}")
+            if model_name == self.model_var.get():
+                self.cache_status_label.configure(text="⚠ Load failed", text_color="red")
+        elif msg_type == "model_updated":
+            model_name, path = content
+            self.log_message(f"Model up to date: {model_name} ({path})")
+            # A new snapshot is a different folder; load it on next use
+            if self.loaded_model == model_name:
+                self.loaded_model = None
+            if model_name == self.model_var.get():
+                self.cache_status_label.configure(text="✓ Cached", text_color="green")
+                self.request_preload(model_name)
+        elif msg_type == "update_error":
+            model_name, error = content
+            self.log_message(f"Could not update {model_name}: {error}")
+            if model_name == self.model_var.get():
+                self.cache_status_label.configure(text="⚠ Update failed", text_color="red")
+        elif msg_type == "quantized":
+            self.on_quantized(*content)
+        elif msg_type == "quantize_error":
+            model_name, error = content
+            self.quantize_button.configure(state="normal")
+            self.loaded_model = None
+            self.log_message(f"Could not quantize {model_name}: {error}")
+        elif msg_type == "success":
+            self.job_active = False
+            # The worker keeps the model it just used loaded
+            self.loaded_model = self.job_model
+            self.handle_success(content)
+            return True
+        elif msg_type == "error":
+            self.job_active = False
+            self.handle_error(content)
+            return True
+        return False
+
+    def show_download_progress(self, event):
+        """Show a model download from the worker as a determinate progress bar."""
+        total_mb = event["total"] / 1024 ** 2
+        done_mb = event["downloaded"] / 1024 ** 2
+        if event["event"] == "start":
+            self.log_message(f"Downloading {event['repo_id']}: {event['files']} file(s), {total_mb:,.0f} MB"
+                             + (f" ({done_mb:,.0f} MB already downloaded)" if event["downloaded"] else ""))
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+        elif event["event"] == "file_done":
+            self.log_message(f"Verified {event['file']}")
+        elif event["event"] == "done":
+            self.log_message(f"Download complete: {event['path']}")
+            self.end_download_progress()
+            self.cache_status[event["repo_id"]] = True
+            if event["repo_id"] == self.model_var.get():
+                self.cache_status_label.configure(text="✓ Cached", text_color="green")
+            return
+
+        if event["total"]:
+            self.progress_bar.set(event["downloaded"] / event["total"])
+        if event["repo_id"] == self.model_var.get():
+            percent = 100 * event["downloaded"] / event["total"] if event["total"] else 100
+            self.cache_status_label.configure(text=f"⬇ {percent:.0f}% ({done_mb:,.0f}/{total_mb:,.0f} MB)", text_color="gray")
+
+    def end_download_progress(self):
+        """Return the progress bar to the indeterminate transcription spinner."""
+        if self.progress_bar.cget("mode") == "determinate":
+            self.progress_bar.configure(mode="indeterminate")
+            self.progress_bar.start()
+
     def check_queue(self):
+        """Poll the worker for messages. Runs for the lifetime of the app."""
+        # Results of background threads (Tk is only touched from this thread)
         try:
             while True:
+                callback, result, error = self.background_results.get_nowait()
+                callback(result, error)
+        except queue.Empty:
+            pass
+
+        try:
+            # Nothing to read until the first preload or job starts the worker
+            while self.deferred_messages or self.result_queue is not None:
                 # Get all available messages
-                msg_type, content = self.result_queue.get_nowait()
-                
-                if msg_type == "log":
-                    self.log_message_no_newline(content)
-                elif msg_type == "success":
-                    self.handle_success(content)
-                    return
-                elif msg_type == "error":
-                    self.handle_error(content)
-                    return
+                if self.deferred_messages:
+                    msg_type, content = self.deferred_messages.pop(0)
+                else:
+                    msg_type, content = self.result_queue.get_nowait()
+                if self.handle_worker_message(msg_type, content):
+                    break
         except queue.Empty:
             pass
-        
-        if self.process and self.process.is_alive():
-            self.after(100, self.check_queue)
-        else:
-            # Process died unexpectedly or finished without sending success/error
-            if self.is_transcribing:
-                # Check if we have any pending messages one last time
-                try:
+
+        if self.job_active and self.job_deadline and time.time() > self.job_deadline:
+            self.job_active = False
+            self.restart_worker()
+            self.handle_error("Timed out: transcription took longer than expected for this file.", worker_killed=True)
+        elif self.process and not self.process.is_alive():
+            # Worker died unexpectedly; pick up anything it sent before it went away.
+            # A new worker is only spawned on demand (next job or preload), never in a loop.
+            self.process = None
+            self.loaded_model = None
+            self.preloading_model = None
+            try:
+                while self.job_active:
                     msg_type, content = self.result_queue.get_nowait()
-                    if msg_type == "success":
-                        self.handle_success(content)
-                        return
-                    elif msg_type == "error":
-                        self.handle_error(content)
-                        return
-                except queue.Empty:
-                    pass
-                    
+                    self.handle_worker_message(msg_type, content)
+            except queue.Empty:
+                pass
+
+            if self.job_active:
                 # If still no result, it crashed silently
-                self.log_message("\n[Error] Transcription process terminated unexpectedly.")
-                messagebox.showerror("Error", "Transcription process crashed or was terminated.")
-                self.reset_ui()
+                self.job_active = False
+                self.handle_error("Transcription process terminated unexpectedly.")
+
+        self.after(100, self.check_queue)
 
     def handle_success(self, content):
-        text, duration = content
+        store, duration = content
+        detected_language = store.language
+        self.drain_stats()
         self.batch_total_duration += duration
         
         # Format duration
@@ -898,31 +1578,29 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
             time_str = f"{duration:.1f}s"
 
         # Save to file
-        current_file = self.file_queue[0] if self.file_queue else self.selected_file
+        job = self.file_queue[0] if self.file_queue else None
+        current_file = job["path"] if job else self.selected_file
         base_name = os.path.splitext(current_file)[0]
-        output_path = f"{base_name}.txt"
         
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(text)
-            self.log_message(f"SUCCESS: Transcription saved to:\n{output_path}")
+            write_start = time.time()
+            outputs = writers.write_outputs(store, base_name, self.get_output_formats())
+            store.save(segment_store.cache_path(current_file))
+            self.job_stats["write"] = time.time() - write_start
+            if job:
+                self.job_store.mark_done(job["id"], {"outputs": outputs, "duration": duration})
+            self.index_transcript(current_file, store)
+            output_list = "\n".join(outputs.values())
+            self.log_message(f"SUCCESS: Transcription saved to:\n{output_list}")
             self.log_message(f"Time taken: {time_str}")
-            self.show_transcription_result(text)
-            
-            # Only show popup if it's the last file
-            if len(self.file_queue) <= 1:
-                # Format total duration
-                total_minutes, total_seconds = divmod(self.batch_total_duration, 60)
-                if total_minutes > 0:
-                    total_time_str = f"{int(total_minutes)}m {int(total_seconds)}s"
-                else:
-                    total_time_str = f"{self.batch_total_duration:.1f}s"
-                
-                msg = f"Transcription completed successfully!\n\nProcessed: {self.batch_total_files} files\nTotal Time: {total_time_str}"
-                messagebox.showinfo("Batch Complete", msg)
+            self.record_manifest(job, "done", language=detected_language)
+            self.show_transcription_result(store)
         except Exception as e:
+            if job:
+                self.job_store.mark_failed(job["id"], f"Could not save file: {e}")
             self.log_message(f"Error saving file: {e}")
-            messagebox.showerror("Error", f"Could not save file: {e}")
+            self.record_manifest(job, "failed", language=detected_language, error=f"Could not save file: {e}")
+            self.batch_failures.append((current_file, f"Could not save file: {e}"))
         
         # Remove processed file from queue
         if self.file_queue:
@@ -931,28 +1609,147 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         # Process next
         self.process_next_in_queue()
 
-    def handle_error(self, error_msg):
-        if "Expecting value" in error_msg or "JSONDecodeError" in error_msg:
+    def handle_error(self, error_msg, worker_killed=False):
+        self.end_download_progress()
+        if any(marker in error_msg for marker in ("Expecting value", "JSONDecodeError", "not a model description", "proxy/firewall page")):
             model_url = f"https://huggingface.co/{self.model_var.get()}"
             error_msg += f"\n\nPossible Cause: Corporate Firewall (Cisco Umbrella) is blocking Hugging Face.\n\nSOLUTION:\n1. Open this URL in your browser:\n{model_url}\n2. Click 'Continue' on the warning page.\n3. Try again."
         
         self.log_message(f"ERROR: {error_msg}")
-        
-        # If batch processing, ask to continue
-        if len(self.file_queue) > 1:
-            if not messagebox.askyesno("Error", f"An error occurred:\n{error_msg}\n\nContinue with next file?"):
-                self.reset_ui()
-                return
-        else:
-            messagebox.showerror("Error", f"An error occurred:\n{error_msg}")
-            
-        # Remove failed file from queue
-        if self.file_queue:
-            self.file_queue.pop(0)
-            
+        self.job_deadline = None
+
+        job = self.file_queue[0] if self.file_queue else None
+        if not job:
+            self.reset_ui()
+            return
+        self.job_store.mark_failed(job["id"], error_msg)
+
+        # Apply the failure policy without blocking on a dialog
+        policy = self.failure_policy_var.get()
+        attempts = self.job_store.get(job["id"])["attempts"]
+        if batch_policy.should_retry(policy, attempts, self.max_retries):
+            delay = batch_policy.backoff_delay(attempts)
+            self.log_message(f"Retrying in {delay:.0f}s (attempt {attempts + 1} of {self.max_retries + 1})...")
+            self.retry_after_id = self.after(int(delay * 1000), self.process_next_in_queue)
+            return
+
+        # A killed worker sends nothing more (and the queue now belongs to its replacement)
+        if not worker_killed:
+            self.drain_stats()
+        self.record_manifest(job, "failed", error=error_msg)
+        self.batch_failures.append((job["path"], error_msg))
+        self.file_queue.pop(0)
+
+        if policy == batch_policy.STOP:
+            self.log_message("[Stopped] Batch stopped because of the error above (policy: Stop).")
+            self.finish_batch()
+            return
+
         # Process next
         self.process_next_in_queue()
 
+    def index_transcript(self, source_path, store):
+        """Add a finished transcript to the search index."""
+        try:
+            self.transcript_index.add_transcript(source_path, store, self.job_model)
+        except Exception as e:
+            self.log_message(f"Could not update search index: {e}")
+
+    def search_transcripts(self):
+        query = self.search_entry.get().strip()
+        if not query:
+            return
+        try:
+            hits = self.transcript_index.search(query, limit=200)
+        except Exception as e:
+            hits = []
+            self.log_message(f"Search failed: {e}")
+
+        self.search_textbox.configure(state="normal")
+        self.search_textbox.delete("0.0", "end")
+        self.search_textbox.insert("end", f"{len(hits)} match(es) for '{query}' (click a match to open it)\n\n")
+        for i, hit in enumerate(hits):
+            tag = f"hit{i}"
+            self.search_textbox.insert("end", f"{hit['source_path']}\n  [{format_ms(hit['start_ms'])}] {hit['text']}\n", tag)
+            self.search_textbox.tag_bind(tag, "<Button-1>", lambda _, h=hit: self.open_search_hit(h))
+        self.search_textbox.configure(state="disabled")
+
+    def open_search_hit(self, hit):
+        """Show the transcript of a search hit in the Result tab, scrolled to the match."""
+        path = segment_store.cache_path(hit["source_path"])
+        if not os.path.exists(path):
+            self.log_message(f"Transcript data not available for: {hit['source_path']}")
+            return
+        try:
+            store = SegmentStore.load(path)
+        except Exception as e:
+            self.log_message(f"Could not open transcript: {e}")
+            return
+        self.show_transcription_result(store)
+        self.result_viewer.jump_to_time(hit["start_ms"] / 1000)
+
+    def drain_stats(self):
+        """
+        Pick up stats the worker has already sent for the finished job, without blocking.
+        Other messages read on the way are left for check_queue to handle in order.
+        """
+        try:
+            while "peak_memory" not in self.job_stats and self.result_queue is not None:
+                msg_type, content = self.result_queue.get_nowait()
+                if msg_type == "stats":
+                    self.job_stats.update(content)
+                else:
+                    self.deferred_messages.append((msg_type, content))
+        except queue.Empty:
+            pass
+
+    def record_manifest(self, job, status, language=None, error=None):
+        """Append the current file to the run manifest."""
+        if not self.run_manifest or not job:
+            return
+        # The job's own settings: the dropdowns may have changed while it ran
+        language_code = self.job_language_code
+        try:
+            self.run_manifest.write(
+                source_path=job["path"],
+                model=self.job_model,
+                precision=self.job_precision,
+                status=status,
+                stats=self.job_stats,
+                language=language_code or language,
+                language_forced=language_code is not None,
+                # The store counts failed runs; a successful one is a run too
+                attempts=self.job_store.get(job["id"])["attempts"] + (status == "done"),
+                error=error
+            )
+        except Exception as e:
+            self.log_message(f"Could not write run manifest: {e}")
+
+    def finish_batch(self):
+        """Log the batch summary and failure report, then show a single popup."""
+        # Format total duration
+        total_minutes, total_seconds = divmod(self.batch_total_duration, 60)
+        if total_minutes > 0:
+            total_time_str = f"{int(total_minutes)}m {int(total_seconds)}s"
+        else:
+            total_time_str = f"{self.batch_total_duration:.1f}s"
+
+        succeeded = self.batch_total_files - len(self.batch_failures) - len(self.file_queue)
+        self.log_message("Batch processing complete.")
+        self.reset_ui()
+
+        if not self.batch_failures:
+            msg = f"Transcription completed successfully!\n\nProcessed: {self.batch_total_files} files\nTotal Time: {total_time_str}"
+            messagebox.showinfo("Batch Complete", msg)
+            return
+
+        report = batch_policy.format_failure_report(self.batch_failures)
+        self.log_message(f"\n{report}")
+        msg = f"Succeeded: {succeeded} of {self.batch_total_files} files\nTotal Time: {total_time_str}\n\n{report}"
+        if self.file_queue:
+            msg += f"\n\n{len(self.file_queue)} file(s) were not processed."
+        messagebox.showerror("Batch Finished With Errors", msg)
+
     def log_message_no_newline(self, message):
         self.log_textbox.configure(state="normal")
         self.log_textbox.insert("end", message)
@@ -963,16 +1760,17 @@ class App(ctk.CTk, tkinterdnd2.TkinterDnD.DnDWrapper):
         # Deprecated, replaced by transcription_worker
         pass
 
-    def show_transcription_result(self, text):
-        self.result_textbox.delete("0.0", "end")
-        self.result_textbox.insert("0.0", text)
+    def show_transcription_result(self, store):
+        self.result_viewer.set_store(store)
         self.tabview.set("Result")
 
     def reset_ui(self):
         self.is_transcribing = False
+        self.job_deadline = None
         self.transcribe_button.configure(text="Start Transcription", fg_color=["#3B8ED0", "#1F6AA5"], hover_color=["#36719F", "#144870"], command=self.start_transcription_thread)
         self.browse_button.configure(state="normal")
         self.progress_bar.stop()
+        self.progress_bar.configure(mode="indeterminate")
         self.progress_bar.pack_forget()
 
 if __name__ == "__main__":
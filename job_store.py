@@ -0,0 +1,143 @@
+"""
+Durable job store for batch transcription.
+Jobs are kept in a small SQLite database (WAL mode) so that a batch survives
+quitting the app or a crash of the GUI process.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+JOB_DB_FILE = os.path.expanduser("~/.mlx_whisper_jobs.db")
+
+# Finished jobs are pruned at startup once they are this old (seconds)
+FINISHED_JOB_MAX_AGE = 30 * 24 * 3600
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    path        TEXT NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'queued',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    model       TEXT,
+    language    TEXT,
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state, id);
+"""
+
+
+class JobStore:
+    """SQLite-backed queue of transcription jobs."""
+
+    def __init__(self, path=JOB_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def add_jobs(self, paths):
+        """Append files to the queue. Returns the new jobs in order."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                ids = [
+                    self._conn.execute(
+                        "INSERT INTO jobs (path, state, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                        (path, QUEUED, now, now),
+                    ).lastrowid
+                    for path in paths
+                ]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [self.get(job_id) for job_id in ids]
+
+    def get(self, job_id):
+        return self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def pending_jobs(self):
+        """Jobs that still have to run, oldest first."""
+        return self._execute(
+            "SELECT * FROM jobs WHERE state IN (?, ?) ORDER BY id", (QUEUED, RUNNING)
+        ).fetchall()
+
+    def requeue_interrupted(self):
+        """
+        Put jobs left in 'running' by a crash or quit back into the queue.
+        Call once at startup, before any worker is started.
+        """
+        cur = self._execute(
+            "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?",
+            (QUEUED, time.time(), RUNNING),
+        )
+        return cur.rowcount
+
+    def mark_running(self, job_id, model=None, language=None):
+        self._execute(
+            "UPDATE jobs SET state = ?, model = ?, language = ?, "
+            "error = NULL, updated_at = ? WHERE id = ?",
+            (RUNNING, model, language, time.time(), job_id),
+        )
+
+    def mark_queued(self, job_id):
+        """Return a job to the queue without counting it as finished (e.g. stopped by the user)."""
+        self._execute(
+            "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ?",
+            (QUEUED, time.time(), job_id),
+        )
+
+    def mark_done(self, job_id, result=None):
+        self._execute(
+            "UPDATE jobs SET state = ?, result = ?, error = NULL, updated_at = ? WHERE id = ?",
+            (DONE, json.dumps(result) if result is not None else None, time.time(), job_id),
+        )
+
+    def mark_failed(self, job_id, error):
+        """Only failed runs count as attempts, so a job stopped and resumed keeps its retry budget."""
+        self._execute(
+            "UPDATE jobs SET state = ?, attempts = attempts + 1, error = ?, updated_at = ? WHERE id = ?",
+            (FAILED, error, time.time(), job_id),
+        )
+
+    def cancel(self, job_ids):
+        """Drop jobs that have not finished (e.g. the user replaced or stopped the batch)."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        placeholders = ",".join("?" * len(job_ids))
+        self._execute(
+            f"DELETE FROM jobs WHERE state IN (?, ?) AND id IN ({placeholders})",
+            (QUEUED, RUNNING, *job_ids),
+        )
+
+    def clear_finished(self, older_than=None):
+        """Remove done/failed jobs, optionally only those finished before a timestamp."""
+        cutoff = older_than if older_than is not None else time.time()
+        self._execute(
+            "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at <= ?",
+            (DONE, FAILED, cutoff),
+        )
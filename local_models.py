@@ -0,0 +1,241 @@
+"""
+Discovery and index of local (manually downloaded) model folders.
+A model folder is any directory containing config.json. Folders are found
+with os.scandir up to a depth limit, on a background thread, and recorded in
+a small SQLite database together with their config metadata (dimensions,
+quantization, weight size). The GUI fills the model dropdown from the index
+at once and refreshes it as a scan finds changes.
+
+Each scanned directory's mtime and subdirectories are stored as well, so a
+rescan of an unchanged tree re-lists nothing and only re-reads configs whose
+mtime changed.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+LOCAL_MODELS_DB_FILE = os.path.expanduser("~/.mlx_whisper_local_models.db")
+
+# How deep below the selected folder to look for model folders
+DEFAULT_MAX_DEPTH = 4
+# Stop a single scan after this many directories (e.g. a whole shared drive)
+MAX_DIRS = 20000
+
+WEIGHT_EXTENSIONS = (".safetensors", ".npz")
+
+# Written next to a quantized variant by quantize_model
+QUANTIZATION_REPORT_FILE = "quantization_report.json"
+
+# Whisper dimensions kept from config.json
+DIM_KEYS = [
+    "n_mels", "n_audio_ctx", "n_audio_state", "n_audio_head", "n_audio_layer",
+    "n_vocab", "n_text_ctx", "n_text_state", "n_text_head", "n_text_layer",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    path          TEXT PRIMARY KEY,
+    size          INTEGER NOT NULL,
+    dims          TEXT,
+    quantization  TEXT,
+    config_mtime  INTEGER NOT NULL,
+    last_seen     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path      TEXT PRIMARY KEY,
+    mtime     INTEGER NOT NULL,
+    subdirs   TEXT NOT NULL,
+    is_model  INTEGER NOT NULL
+);
+"""
+
+
+def quantization_comparison(path):
+    """Measured memory and speed of a quantized variant relative to its source model, or None without a report."""
+    try:
+        with open(os.path.join(path, QUANTIZATION_REPORT_FILE), "r") as f:
+            report = json.load(f)
+        original, quantized = report["original"], report["quantized"]
+        memory = quantized["resident_memory"] / original["resident_memory"]
+        speed = original["inference"] / quantized["inference"]
+    except (OSError, ValueError, KeyError, TypeError, ZeroDivisionError):
+        return None
+    return f"x{memory:.2f} memory, x{speed:.2f} speed vs original"
+
+
+def describe(model):
+    """One-line summary of an indexed model for the UI."""
+    parts = []
+    dims = model.get("dims") or {}
+    if dims.get("n_audio_layer") is not None:
+        parts.append(f"{dims['n_audio_layer']}+{dims.get('n_text_layer', '?')} layers")
+    if dims.get("n_text_state") is not None:
+        parts.append(f"width {dims['n_text_state']}")
+    if dims.get("n_mels") is not None:
+        parts.append(f"{dims['n_mels']} mels")
+    quantization = model.get("quantization")
+    if quantization:
+        parts.append(f"{quantization.get('bits', '?')}-bit (group {quantization.get('group_size', '?')})")
+        comparison = quantization_comparison(model["path"])
+        if comparison:
+            parts.append(comparison)
+    if model.get("size"):
+        parts.append(f"{model['size'] / 1024 ** 3:.2f} GB")
+    return "Local Model: " + (", ".join(parts) if parts else "details unknown")
+
+
+class LocalModelIndex:
+    """SQLite-backed index of discovered local model folders."""
+
+    def __init__(self, path=LOCAL_MODELS_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    @staticmethod
+    def _model(row):
+        return {
+            "path": row["path"],
+            "size": row["size"],
+            "dims": json.loads(row["dims"]) if row["dims"] else {},
+            "quantization": json.loads(row["quantization"]) if row["quantization"] else None,
+            "last_seen": row["last_seen"],
+        }
+
+    def models(self, root=None):
+        """Indexed models (optionally only those under `root`), sorted by path."""
+        if root:
+            root = os.path.abspath(root)
+            rows = self._execute(
+                "SELECT * FROM models WHERE path = ? OR substr(path, 1, ?) = ? ORDER BY path",
+                (root, len(root) + 1, root.rstrip(os.sep) + os.sep),
+            ).fetchall()
+        else:
+            rows = self._execute("SELECT * FROM models ORDER BY path").fetchall()
+        return [self._model(row) for row in rows]
+
+    def get(self, path):
+        row = self._execute("SELECT * FROM models WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        return self._model(row) if row else None
+
+    def remove(self, paths):
+        with self._lock:
+            self._conn.executemany("DELETE FROM models WHERE path = ?", [(path,) for path in paths])
+
+    def prune_missing(self):
+        """Drop indexed models whose config.json is gone. Returns the removed paths."""
+        missing = [model["path"] for model in self.models() if not os.path.isfile(os.path.join(model["path"], "config.json"))]
+        self.remove(missing)
+        return missing
+
+    def _read_model(self, path, config_mtime):
+        """Read config metadata and weight size of a model folder into the index."""
+        dims, quantization = {}, None
+        try:
+            with open(os.path.join(path, "config.json"), "r") as f:
+                config = json.load(f)
+            dims = {key: config[key] for key in DIM_KEYS if key in config}
+            quantization = config.get("quantization")
+        except (OSError, ValueError):
+            pass
+        size = 0
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(WEIGHT_EXTENSIONS) and entry.is_file():
+                        size += entry.stat().st_size
+        except OSError:
+            pass
+        self._execute(
+            "INSERT OR REPLACE INTO models (path, size, dims, quantization, config_mtime, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, size, json.dumps(dims), json.dumps(quantization) if quantization else None, config_mtime, time.time()),
+        )
+        return self.get(path)
+
+    def _model_at(self, path):
+        """Index entry for a model folder, re-read only if its config.json changed."""
+        try:
+            config_mtime = os.stat(os.path.join(path, "config.json")).st_mtime_ns
+        except OSError:
+            return None
+        row = self._execute("SELECT config_mtime FROM models WHERE path = ?", (path,)).fetchone()
+        if row and row["config_mtime"] == config_mtime:
+            self._execute("UPDATE models SET last_seen = ? WHERE path = ?", (time.time(), path))
+            return self.get(path)
+        return self._read_model(path, config_mtime)
+
+    def _list_dir(self, path, mtime):
+        """(subdirectories, has config.json) of a directory, from the index if its mtime is unchanged."""
+        row = self._execute("SELECT mtime, subdirs, is_model FROM dirs WHERE path = ?", (path,)).fetchone()
+        if row and row["mtime"] == mtime:
+            return json.loads(row["subdirs"]), bool(row["is_model"])
+
+        subdirs, is_model = [], False
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == "config.json" and entry.is_file():
+                    is_model = True
+                # Hidden folders and symlinks (possible loops) are not followed
+                elif not entry.name.startswith(".") and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+        subdirs.sort()
+        self._execute(
+            "INSERT OR REPLACE INTO dirs (path, mtime, subdirs, is_model) VALUES (?, ?, ?, ?)",
+            (path, mtime, json.dumps(subdirs), int(is_model)),
+        )
+        return subdirs, is_model
+
+    def discover(self, root, max_depth=DEFAULT_MAX_DEPTH, on_model=None, should_stop=None):
+        """
+        Find model folders under `root` (the folder itself counts), calling
+        on_model(model) as each is found. Model folders are not searched further.
+        Index entries under `root` that were not found again are removed.
+        Returns the models found, in path order.
+        """
+        root = os.path.abspath(root)
+        found = []
+        stack = [(root, 0)]
+        scanned = 0
+        while stack and scanned < MAX_DIRS:
+            if should_stop and should_stop():
+                return found
+            path, depth = stack.pop()
+            scanned += 1
+            try:
+                subdirs, is_model = self._list_dir(path, os.stat(path).st_mtime_ns)
+            except OSError:
+                continue
+
+            if is_model:
+                model = self._model_at(path)
+                if model:
+                    found.append(model)
+                    if on_model:
+                        on_model(model)
+                continue
+            if depth < max_depth:
+                # Reversed so the stack visits subfolders in name order
+                stack.extend((os.path.join(path, name), depth + 1) for name in reversed(subdirs))
+
+        if not stack:
+            # Complete scan: forget models within reach of this scan that have gone away
+            found_paths = {model["path"] for model in found}
+            self.remove([
+                model["path"] for model in self.models(root)
+                if model["path"] not in found_paths and os.path.relpath(model["path"], root).count(os.sep) < max_depth
+            ])
+        found.sort(key=lambda model: model["path"])
+        return found
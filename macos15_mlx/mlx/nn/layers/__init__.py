@@ -90,6 +90,8 @@ from mlx.nn.layers.positional_encoding import ALiBi, RoPE, SinusoidalPositionalE
 from mlx.nn.layers.quantized import QuantizedEmbedding, QuantizedLinear, quantize
 from mlx.nn.layers.recurrent import GRU, LSTM, RNN
 from mlx.nn.layers.transformer import (
+    KVCache,
+    MemoryKVCache,
     MultiHeadAttention,
     Transformer,
     TransformerDecoder,
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import json
+import struct
 import textwrap
-from typing import Any, Callable, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import mlx.core as mx
-from mlx.utils import tree_flatten, tree_unflatten
+from mlx.utils import tree_flatten
+
+# Loaded ``.safetensors`` tensors are evaluated in groups of about this many
+# bytes, so the previous parameter values can be released while loading.
+_STREAM_EVAL_BYTES = 256 * 1024 * 1024
 
 
 class Module(dict):
@@ -58,6 +64,11 @@ class Module(dict):
 
     __call__: Callable
 
+    # Bumped whenever any module tree changes shape (a member is added,
+    # removed or replaced by something other than an array). Cached
+    # parameter indices built at an older version are rebuilt.
+    _structure_version = 0
+
     def __init__(self):
         """Should be called by the subclasses of ``Module``."""
         self._no_grad = set()
@@ -112,7 +123,19 @@ class Module(dict):
             self[key] = val
         else:
             super(Module, self).__setattr__(key, val)
-            self.pop(key, None)
+            if self.pop(key, None) is not None:
+                Module._structure_version += 1
+
+    def __setitem__(self, key, val):
+        # Swapping one array for another keeps the structure (and any cached
+        # parameter index) intact; everything else invalidates it.
+        if not (isinstance(val, mx.array) and isinstance(self.get(key), mx.array)):
+            Module._structure_version += 1
+        super().__setitem__(key, val)
+
+    def __delitem__(self, key):
+        Module._structure_version += 1
+        super().__delitem__(key)
 
     def __delattr__(self, name):
         if (val := self.get(name, None)) is not None:
@@ -124,6 +147,7 @@ class Module(dict):
         self,
         file_or_weights: Union[str, List[Tuple[str, mx.array]]],
         strict: bool = True,
+        dtype: Optional[mx.Dtype] = None,
     ) -> Module:
         """
         Update the model's weights from a ``.npz``, a ``.safetensors`` file, or a list.
@@ -136,6 +160,10 @@ class Module(dict):
               weights exactly match the parameters of the model. Otherwise,
               only the weights actually contained in the model are loaded and
               shapes are not checked. Default: ``True``.
+            dtype (Dtype, optional): If given, floating point weights are cast
+              to this type as they are loaded. For a ``.safetensors`` file
+              each tensor is cast as it is read, so the weights are never
+              held at their stored precision all at once. Default: ``None``.
 
         Returns:
             The module instance after updating the weights.
@@ -173,37 +201,119 @@ class Module(dict):
                 model.load_weights(weights, strict=False)
         """
         weights = file_or_weights
+        if isinstance(weights, str) and weights.endswith(".safetensors"):
+            return self._load_safetensors(weights, strict, dtype)
         if isinstance(weights, str):
             weights = list(mx.load(weights).items())
 
         if strict:
             new_weights = dict(weights)
-            curr_weights = tree_flatten(self.parameters(), destination={})
-            if extras := (new_weights.keys() - curr_weights.keys()):
-                num_extra = len(extras)
-                extras = ",\n".join(sorted(extras))
-                raise ValueError(
-                    f"Received {num_extra} parameters not in model: \n{extras}."
-                )
-            if missing := (curr_weights.keys() - new_weights.keys()):
-                num_missing = len(missing)
-                missing = ",\n".join(sorted(missing))
-                raise ValueError(f"Missing {num_missing} parameters: \n{missing}.")
-            for k, v in curr_weights.items():
-                v_new = new_weights[k]
+            for k, v_new in new_weights.items():
                 if not isinstance(v_new, mx.array):
                     raise ValueError(
                         "Expected mx.array but received "
                         f"{type(v_new)} for parameter {k}"
                     )
-                if v_new.shape != v.shape:
-                    raise ValueError(
-                        f"Expected shape {v.shape} but received "
-                        f"shape {v_new.shape} for parameter {k}"
-                    )
+            self._check_weight_shapes({k: v.shape for k, v in new_weights.items()})
+
+        locations = self._parameter_locations()
+        for k, v in weights:
+            _set_parameter(locations, k, _cast(v, dtype))
+        return self
+
+    def _parameter_locations(self) -> Dict[str, Tuple[Any, Union[str, int]]]:
+        """Map each dotted parameter name to the ``(container, key)`` holding
+        it.
+
+        The map is cached until a module tree changes structure (see
+        ``_structure_version``), so repeated lookups do not re-flatten the
+        parameters. Replacing arrays does not invalidate it. Lists and dicts
+        nested in a module are not tracked by the version, so their contents
+        are compared with a snapshot taken when the map was built and the map
+        is rebuilt if any of them was edited in place.
+        """
+        # Keyed on id(self) too, so a copied module does not reuse the
+        # locations of the original
+        key = (Module._structure_version, id(self))
+        cached = self.__dict__.get("_locations_cache")
+        if cached is not None and cached[0] == key:
+            _, locations, snapshots = cached
+            if all(_unchanged(c, snapshot) for c, snapshot in snapshots):
+                return locations
+        locations = {}
+        snapshots = []
+        _index_parameters(self, "", locations, snapshots)
+        self.__dict__["_locations_cache"] = (key, locations, snapshots)
+        return locations
+
+    def parameter_index(self) -> Dict[str, Tuple[Tuple[int, ...], mx.Dtype]]:
+        """Return the shape and dtype of every parameter by dotted name.
+
+        Unlike ``tree_flatten(module.parameters())`` this reuses a cached
+        index of where the parameters live and only reads the arrays.
+
+        Returns:
+            A dict from parameter name to ``(shape, dtype)``.
+        """
+        return {
+            k: (container[i].shape, container[i].dtype)
+            for k, (container, i) in self._parameter_locations().items()
+        }
+
+    def _check_weight_shapes(self, new_shapes: dict):
+        """Check that ``new_shapes`` (parameter name to shape) exactly matches
+        the parameters of the model."""
+        locations = self._parameter_locations()
+        if extras := (new_shapes.keys() - locations.keys()):
+            num_extra = len(extras)
+            extras = ",\n".join(sorted(extras))
+            raise ValueError(
+                f"Received {num_extra} parameters not in model: \n{extras}."
+            )
+        if missing := (locations.keys() - new_shapes.keys()):
+            num_missing = len(missing)
+            missing = ",\n".join(sorted(missing))
+            raise ValueError(f"Missing {num_missing} parameters: \n{missing}.")
+        for k, (container, i) in locations.items():
+            shape = container[i].shape
+            if tuple(new_shapes[k]) != tuple(shape):
+                raise ValueError(
+                    f"Expected shape {shape} but received "
+                    f"shape {tuple(new_shapes[k])} for parameter {k}"
+                )
+
+    def _load_safetensors(
+        self, file: str, strict: bool, dtype: Optional[mx.Dtype] = None
+    ) -> Module:
+        """Stream the weights of a ``.safetensors`` file into the model.
 
-        if len(weights) != 0:
-            self.update(tree_unflatten(weights), strict=False)
+        The file header is read first so ``strict`` validation needs no tensor
+        data. Tensors are then assigned one at a time in file order and
+        evaluated in groups of about ``_STREAM_EVAL_BYTES``, so at most one
+        group is read ahead of the parameters it replaces. With ``dtype``
+        floating point tensors are cast right after they are read.
+        """
+        index = _safetensors_index(file)
+        if strict:
+            self._check_weight_shapes({k: shape for k, _, shape, _ in index})
+
+        # Arrays returned by mx.load are only read from the file when evaluated
+        arrays = mx.load(file)
+        locations = self._parameter_locations()
+        pending = []
+        pending_bytes = 0
+        for k, _, _, nbytes in index:
+            value = _cast(arrays.pop(k), dtype)
+            if not _set_parameter(locations, k, value):
+                continue
+            pending.append(value)
+            pending_bytes += nbytes
+            if pending_bytes >= _STREAM_EVAL_BYTES:
+                mx.eval(pending)
+                pending = []
+                pending_bytes = 0
+        if pending:
+            mx.eval(pending)
         return self
 
     def save_weights(self, file: str):
@@ -348,6 +458,8 @@ class Module(dict):
                                 f"Received invalid type: {type(new_value).__name__}."
                             )
                         dst[i] = new_value
+                        if not isinstance(new_value, mx.array):
+                            Module._structure_version += 1
                     else:
                         apply(current_value, new_value)
             elif strict:
@@ -402,6 +514,45 @@ class Module(dict):
         _update_modules(self, modules, strict)
         return self
 
+    def replace_leaf_modules(
+        self, replace_fn: Callable[[str, Module], Module]
+    ) -> Module:
+        """Replace leaf modules (those without submodules) in a single pass.
+
+        ``replace_fn`` is called with the dotted path and the module for
+        every leaf module below this instance, and returns the module to put
+        in its place (the same module to keep it). This is the equivalent of
+        mapping over :meth:`leaf_modules` and calling :meth:`update_modules`
+        with the result, without building either tree.
+
+        Args:
+            replace_fn (Callable): Given a path and a leaf module, return its
+                replacement.
+
+        Returns:
+            The module instance after replacing the leaf modules.
+        """
+        replaced = False
+        stack = [("", self, None, None)]
+        while stack:
+            path, module, container, key = stack.pop()
+            children = _child_modules(module, path)
+            if children or container is None:
+                stack.extend(reversed(children))
+                continue
+            new_module = replace_fn(path, module)
+            if new_module is not module:
+                if not Module.is_module(new_module):
+                    raise ValueError(
+                        f"Received invalid type: {type(new_module).__name__}."
+                    )
+                container[key] = new_module
+                replaced = True
+        if replaced:
+            # Lists are not Modules, so replacements in them are not tracked
+            Module._structure_version += 1
+        return self
+
     def apply_to_modules(self, apply_fn: Callable[[str, Module], Any]) -> Module:
         """Apply a function to all the modules in this instance (including this
         instance).
@@ -605,6 +756,95 @@ class Module(dict):
         self.apply(lambda x: x.astype(dtype) if predicate(x.dtype) else x)
 
 
+def _safetensors_index(file: str) -> List[Tuple[str, str, Tuple[int, ...], int]]:
+    """Read the header of a ``.safetensors`` file without loading tensor data.
+
+    Returns:
+        A list of ``(name, dtype, shape, nbytes)`` tuples in file order.
+    """
+    with open(file, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+    header.pop("__metadata__", None)
+    index = []
+    for k, v in sorted(header.items(), key=lambda kv: kv[1]["data_offsets"][0]):
+        start, end = v["data_offsets"]
+        index.append((k, v["dtype"], tuple(v["shape"]), end - start))
+    return index
+
+
+def _child_modules(module, path):
+    """Return ``(path, child, container, key)`` for the closest modules below
+    ``module``, found through its dicts and lists like :meth:`Module.children`."""
+    found = []
+    stack = [(f"{path}." if path else "", module, iter(module.items()))]
+    while stack:
+        prefix, container, items = stack[-1]
+        for k, v in items:
+            if not isinstance(v, (dict, list)):
+                continue
+            if Module.is_module(v):
+                found.append((f"{prefix}{k}", v, container, k))
+            else:
+                items = enumerate(v) if isinstance(v, list) else iter(v.items())
+                stack.append((f"{prefix}{k}.", v, items))
+                break
+        else:
+            stack.pop()
+    return found
+
+
+def _index_parameters(container, prefix, locations, snapshots):
+    """Record the location of every parameter below ``container``, following
+    the same rules as :meth:`Module.parameters`, and a snapshot of every
+    list and dict (other than modules) it passes through."""
+    if isinstance(container, list):
+        snapshots.append((container, list(container)))
+    elif not isinstance(container, Module):
+        snapshots.append((container, dict(container)))
+    items = enumerate(container) if isinstance(container, list) else container.items()
+    for k, v in items:
+        if isinstance(container, Module) and not Module.valid_parameter_filter(
+            container, k, v
+        ):
+            continue
+        if isinstance(v, mx.array):
+            locations[f"{prefix}{k}"] = (container, k)
+        elif isinstance(v, (dict, list)):
+            _index_parameters(v, f"{prefix}{k}.", locations, snapshots)
+
+
+def _unchanged(container, snapshot):
+    """Whether a list or dict still holds exactly the objects in ``snapshot``."""
+    if len(container) != len(snapshot):
+        return False
+    if isinstance(container, list):
+        return all(a is b for a, b in zip(container, snapshot))
+    return all(k in container and container[k] is v for k, v in snapshot.items())
+
+
+def _cast(value, dtype):
+    """Cast floating point arrays to ``dtype`` (if given), like :meth:`Module.set_dtype`."""
+    if dtype is None or not isinstance(value, mx.array):
+        return value
+    if not mx.issubdtype(value.dtype, mx.floating) or value.dtype == dtype:
+        return value
+    return value.astype(dtype)
+
+
+def _set_parameter(locations, key, value):
+    """Replace the parameter ``key`` with ``value``.
+
+    Returns ``False`` (and changes nothing) if the model has no such array,
+    matching ``Module.update(..., strict=False)``.
+    """
+    if (location := locations.get(key)) is None:
+        return False
+    container, k = location
+    container[k] = value
+    return True
+
+
 def _update_modules(dst, modules, strict):
     if isinstance(modules, dict):
         for k in modules:
@@ -627,6 +867,7 @@ def _update_modules(dst, modules, strict):
             new_value = modules[i]
             if Module.is_module(current_value) and Module.is_module(new_value):
                 dst[i] = new_value
+                Module._structure_version += 1
             elif isinstance(current_value, (dict, list)):
                 _update_modules(current_value, new_value, strict)
             elif strict and new_value != {}:
@@ -72,8 +72,19 @@ class SinusoidalPositionalEncoding(Module):
             instead of the reverse. Default: ``False``.
         full_turns (bool, optional): If ``True`` multiply the frequencies with
             :math:`2\pi`. Default: ``False``.
+        max_position (int, optional): If given, integer positions are looked
+            up in a precomputed table of at least this many positions instead
+            of computing ``sin`` and ``cos`` on every call. Positions must be
+            below the table size. Default: ``None``.
+
+    The table (see :meth:`table` and :meth:`encode`) is computed on first use,
+    grown when larger positions are requested and shared by all encodings
+    with the same configuration.
     """
 
+    # Configuration -> encodings of positions 0, 1, ..., shared by instances
+    _tables = {}
+
     def __init__(
         self,
         dims: int,
@@ -82,9 +93,16 @@ class SinusoidalPositionalEncoding(Module):
         scale: Optional[float] = None,
         cos_first: bool = False,
         full_turns: bool = False,
+        max_position: Optional[int] = None,
     ):
         super().__init__()
 
+        self.dims = dims
+        self.min_freq = min_freq
+        self.max_freq = max_freq
+        self.full_turns = full_turns
+        self.max_position = max_position
+
         one_zero = 1 - mx.arange(0, dims // 2) / (dims // 2 - 1)
         min_freq = math.log(min_freq)
         max_freq = math.log(max_freq)
@@ -98,7 +116,39 @@ class SinusoidalPositionalEncoding(Module):
         self.scale = scale or (2 / dims) ** 0.5
         self.cos_first = cos_first
 
+    def _table_key(self):
+        return (
+            self.dims,
+            self.min_freq,
+            self.max_freq,
+            self.scale,
+            self.cos_first,
+            self.full_turns,
+        )
+
+    def table(self, size: int) -> mx.array:
+        """Return a table with the encodings of (at least) positions ``0`` to
+        ``size - 1``, growing the shared table if it is smaller."""
+        key = self._table_key()
+        table = SinusoidalPositionalEncoding._tables.get(key)
+        if table is None or table.shape[0] < size:
+            # Grow geometrically so increasing positions rebuild it rarely
+            current = 0 if table is None else table.shape[0]
+            table = self._encode(mx.arange(max(size, 2 * current)))
+            SinusoidalPositionalEncoding._tables[key] = table
+        return table
+
+    def encode(self, offset: int, length: int) -> mx.array:
+        """Return the encodings of positions ``offset`` to ``offset + length - 1``
+        as a slice of the precomputed table."""
+        return self.table(offset + length)[offset : offset + length]
+
     def __call__(self, x):
+        if self.max_position is not None and mx.issubdtype(x.dtype, mx.integer):
+            return self.table(self.max_position)[x]
+        return self._encode(x)
+
+    def _encode(self, x):
         y = x[..., None] * self._sigmas
         cosy = mx.cos(y)
         siny = mx.sin(y)
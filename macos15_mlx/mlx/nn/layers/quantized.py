@@ -5,7 +5,6 @@ from typing import Callable, Optional, Union
 
 import mlx.core as mx
 from mlx.nn.layers.base import Module
-from mlx.utils import tree_map_with_path
 
 
 def quantize(
@@ -56,9 +55,7 @@ def quantize(
         else:
             return m
 
-    leaves = model.leaf_modules()
-    leaves = tree_map_with_path(_maybe_quantize, leaves, is_leaf=Module.is_module)
-    model.update_modules(leaves)
+    model.replace_leaf_modules(_maybe_quantize)
 
 
 class QuantizedEmbedding(Module):
@@ -1,7 +1,7 @@
 # Copyright © 2023 Apple Inc.
 
 import math
-from typing import Any, Callable, Optional
+from typing import Any, Callable, List, Optional, Tuple
 
 import mlx.core as mx
 from mlx.nn.layers.activations import relu
@@ -12,6 +12,84 @@ from mlx.nn.layers.normalization import LayerNorm
 from mlx.nn.utils import checkpoint
 
 
+class KVCache:
+    """Keys and values of the positions attended to so far, for incremental
+    (autoregressive) decoding with :class:`MultiHeadAttention`.
+
+    Storage is preallocated in blocks of ``step`` positions and new keys and
+    values are written in place, so decoding one token does not copy the
+    whole cache. The cache only grows (by another block) when it is full.
+
+    .. code-block:: python
+
+        cache = nn.KVCache()
+        for x in tokens:  # x has shape (batch, 1, dims)
+            y = attention(x, x, x, cache=cache)
+
+    Args:
+        step (int, optional): The number of positions allocated at a time.
+            Default: ``256``.
+    """
+
+    def __init__(self, step: int = 256):
+        self.step = step
+        self.keys = None
+        self.values = None
+        self.offset = 0
+
+    def update_and_fetch(
+        self, keys: mx.array, values: mx.array
+    ) -> Tuple[mx.array, mx.array]:
+        """Append keys and values of shape ``(batch, num_heads, L, head_dims)``
+        and return the keys and values of all the positions so far."""
+        prev = self.offset
+        num_new = keys.shape[2]
+        if self.keys is None or prev + num_new > self.keys.shape[2]:
+            num_steps = (self.step + num_new - 1) // self.step
+            B, H, _, k_dims = keys.shape
+            v_dims = values.shape[3]
+            new_keys = mx.zeros((B, H, num_steps * self.step, k_dims), keys.dtype)
+            new_values = mx.zeros((B, H, num_steps * self.step, v_dims), values.dtype)
+            if self.keys is None:
+                self.keys, self.values = new_keys, new_values
+            else:
+                self.keys = mx.concatenate([self.keys[..., :prev, :], new_keys], axis=2)
+                self.values = mx.concatenate(
+                    [self.values[..., :prev, :], new_values], axis=2
+                )
+
+        self.offset += num_new
+        self.keys[..., prev : self.offset, :] = keys
+        self.values[..., prev : self.offset, :] = values
+        return self.keys[..., : self.offset, :], self.values[..., : self.offset, :]
+
+
+class MemoryKVCache:
+    """Keys and values of a fixed input, such as the encoder output attended
+    to by the cross-attention of a decoder.
+
+    The first call of :class:`MultiHeadAttention` with this cache projects
+    the keys and values and stores them. Later calls reuse them and skip the
+    key and value projections entirely. Create a new cache for every new
+    input (e.g. every audio window).
+
+    The cached input may hold several windows in its batch. Queries with a
+    multiple of that batch size (e.g. several beams per window, grouped by
+    window) attend to the keys and values of their window, which are not
+    copied.
+    """
+
+    def __init__(self):
+        self.keys = None
+        self.values = None
+
+    def update_and_fetch(
+        self, keys: mx.array, values: mx.array
+    ) -> Tuple[mx.array, mx.array]:
+        self.keys, self.values = keys, values
+        return keys, values
+
+
 class MultiHeadAttention(Module):
     """Implements the scaled dot product attention with multiple heads.
 
@@ -27,6 +105,14 @@ class MultiHeadAttention(Module):
     mask should have ``-inf`` or very large negative numbers at the positions
     that should *not* be attended to.
 
+    For autoregressive decoding pass a :class:`KVCache` as ``cache``. Only the
+    new positions in ``keys`` and ``values`` are then projected; they are
+    appended to the cache and the queries attend to all cached positions. A
+    mask for several new queries can be made with
+    ``create_additive_causal_mask(L, offset=cache.offset)`` before the call.
+    For attention to a fixed input pass a :class:`MemoryKVCache` instead, so
+    the input is projected only once.
+
     Args:
         dims (int): The model dimensions. This is also the default
             value for the queries, keys, values, and the output.
@@ -76,26 +162,60 @@ class MultiHeadAttention(Module):
         self.value_proj = Linear(value_input_dims, value_dims, bias=bias)
         self.out_proj = Linear(value_dims, value_output_dims, bias=bias)
 
-    def __call__(self, queries, keys, values, mask=None):
-        queries = self.query_proj(queries)
-        keys = self.key_proj(keys)
-        values = self.value_proj(values)
-
+    def __call__(self, queries, keys, values, mask=None, cache=None):
         num_heads = self.num_heads
+        queries = self.query_proj(queries)
         queries = mx.unflatten(queries, -1, (num_heads, -1)).transpose(0, 2, 1, 3)
-        keys = mx.unflatten(keys, -1, (num_heads, -1)).transpose(0, 2, 1, 3)
-        values = mx.unflatten(values, -1, (num_heads, -1)).transpose(0, 2, 1, 3)
+
+        if isinstance(cache, MemoryKVCache) and cache.keys is not None:
+            keys, values = cache.keys, cache.values
+        else:
+            keys = self.key_proj(keys)
+            values = self.value_proj(values)
+            keys = mx.unflatten(keys, -1, (num_heads, -1)).transpose(0, 2, 1, 3)
+            values = mx.unflatten(values, -1, (num_heads, -1)).transpose(0, 2, 1, 3)
+            if cache is not None:
+                keys, values = cache.update_and_fetch(keys, values)
+
         scale = math.sqrt(1 / queries.shape[-1])
-        output = mx.fast.scaled_dot_product_attention(
-            queries, keys, values, scale=scale, mask=mask
-        )
+        B, _, L, _ = queries.shape
+        groups = B // keys.shape[0]
+        if (
+            isinstance(cache, MemoryKVCache)
+            and groups > 1
+            and B == groups * keys.shape[0]
+        ):
+            # Fold the query rows sharing a memory into its sequence axis, so
+            # they attend to that memory's keys and values without copies
+            if mask is not None:
+                if mask.ndim != 2:
+                    raise ValueError(
+                        "Only a 2D mask is supported when queries share keys "
+                        f"and values, got a mask of shape {mask.shape}"
+                    )
+                mask = mx.tile(mask, (groups, 1))
+            queries = queries.reshape(-1, groups, num_heads, L, queries.shape[-1])
+            queries = queries.transpose(0, 2, 1, 3, 4).flatten(2, 3)
+            output = mx.fast.scaled_dot_product_attention(
+                queries, keys, values, scale=scale, mask=mask
+            )
+            output = mx.unflatten(output, 2, (groups, L)).transpose(0, 2, 1, 3, 4)
+            output = output.reshape(B, num_heads, L, -1)
+        else:
+            output = mx.fast.scaled_dot_product_attention(
+                queries, keys, values, scale=scale, mask=mask
+            )
         output = output.transpose(0, 2, 1, 3).flatten(-2, -1)
         return self.out_proj(output)
 
     @staticmethod
-    def create_additive_causal_mask(N: int, dtype: mx.Dtype = mx.float32):
-        indices = mx.arange(N)
-        mask = indices[:, None] < indices[None]
+    def create_additive_causal_mask(
+        N: int, dtype: mx.Dtype = mx.float32, offset: int = 0
+    ):
+        """Mask for ``N`` queries at positions ``offset`` to ``offset + N - 1``
+        attending to keys ``0`` to ``offset + N - 1``."""
+        indices = mx.arange(offset + N)
+        mask = indices[offset:, None] < indices[None]
         mask = mask.astype(dtype) * mx.finfo(dtype).min
         return mask
 
@@ -204,15 +324,15 @@ class TransformerDecoderLayer(Module):
         self.activation = activation
         self.norm_first = norm_first
 
-    def __call__(self, x, memory, x_mask, memory_mask):
+    def __call__(self, x, memory, x_mask, memory_mask, cache=None, memory_cache=None):
         if self.norm_first:
             y = self.ln1(x)
-            y = self.self_attention(y, y, y, x_mask)
+            y = self.self_attention(y, y, y, x_mask, cache)
             y = self.dropout1(y)
             x = x + y
 
             y = self.ln2(x)
-            y = self.cross_attention(y, memory, memory, memory_mask)
+            y = self.cross_attention(y, memory, memory, memory_mask, memory_cache)
             y = self.dropout2(y)
             x = x + y
 
@@ -224,11 +344,11 @@ class TransformerDecoderLayer(Module):
             y = x + y
 
         else:
-            y = self.self_attention(x, x, x, x_mask)
+            y = self.self_attention(x, x, x, x_mask, cache)
             y = self.dropout1(y)
             x = self.ln1(x + y)
 
-            y = self.cross_attention(y, memory, memory, memory_mask)
+            y = self.cross_attention(y, memory, memory, memory_mask, memory_cache)
             y = self.dropout2(y)
             x = self.ln2(x + y)
 
@@ -263,7 +383,25 @@ class TransformerDecoder(Module):
         self.ln = LayerNorm(dims)
         self.checkpoint = checkpoint
 
-    def __call__(self, x, memory, x_mask, memory_mask):
+    def make_cache(self, step: int = 256) -> List[KVCache]:
+        """Create one self-attention :class:`KVCache` per layer for
+        incremental decoding with ``__call__(..., cache=...)``."""
+        return [KVCache(step) for _ in self.layers]
+
+    def make_memory_cache(self) -> List[MemoryKVCache]:
+        """Create one cross-attention :class:`MemoryKVCache` per layer. The
+        ``memory`` is projected on the first call that uses it; make new
+        caches for a new ``memory`` (e.g. the next audio window)."""
+        return [MemoryKVCache() for _ in self.layers]
+
+    def __call__(self, x, memory, x_mask, memory_mask, cache=None, memory_cache=None):
+        if cache is not None or memory_cache is not None:
+            # Incremental decoding is inference only, no checkpointing needed
+            cache = cache or [None] * len(self.layers)
+            memory_cache = memory_cache or [None] * len(self.layers)
+            for l, c, mc in zip(self.layers, cache, memory_cache):
+                x = l(x, memory, x_mask, memory_mask, c, mc)
+            return self.ln(x)
         for l in self.layers:
             l = checkpoint(l) if self.checkpoint else l
             x = l(x, memory, x_mask, memory_mask)
@@ -1,5 +1,4 @@
 # Copyright © 2023 Apple Inc.
-from collections import defaultdict
 from itertools import zip_longest
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
@@ -40,21 +39,7 @@ def tree_map(
     Returns:
         A Python tree with the new values returned by ``fn``.
     """
-    if is_leaf is not None and is_leaf(tree):
-        return fn(tree, *rest)
-    elif isinstance(tree, (list, tuple)):
-        TreeType = type(tree)
-        return TreeType(
-            tree_map(fn, child, *(r[i] for r in rest), is_leaf=is_leaf)
-            for i, child in enumerate(tree)
-        )
-    elif isinstance(tree, dict):
-        return {
-            k: tree_map(fn, child, *(r[k] for r in rest), is_leaf=is_leaf)
-            for k, child in tree.items()
-        }
-    else:
-        return fn(tree, *rest)
+    return _tree_map(fn, tree, rest, is_leaf, None, False)
 
 
 def tree_map_with_path(
@@ -90,27 +75,60 @@ def tree_map_with_path(
         model.1.w
         model.1.b
     """
-    if is_leaf is not None and is_leaf(tree):
-        return fn(path, tree, *rest)
-    elif isinstance(tree, (list, tuple)):
-        prefix = f"{path}." if path else ""
-        TreeType = type(tree)
-        return TreeType(
-            tree_map_with_path(
-                fn, child, *(r[i] for r in rest), is_leaf=is_leaf, path=f"{prefix}{i}"
-            )
-            for i, child in enumerate(tree)
+    return _tree_map(fn, tree, rest, is_leaf, path, True)
+
+
+def _tree_map(fn, tree, rest, is_leaf, path, with_path):
+    """Iterative implementation of :func:`tree_map` and
+    :func:`tree_map_with_path`.
+
+    Each stack frame holds a container being mapped, its items iterator, the
+    output collected so far and where the result goes in the parent.
+    """
+
+    def is_node(node):
+        return isinstance(node, (list, tuple, dict)) and not (
+            is_leaf is not None and is_leaf(node)
         )
-    elif isinstance(tree, dict):
-        prefix = f"{path}." if path else ""
-        return {
-            k: tree_map_with_path(
-                fn, child, *(r[k] for r in rest), is_leaf=is_leaf, path=f"{prefix}{k}"
+
+    def frame(node, node_rest, node_path, parent_key):
+        if isinstance(node, dict):
+            return (node, node_rest, node_path, parent_key, iter(node.items()), {})
+        return (node, node_rest, node_path, parent_key, enumerate(node), [])
+
+    if not is_node(tree):
+        return fn(path, tree, *rest) if with_path else fn(tree, *rest)
+
+    stack = [frame(tree, rest, path, None)]
+    while True:
+        node, node_rest, node_path, _, items, out = stack[-1]
+        prefix = f"{node_path}." if with_path and node_path else ""
+        for key, child in items:
+            child_rest = tuple(r[key] for r in node_rest) if node_rest else ()
+            child_path = f"{prefix}{key}" if with_path else None
+            if is_node(child):
+                stack.append(frame(child, child_rest, child_path, key))
+                break
+            value = (
+                fn(child_path, child, *child_rest)
+                if with_path
+                else fn(child, *child_rest)
             )
-            for k, child in tree.items()
-        }
-    else:
-        return fn(path, tree, *rest)
+            if isinstance(out, dict):
+                out[key] = value
+            else:
+                out.append(value)
+        else:
+            # All children mapped, hand the result to the parent
+            _, _, _, parent_key, _, out = stack.pop()
+            result = out if isinstance(node, dict) else type(node)(out)
+            if not stack:
+                return result
+            parent_out = stack[-1][5]
+            if isinstance(parent_out, dict):
+                parent_out[parent_key] = result
+            else:
+                parent_out.append(result)
 
 
 def tree_flatten(
@@ -156,35 +174,41 @@ def tree_flatten(
     if destination is None:
         destination = []
 
-    # Create the function to update the destination. We are taking advantage of
-    # the fact that list.extend and dict.update have the same API to simplify
-    # the code a bit.
     if isinstance(destination, list):
-        _add_to_destination = destination.extend
+        append = destination.append
     elif isinstance(destination, dict):
-        _add_to_destination = destination.update
+
+        def append(item):
+            destination[item[0]] = item[1]
+
     else:
         raise ValueError("Destination should be either a list or a dictionary or None")
 
-    # Leaf identified by is_leaf so add it and return
-    if is_leaf is not None and is_leaf(tree):
-        _add_to_destination([(prefix[1:], tree)])
-        return destination
+    def is_node(node):
+        return isinstance(node, (list, tuple, dict)) and not (
+            is_leaf is not None and is_leaf(node)
+        )
 
-    # List or tuple so recursively add each subtree
-    if isinstance(tree, (list, tuple)):
-        for i, item in enumerate(tree):
-            tree_flatten(item, f"{prefix}.{i}", is_leaf, destination)
-        return destination
+    def children(node):
+        return iter(node.items()) if isinstance(node, dict) else enumerate(node)
 
-    # Dictionary so recursively add each subtree
-    if isinstance(tree, dict):
-        for key, value in tree.items():
-            tree_flatten(value, f"{prefix}.{key}", is_leaf, destination)
+    if not is_node(tree):
+        append((prefix[1:], tree))
         return destination
 
-    # Leaf so add it and return
-    _add_to_destination([(prefix[1:], tree)])
+    # Depth first, in order: each frame resumes its items iterator where the
+    # descent into a child container left it
+    stack = [(prefix, children(tree))]
+    while stack:
+        node_prefix, items = stack[-1]
+        for key, value in items:
+            key = f"{node_prefix}.{key}"
+            if is_node(value):
+                stack.append((key, children(value)))
+                break
+            append((key[1:], value))
+        else:
+            stack.pop()
 
     return destination
 
@@ -213,30 +237,51 @@ def tree_unflatten(tree: Union[List[Tuple[str, Any]], Dict[str, Any]]) -> Any:
     """
     items = tree.items() if isinstance(tree, dict) else tree
 
-    # Special case when we have just one element in the tree ie not a tree
-    if len(items) == 1:
-        key, value = next(iter(items))
-        if key == "":
-            return value
-
-    # collect children
-    children = defaultdict(list)
+    # Build a trie of the keys. A value is stored under _LEAF in the node of
+    # its key, so a key that is also the prefix of other keys keeps both.
+    root = {}
+    nodes = []
     for key, value in items:
-        current_idx, *next_idx = key.split(".", maxsplit=1)
-        next_idx = "" if not next_idx else next_idx[0]
-        children[current_idx].append((next_idx, value))
+        parts = key.split(".")
+        # "a." is the same key as "a"
+        if parts[-1] == "":
+            parts.pop()
+        node = root
+        for part in parts:
+            child = node.get(part)
+            if child is None:
+                child = node[part] = {}
+                nodes.append((node, part, child))
+            node = child
+        node[_LEAF] = value
+
+    # Children were created after their parents, so converting in reverse
+    # creation order sees every child already converted
+    for parent, part, node in reversed(nodes):
+        parent[part] = _unflatten_node(node)
+    return _unflatten_node(root)
+
+
+_LEAF = object()
+
+
+def _unflatten_node(node):
+    if _LEAF in node:
+        if len(node) == 1:
+            return node[_LEAF]
+        return {("" if k is _LEAF else k): v for k, v in node.items()}
 
     # Assume they are a list and fail to dict if the keys are not all integers
     try:
-        keys = sorted((int(idx), idx) for idx in children.keys())
-        l = []
-        for i, k in keys:
-            # if i <= len(l), no {} will be appended.
-            l.extend([{} for _ in range(i - len(l))])
-            l.append(tree_unflatten(children[k]))
-        return l
+        keys = sorted((int(idx), idx) for idx in node)
     except ValueError:
-        return {k: tree_unflatten(v) for k, v in children.items()}
+        return node
+    l = []
+    for i, k in keys:
+        # if i <= len(l), no {} will be appended.
+        l.extend([{} for _ in range(i - len(l))])
+        l.append(node[k])
+    return l
 
 
 def tree_reduce(fn, tree, initializer=None, is_leaf=None):
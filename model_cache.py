@@ -0,0 +1,133 @@
+"""
+Resident model cache for the transcription worker.
+Keeps several loaded Whisper models in memory at once, bounded by a
+unified-memory budget, and evicts the least recently used model when a new
+one does not fit. Switching back to a recently used model is then instant.
+"""
+import os
+import glob
+from collections import OrderedDict
+
+import model_loader
+import compiled_model
+
+# Default budget: half of physical memory (unified memory on Apple Silicon)
+DEFAULT_BUDGET_FRACTION = 0.5
+
+
+def physical_memory():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 16 * 1024 ** 3
+
+
+def default_budget():
+    return int(physical_memory() * DEFAULT_BUDGET_FRACTION)
+
+
+def estimate_model_size(model_name):
+    """
+    Size of the weight files on disk for a local folder or cached HF repo,
+    used to make room before loading. Returns 0 if the files are not local.
+    """
+    if os.path.isdir(model_name):
+        model_dir = model_name
+    else:
+        from huggingface_hub import try_to_load_from_cache
+        config_path = try_to_load_from_cache(repo_id=model_name, filename="config.json")
+        if not isinstance(config_path, str):
+            return 0
+        model_dir = os.path.dirname(config_path)
+    weight_files = glob.glob(os.path.join(model_dir, "*.safetensors")) + glob.glob(os.path.join(model_dir, "*.npz"))
+    return sum(os.path.getsize(path) for path in weight_files)
+
+
+class ModelCache:
+    """LRU cache of loaded models keyed by (model name, precision)."""
+
+    def __init__(self, budget=None, compile_graphs=True):
+        self.budget = budget or default_budget()
+        # Wrap loaded models in compiled_model.CompiledWhisper, so traced graphs live as long as the model
+        self.compile_graphs = compile_graphs
+        # key -> (model, resident bytes); most recently used last
+        self.models = OrderedDict()
+
+    def is_resident(self, model_name, precision=model_loader.DEFAULT_PRECISION):
+        return (model_name, precision) in self.models
+
+    @property
+    def resident_bytes(self):
+        return sum(size for _, size in self.models.values())
+
+    def get(self, model_name, precision=model_loader.DEFAULT_PRECISION):
+        """
+        Return a loaded model, loading it if necessary with its weights in
+        `precision` (see model_loader.PRECISIONS), and make it the model
+        mlx_whisper.transcribe uses for `model_name`.
+        """
+        key = (model_name, precision)
+        if key in self.models:
+            self.models.move_to_end(key)
+            model = self.models[key][0]
+        else:
+            model = self._load(key, model_name, precision)
+        self._activate(model_name, model)
+        return model
+
+    def _load(self, key, model_name, precision):
+        import mlx.core as mx
+        from mlx.utils import tree_flatten
+
+        # Make room up front when the weight size is known, to keep the peak within budget
+        self._evict(self.budget - estimate_model_size(model_name))
+
+        mx.synchronize()
+        before = mx.get_active_memory()
+        model = model_loader.load_model(model_name, precision)
+        mx.synchronize()
+        size = mx.get_active_memory() - before
+        if size <= 0:
+            # Memory was reused from MLX's buffer cache; fall back to parameter sizes
+            size = sum(v.nbytes for _, v in tree_flatten(model.parameters()))
+        if self.compile_graphs:
+            model = compiled_model.CompiledWhisper(model)
+
+        self.models[key] = (model, size)
+        print(f"Model resident size: {size / 1024 ** 3:.2f} GB ({precision} precision) "
+              f"(cache: {len(self.models)} model(s), {self.resident_bytes / 1024 ** 3:.2f} GB "
+              f"of {self.budget / 1024 ** 3:.2f} GB budget)")
+        # Keep at least the model that was just loaded
+        self._evict(self.budget, keep=key)
+        return model
+
+    def reserve(self, nbytes):
+        """Evict models until `nbytes` more fit in the budget (for work outside the cache, e.g. quantization)."""
+        self._evict(self.budget - nbytes)
+
+    def _evict(self, limit, keep=None):
+        """Drop least recently used models until the resident size is at most `limit`."""
+        import mlx.core as mx
+        from mlx_whisper.transcribe import ModelHolder
+
+        evicted = False
+        for key in list(self.models):
+            if self.resident_bytes <= limit:
+                break
+            if key == keep:
+                continue
+            model, size = self.models.pop(key)
+            if ModelHolder.model is model:
+                ModelHolder.model = None
+                ModelHolder.model_path = None
+            del model
+            evicted = True
+            print(f"Evicted model from memory: {key[0]} ({size / 1024 ** 3:.2f} GB)")
+        if evicted:
+            mx.clear_cache()
+
+    def _activate(self, model_name, model):
+        """Point mlx_whisper's single-model holder at a cached model so transcribe reuses it."""
+        from mlx_whisper.transcribe import ModelHolder
+        ModelHolder.model = model
+        ModelHolder.model_path = model_name
@@ -0,0 +1,100 @@
+"""
+Whisper model loading with a selectable weight precision.
+Does what mlx_whisper.load_models.load_model does, but can convert the
+weights to float16 or bfloat16 while they are loaded. Each tensor is cast as
+it is read, so a float32 checkpoint never sits in memory at full precision.
+"default" keeps the precision the checkpoint ships in. bf16 models compute in
+bfloat16 but take and return float16 like the stock model (see bf16_model).
+
+The bundled macOS 15 mlx (macos15_mlx) streams and casts .safetensors files
+in Module.load_weights. With other mlx builds the lazily loaded tensors are
+cast and evaluated in groups instead.
+"""
+import os
+import json
+import inspect
+
+import model_resolver
+
+DEFAULT_PRECISION = "default"
+PRECISIONS = [DEFAULT_PRECISION, "fp16", "bf16"]
+
+# Evaluate cast tensors in groups of about this size (fallback path)
+EVAL_GROUP_BYTES = 256 * 1024 ** 2
+
+
+def weight_dtype(precision):
+    """mlx dtype the weights are converted to, or None to keep the checkpoint's."""
+    import mlx.core as mx
+    return {"fp16": mx.float16, "bf16": mx.bfloat16}.get(precision)
+
+
+def build_model(dims, precision):
+    """Whisper module (weights not loaded yet) for weights in `precision`."""
+    import mlx.core as mx
+    from mlx_whisper import whisper
+
+    if precision == "bf16":
+        import bf16_model
+        return bf16_model.Whisper(dims)
+    return whisper.Whisper(dims, mx.float16)
+
+
+def weights_file(model_path):
+    for name in model_resolver.WEIGHT_FILES:
+        path = os.path.join(model_path, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No weights file ({' or '.join(model_resolver.WEIGHT_FILES)}) in {model_path}")
+
+
+def _load_weights(model, weights_path, dtype):
+    import mlx.core as mx
+
+    if "dtype" in inspect.signature(model.load_weights).parameters:
+        model.load_weights(weights_path, strict=False, dtype=dtype)
+        return
+
+    weights = mx.load(weights_path)
+    group, group_bytes = [], 0
+    for name in list(weights):
+        # Popped so the uncast array is released once its group is evaluated
+        value = weights.pop(name)
+        if dtype is not None and mx.issubdtype(value.dtype, mx.floating):
+            value = value.astype(dtype)
+        group.append((name, value))
+        group_bytes += value.nbytes
+        if group_bytes >= EVAL_GROUP_BYTES:
+            model.load_weights(group, strict=False)
+            mx.eval([value for _, value in group])
+            group, group_bytes = [], 0
+    if group:
+        model.load_weights(group, strict=False)
+
+
+def load_model(model_path, precision=DEFAULT_PRECISION):
+    """Load the Whisper model in a local folder with its weights in `precision` (see PRECISIONS)."""
+    import mlx.core as mx
+    import mlx.nn as nn
+    from mlx_whisper import whisper
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}")
+    with open(os.path.join(model_path, "config.json"), "r") as f:
+        config = json.load(f)
+    config.pop("model_type", None)
+    quantization = config.pop("quantization", None)
+    weights_path = weights_file(model_path)
+
+    model = build_model(whisper.ModelDimensions(**config), precision)
+    if quantization is not None:
+        # Only layers saved with scales were quantized (see quantize_model.make_class_predicate)
+        names = set(mx.load(weights_path).keys())
+        nn.quantize(
+            model,
+            **quantization,
+            class_predicate=lambda path, module: isinstance(module, (nn.Linear, nn.Embedding)) and f"{path}.scales" in names,
+        )
+    _load_weights(model, weights_path, weight_dtype(precision))
+    mx.eval(model.parameters())
+    return model
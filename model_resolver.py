@@ -0,0 +1,134 @@
+"""
+Offline-first model resolution.
+Turns a model name from the GUI (a Hugging Face repo id or a local folder)
+into a local folder that mlx_whisper loads without any network access. The
+HF cache is checked first for a complete snapshot; the Hub is only contacted
+when files are missing or the user asks for an update.
+"""
+import os
+import threading
+
+import downloader
+import network_probe
+import cache_scanner
+
+# mlx_whisper loads the first of these that exists (the tokenizer ships with mlx_whisper)
+WEIGHT_FILES = ["weights.safetensors", "weights.npz"]
+
+# repo id -> (folder mtimes, snapshot path or None), see cached_snapshot_status
+_status_memo = {}
+_status_lock = threading.Lock()
+
+
+class ModelUnavailableError(Exception):
+    """The model is not cached and Hugging Face cannot be reached."""
+    pass
+
+
+def is_complete_snapshot(path):
+    """
+    True if a snapshot folder has config.json and a weights file, and none of
+    its files are links to blobs that are missing (an interrupted download).
+    """
+    if not os.path.isfile(os.path.join(path, "config.json")):
+        return False
+    if not any(os.path.isfile(os.path.join(path, name)) for name in WEIGHT_FILES):
+        return False
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            if not os.path.exists(os.path.join(dirpath, name)):
+                return False
+    return True
+
+
+def find_cached_snapshot(repo_id, revision="main", cache_dir=None):
+    """
+    Path of a complete cached snapshot of `repo_id`, or None.
+    Prefers the commit the revision points to, then any other complete snapshot
+    (newest first), so an interrupted update does not hide a working copy.
+    """
+    repo_dir = downloader.repo_cache_dir(repo_id, cache_dir)
+    snapshots_dir = os.path.join(repo_dir, "snapshots")
+
+    candidates = []
+    try:
+        with open(os.path.join(repo_dir, "refs", revision), "r") as f:
+            candidates.append(f.read().strip())
+    except OSError:
+        pass
+    # The revision may itself be a commit hash
+    candidates.append(revision)
+    try:
+        others = sorted(os.scandir(snapshots_dir), key=lambda entry: entry.stat().st_mtime, reverse=True)
+    except OSError:
+        return None
+    candidates.extend(entry.name for entry in others)
+
+    for commit in candidates:
+        path = os.path.join(snapshots_dir, commit)
+        if os.path.isdir(path) and is_complete_snapshot(path):
+            return path
+    return None
+
+
+def _cache_key(repo_id, revision="main"):
+    """Folder mtimes that change when a repo is downloaded, updated or deleted."""
+    repo_dir = downloader.repo_cache_dir(repo_id)
+    try:
+        ref_mtime = os.stat(os.path.join(repo_dir, "refs", revision)).st_mtime_ns
+    except OSError:
+        ref_mtime = None
+    return cache_scanner.mtime_key(repo_dir) + (ref_mtime,)
+
+
+def cached_snapshot_status(model_name):
+    """
+    Like find_local_model, but the completeness check of a cached repo is
+    memoized until its cache folders change. Meant for frequent UI status checks.
+    """
+    if os.path.isdir(model_name):
+        return model_name
+    key = _cache_key(model_name)
+    with _status_lock:
+        memoized = _status_memo.get(model_name)
+    if memoized and memoized[0] == key:
+        return memoized[1]
+    path = find_cached_snapshot(model_name)
+    with _status_lock:
+        _status_memo[model_name] = (key, path)
+    return path
+
+
+def find_local_model(model_name):
+    """Local folder for a model without touching the network, or None if it has to be downloaded."""
+    if os.path.isdir(model_name):
+        return model_name
+    return find_cached_snapshot(model_name)
+
+
+def resolve_model(model_name, refresh=False, progress=None):
+    """
+    Local folder for a model, downloading only when it is not fully cached or
+    `refresh` is set (which checks the Hub for a newer revision).
+    `progress` receives downloader events. Raises ModelUnavailableError at once
+    when the reachability probe says the Hub is blocked or offline.
+    """
+    if os.path.isdir(model_name):
+        return model_name
+    if not refresh:
+        path = find_cached_snapshot(model_name)
+        if path:
+            return path
+
+    verdict = network_probe.check()
+    if verdict["verdict"] != network_probe.ONLINE:
+        raise ModelUnavailableError(
+            f"{model_name} cannot be downloaded: Hugging Face is {verdict['verdict']} ({verdict['detail']}). "
+            "Use 'Load Local...' with a manually downloaded copy."
+        )
+    try:
+        return downloader.download_snapshot(model_name, progress=progress)
+    except downloader.DownloadError:
+        # The network may have changed since the last probe
+        network_probe.invalidate()
+        raise
@@ -0,0 +1,178 @@
+"""
+Hugging Face reachability probe.
+Makes one small request to the Hub API and classifies the answer as online,
+blocked (a proxy or firewall page such as Cisco Umbrella's "Access Restricted
+Warning" instead of JSON) or offline. The verdict is cached in memory and in
+a small file shared with the worker process, so jobs fail fast instead of
+each one timing out against a blocked network.
+
+    python network_probe.py          # cached verdict
+    python network_probe.py --force  # probe again
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+
+ONLINE = "online"
+BLOCKED = "blocked"
+OFFLINE = "offline"
+
+NETWORK_STATE_FILE = os.path.expanduser("~/.mlx_whisper_network.json")
+
+DEFAULT_ENDPOINT = "https://huggingface.co"
+PROBE_PATH = "/api/models/mlx-community/whisper-tiny"
+PROBE_TIMEOUT = 5
+# Only the start of the response is needed to recognise a block page
+PROBE_READ_BYTES = 64 * 1024
+
+# Seconds a verdict is reused. Failures are re-checked sooner so the app
+# notices quickly when the network comes back.
+VERDICT_TTL = {ONLINE: 30 * 60, BLOCKED: 5 * 60, OFFLINE: 60}
+
+# Lower-case markers of proxy/firewall pages (see block_page.html)
+BLOCK_SIGNATURES = [
+    b"opendns",
+    b"umbrella",
+    b"access restricted",
+    b"blocked-page",
+    b"acceptable use polic",
+    b"zscaler",
+    b"websense",
+    b"fortiguard",
+]
+
+_lock = threading.Lock()
+_cached = None
+
+
+def endpoint():
+    return (os.environ.get("HF_ENDPOINT") or DEFAULT_ENDPOINT).rstrip("/")
+
+
+def is_block_page(body, content_type=""):
+    """True if a response to a JSON API call looks like an interception page."""
+    head = body[:PROBE_READ_BYTES].lower()
+    if any(signature in head for signature in BLOCK_SIGNATURES):
+        return True
+    # The API only ever answers with JSON; HTML means something else replied
+    return "html" in (content_type or "").lower() or head.lstrip().startswith((b"<!doctype html", b"<html"))
+
+
+def is_hub_error(body, headers):
+    """True if an HTTP error response comes from the Hub API (JSON body or its X-Error-Code header)."""
+    if headers.get("X-Error-Code"):
+        return True
+    return "json" in headers.get("Content-Type", "").lower() and body.lstrip()[:1] == b"{"
+
+
+def probe(url=None):
+    """Make the probe request now. Returns a verdict dict (see check)."""
+    url = url or endpoint() + PROBE_PATH
+    verdict = {"verdict": ONLINE, "detail": "", "endpoint": endpoint(), "checked_at": time.time()}
+    try:
+        request = urllib.request.Request(url, headers={"Accept": "application/json"})
+        with urllib.request.urlopen(request, timeout=PROBE_TIMEOUT) as response:
+            body = response.read(PROBE_READ_BYTES)
+            content_type = response.headers.get("Content-Type", "")
+        if "json" in content_type.lower() and body.lstrip()[:1] in (b"{", b"["):
+            return verdict
+        if is_block_page(body, content_type):
+            verdict.update(verdict=BLOCKED, detail=f"{url} returned a proxy/firewall page instead of JSON")
+        else:
+            verdict.update(verdict=BLOCKED, detail=f"{url} did not return JSON ({content_type or 'unknown type'})")
+    except urllib.error.HTTPError as e:
+        # Blocking proxies often answer with an error status and an HTML page
+        body = e.read(PROBE_READ_BYTES)
+        if is_block_page(body, e.headers.get("Content-Type", "")):
+            verdict.update(verdict=BLOCKED, detail=f"{url} returned a proxy/firewall page (HTTP {e.code})")
+        elif e.code == 407:
+            verdict.update(verdict=BLOCKED, detail=f"A proxy requires authentication to reach {url} (HTTP 407)")
+        elif e.code >= 500:
+            verdict.update(verdict=OFFLINE, detail=f"{url} returned HTTP {e.code}")
+        elif not is_hub_error(body, e.headers):
+            verdict.update(verdict=BLOCKED, detail=f"{url} returned HTTP {e.code} from something other than Hugging Face")
+        # A 4xx error from the Hub itself (e.g. 401/404) still proves it is reachable
+    except (urllib.error.URLError, OSError) as e:
+        verdict.update(verdict=OFFLINE, detail=f"Could not reach {url}: {getattr(e, 'reason', e)}")
+    return verdict
+
+
+def _is_fresh(verdict):
+    if not verdict or verdict.get("endpoint") != endpoint():
+        return False
+    age = time.time() - verdict.get("checked_at", 0)
+    return 0 <= age < VERDICT_TTL.get(verdict.get("verdict"), 0)
+
+
+def _load_state():
+    try:
+        with open(NETWORK_STATE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(verdict):
+    try:
+        tmp_path = NETWORK_STATE_FILE + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(verdict, f)
+        os.replace(tmp_path, NETWORK_STATE_FILE)
+    except OSError:
+        pass
+
+
+def check(force=False):
+    """
+    Return the reachability verdict as a dict with "verdict" (ONLINE, BLOCKED
+    or OFFLINE), "detail", "endpoint" and "checked_at". A verdict younger than
+    its TTL is reused unless `force` is set. HF_HUB_OFFLINE=1 means OFFLINE.
+    """
+    global _cached
+    if os.environ.get("HF_HUB_OFFLINE", "").lower() in ("1", "true", "yes"):
+        return {"verdict": OFFLINE, "detail": "HF_HUB_OFFLINE is set", "endpoint": endpoint(), "checked_at": time.time()}
+
+    with _lock:
+        if not force:
+            if _is_fresh(_cached):
+                return _cached
+            stored = _load_state()
+            if _is_fresh(stored):
+                _cached = stored
+                return stored
+        _cached = probe()
+        _save_state(_cached)
+        return _cached
+
+
+def invalidate():
+    """Forget the cached verdict (e.g. after a download failed although the probe said online)."""
+    global _cached
+    with _lock:
+        _cached = None
+        try:
+            os.remove(NETWORK_STATE_FILE)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check whether Hugging Face is reachable from this network.")
+    parser.add_argument("--force", action="store_true", help="Ignore the cached verdict.")
+    args = parser.parse_args()
+
+    import truststore
+    truststore.inject_into_ssl()
+
+    verdict = check(force=args.force)
+    print(f"{verdict['verdict']}: {verdict['detail'] or verdict['endpoint']}")
+    sys.exit(0 if verdict["verdict"] == ONLINE else 1)
+
+
+if __name__ == "__main__":
+    main()
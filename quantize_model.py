@@ -0,0 +1,236 @@
+"""
+Create quantized variants of Whisper models.
+Loads a cached (or local) model, quantizes its Linear and Embedding layers
+with mlx.nn.quantize at 4 or 8 bits, and saves the result as a local model
+folder (weights.safetensors + config.json with a "quantization" entry) that
+mlx_whisper loads directly. The original and the quantized model are then
+benchmarked on the same audio and the comparison is saved next to the model
+as quantization_report.json.
+
+    python quantize_model.py mlx-community/whisper-large-v3-turbo --bits 4
+    python quantize_model.py ~/models/whisper-medium --bits 8 --skip "decoder.token_embedding" --audio sample.wav
+    python quantize_model.py mlx-community/whisper-small mlx-community/whisper-medium --bits 4
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import fnmatch
+import argparse
+
+import local_models
+import model_loader
+import model_resolver
+
+QUANTIZED_MODELS_DIR = os.path.expanduser("~/.mlx_whisper_models")
+REPORT_FILE = local_models.QUANTIZATION_REPORT_FILE
+
+BITS = [4, 8]
+DEFAULT_BITS = 4
+DEFAULT_GROUP_SIZE = 64
+
+# Benchmark on at most this much audio (seconds)
+BENCHMARK_SECONDS = 60
+
+
+def output_dir_for(model_name, bits, group_size=DEFAULT_GROUP_SIZE):
+    name = os.path.basename(model_name.rstrip("/\\"))
+    suffix = f"{bits}bit" if group_size == DEFAULT_GROUP_SIZE else f"{bits}bit-g{group_size}"
+    return os.path.join(QUANTIZED_MODELS_DIR, f"{name}-{suffix}")
+
+
+def make_class_predicate(group_size, skip=()):
+    """
+    Per-layer rule for nn.quantize: quantize layers that support it, unless
+    their dotted path matches a `skip` pattern (fnmatch syntax) or their input
+    width is not a multiple of the group size. Skipped layers keep their
+    precision; mlx_whisper recognises them on load by their missing scales.
+    """
+    def predicate(path, module):
+        if not hasattr(module, "to_quantized"):
+            return False
+        if any(fnmatch.fnmatch(path, pattern) for pattern in skip):
+            return False
+        weight = getattr(module, "weight", None)
+        return weight is not None and weight.shape[-1] % group_size == 0
+    return predicate
+
+
+def quantize(model_name, bits=DEFAULT_BITS, group_size=DEFAULT_GROUP_SIZE, skip=(), output_dir=None):
+    """
+    Quantize a cached or local model and save it as a local model folder.
+    Returns (output_dir, quantized layer count, layer count).
+    """
+    import mlx.core as mx
+    import mlx.nn as nn
+    from mlx.utils import tree_flatten
+    from mlx_whisper.load_models import load_model
+
+    if bits not in BITS:
+        raise ValueError(f"bits must be one of {BITS}")
+    source_path = model_resolver.find_local_model(model_name)
+    if source_path is None:
+        raise ValueError(f"{model_name} is not downloaded; transcribe with it once or download it first")
+    with open(os.path.join(source_path, "config.json"), "r") as f:
+        config = json.load(f)
+    if config.get("quantization"):
+        raise ValueError(f"{model_name} is already quantized ({config['quantization'].get('bits')}-bit)")
+
+    output_dir = output_dir or output_dir_for(model_name, bits, group_size)
+    print(f"Quantizing {model_name} to {bits}-bit (group size {group_size})...")
+    model = load_model(source_path, dtype=mx.float16)
+
+    # Count layers while nn.quantize walks the model instead of walking it twice more
+    should_quantize = make_class_predicate(group_size, skip)
+    candidates, selected = [], []
+
+    def predicate(path, module):
+        if hasattr(module, "to_quantized"):
+            candidates.append(path)
+        if should_quantize(path, module):
+            selected.append(path)
+            return True
+        return False
+
+    nn.quantize(model, group_size=group_size, bits=bits, class_predicate=predicate)
+    weights = dict(tree_flatten(model.parameters()))
+    mx.eval(weights)
+
+    # Write into a temporary folder and swap it in, so a failed run leaves no half model behind
+    tmp_dir = output_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    mx.save_safetensors(os.path.join(tmp_dir, "weights.safetensors"), weights, metadata={"format": "mlx"})
+    config["quantization"] = {"group_size": group_size, "bits": bits}
+    with open(os.path.join(tmp_dir, "config.json"), "w") as f:
+        json.dump(config, f, indent=4)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+
+    del model, weights
+    mx.clear_cache()
+    print(f"Quantized {len(selected)} of {len(candidates)} layers; saved to {output_dir}")
+    return output_dir, len(selected), len(candidates)
+
+
+def benchmark(model_path, audio, precision=model_loader.DEFAULT_PRECISION):
+    """Load a model (weights in `precision`) and transcribe `audio` with it. Returns load/inference times and memory use."""
+    import mlx.core as mx
+    import mlx_whisper
+    from mlx_whisper.audio import SAMPLE_RATE
+    from mlx_whisper.transcribe import ModelHolder
+
+    mx.clear_cache()
+    mx.reset_peak_memory()
+    before = mx.get_active_memory()
+    start = time.time()
+    model = model_loader.load_model(model_path, precision)
+    load_time = time.time() - start
+    resident = mx.get_active_memory() - before
+
+    # Let transcribe use this instance instead of loading its own
+    ModelHolder.model, ModelHolder.model_path = model, model_path
+    try:
+        start = time.time()
+        mlx_whisper.transcribe(audio, path_or_hf_repo=model_path, verbose=None)
+        inference = time.time() - start
+    finally:
+        ModelHolder.model = ModelHolder.model_path = None
+    peak = mx.get_peak_memory()
+
+    del model
+    mx.clear_cache()
+    return {
+        "load": round(load_time, 3),
+        "inference": round(inference, 3),
+        "rtf": round(inference / (len(audio) / SAMPLE_RATE), 4),
+        "resident_memory": resident,
+        "peak_memory": peak,
+        "weights_bytes": sum(
+            os.path.getsize(os.path.join(model_path, name))
+            for name in model_resolver.WEIGHT_FILES if os.path.exists(os.path.join(model_path, name))
+        ),
+    }
+
+
+def load_benchmark_audio(audio_path=None):
+    """Up to BENCHMARK_SECONDS of the given file, or silence of that length."""
+    import numpy as np
+    from mlx_whisper.audio import load_audio, SAMPLE_RATE
+
+    if audio_path:
+        return load_audio(audio_path)[:BENCHMARK_SECONDS * SAMPLE_RATE]
+    return np.zeros(BENCHMARK_SECONDS * SAMPLE_RATE, dtype=np.float32)
+
+
+def format_report(report):
+    original, quantized = report["original"], report["quantized"]
+    lines = [f"{report['bits']}-bit variant of {report['source']} ({report['quantized_layers']}/{report['layers']} layers quantized)"]
+    rows = [
+        ("Weights", "weights_bytes", lambda v: f"{v / 1024 ** 2:,.0f} MB"),
+        ("Resident memory", "resident_memory", lambda v: f"{v / 1024 ** 2:,.0f} MB"),
+        ("Peak memory", "peak_memory", lambda v: f"{v / 1024 ** 2:,.0f} MB"),
+        ("Load time", "load", lambda v: f"{v:.2f}s"),
+        ("Inference", "inference", lambda v: f"{v:.2f}s"),
+    ]
+    for label, key, fmt in rows:
+        ratio = quantized[key] / original[key] if original[key] else 0
+        lines.append(f"  {label:<16} {fmt(original[key]):>12} -> {fmt(quantized[key]):>12}  (x{ratio:.2f})")
+    return "\n".join(lines)
+
+
+def create_variant(model_name, bits=DEFAULT_BITS, group_size=DEFAULT_GROUP_SIZE, skip=(), audio_path=None, output_dir=None):
+    """Quantize, benchmark both models and save the report. Returns (output_dir, report)."""
+    output_dir, quantized_layers, layers = quantize(model_name, bits, group_size, skip, output_dir)
+    audio = load_benchmark_audio(audio_path)
+    print("Benchmarking original model...")
+    original = benchmark(model_resolver.find_local_model(model_name), audio)
+    print("Benchmarking quantized model...")
+    quantized = benchmark(output_dir, audio)
+
+    report = {
+        "source": model_name,
+        "bits": bits,
+        "group_size": group_size,
+        "skip": list(skip),
+        "quantized_layers": quantized_layers,
+        "layers": layers,
+        "benchmark_audio": audio_path,
+        "original": original,
+        "quantized": quantized,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(output_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    print(format_report(report))
+    return output_dir, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a quantized variant of a Whisper model.")
+    parser.add_argument("models", nargs="+", metavar="model",
+                        help="Hugging Face repo id (must be cached) or local model folder; several are quantized in turn.")
+    parser.add_argument("-b", "--bits", type=int, choices=BITS, default=DEFAULT_BITS)
+    parser.add_argument("-g", "--group-size", type=int, choices=[32, 64, 128], default=DEFAULT_GROUP_SIZE)
+    parser.add_argument("--skip", action="append", default=[],
+                        help="Keep layers whose path matches this pattern unquantized (repeatable), e.g. 'decoder.token_embedding'.")
+    parser.add_argument("--audio", help="Audio file for the speed comparison (default: silence).")
+    parser.add_argument("-o", "--output", help=f"Output folder (default: under {QUANTIZED_MODELS_DIR}).")
+    args = parser.parse_args()
+    if args.output and len(args.models) > 1:
+        parser.error("--output can only be used with a single model")
+
+    failed = False
+    for model_name in args.models:
+        try:
+            create_variant(model_name, args.bits, args.group_size, args.skip, args.audio, args.output)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Virtualized transcript viewer for the Result tab.
+Only the segments around the visible window are inserted into the Tk text
+widget; scrolling re-renders that window from the SegmentStore, so a
+multi-hour transcript never has to be materialized in the widget.
+"""
+import re
+import tkinter.font as tkfont
+import customtkinter as ctk
+
+from segment_store import SegmentStore
+
+TIME_PATTERN = re.compile(r"^(?:(\d+):)?(\d{1,2}):(\d{1,2}(?:\.\d+)?)$")
+
+
+def parse_time(text):
+    """Parse 'hh:mm:ss', 'mm:ss' (optionally with fractional seconds) into seconds, or None."""
+    match = TIME_PATTERN.match(text.strip())
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def format_time(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class ResultViewer(ctk.CTkFrame):
+    """Scrollable segment list that renders only the visible window plus a margin."""
+
+    # Segments rendered above/below the visible window
+    MARGIN = 40
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.store = SegmentStore()
+        self.top = 0            # Segment shown at the top of the view
+        self.rendered_from = 0  # First segment currently inserted in the widget
+        self.highlight = None   # Segment highlighted by the last jump/search
+
+        # Toolbar: jump to time or find text
+        self.toolbar = ctk.CTkFrame(self, fg_color="transparent")
+        self.toolbar.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        self.toolbar.grid_columnconfigure(0, weight=1)
+
+        self.goto_entry = ctk.CTkEntry(self.toolbar, placeholder_text="Go to time (hh:mm:ss) or find text...")
+        self.goto_entry.grid(row=0, column=0, padx=(0, 10), sticky="ew")
+        self.goto_entry.bind("<Return>", lambda _: self.goto())
+
+        self.goto_button = ctk.CTkButton(self.toolbar, text="Go", command=self.goto, width=60)
+        self.goto_button.grid(row=0, column=1)
+
+        self.textbox = ctk.CTkTextbox(self, wrap="word", activate_scrollbars=False)
+        self.textbox.grid(row=1, column=0, sticky="nsew")
+        self.textbox.tag_config("timestamp", foreground="gray")
+        self.textbox.tag_config("highlight", background="#FDE68A", foreground="black")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        # The widget only holds a window of the transcript, so take over scrolling
+        text_widget = self.textbox._textbox
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            text_widget.bind(sequence, self.on_mouse_wheel, add="+")
+        text_widget.bind("<Prior>", lambda _: self.scroll_by(-self.visible_count()) or "break", add="+")
+        text_widget.bind("<Next>", lambda _: self.scroll_by(self.visible_count()) or "break", add="+")
+        text_widget.bind("<Configure>", lambda _: self.render(), add="+")
+
+        self.textbox.configure(state="disabled")
+
+    def set_result(self, result):
+        self.set_store(SegmentStore.from_result(result))
+
+    def set_store(self, store):
+        # The viewer owns the stores it shows; release the previous one's memory map
+        if store is not self.store:
+            self.store.close()
+        self.store = store
+        self.top = 0
+        self.highlight = None
+        self.render()
+
+    def destroy(self):
+        self.store.close()
+        super().destroy()
+
+    def visible_count(self):
+        """Approximate number of segments that fit in the widget (one line each)."""
+        text_widget = self.textbox._textbox
+        line_height = tkfont.Font(font=text_widget.cget("font")).metrics("linespace") or 16
+        return max(text_widget.winfo_height() // line_height, 1)
+
+    def render(self):
+        total = len(self.store)
+        visible = self.visible_count()
+        self.top = max(0, min(self.top, total - 1))
+        first = max(self.top - self.MARGIN, 0)
+        last = min(self.top + visible + self.MARGIN, total)
+
+        self.textbox.configure(state="normal")
+        self.textbox.delete("0.0", "end")
+        for i in range(first, last):
+            self.textbox.insert("end", f"[{format_time(self.store.start(i))}] ", "timestamp")
+            tags = ("highlight",) if i == self.highlight else ()
+            self.textbox.insert("end", self.store.text_at(i) + "\n", tags)
+        self.textbox.configure(state="disabled")
+        self.rendered_from = first
+
+        # Line numbers in the widget are 1-based
+        self.textbox._textbox.yview(f"{self.top - first + 1}.0")
+        if total:
+            self.scrollbar.set(self.top / total, min((self.top + visible) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, index):
+        self.top = index
+        self.render()
+
+    def scroll_by(self, count):
+        self.scroll_to(self.top + count)
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.store)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_count()
+            self.scroll_by(amount)
+
+    def on_mouse_wheel(self, event):
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            # macOS reports small deltas, other platforms multiples of 120
+            delta = -event.delta if abs(event.delta) < 120 else -event.delta // 120
+        self.scroll_by(delta)
+        return "break"
+
+    def jump_to(self, index):
+        """Show segment `index` a few lines below the top and highlight it."""
+        self.highlight = index
+        self.scroll_to(max(index - 2, 0))
+
+    def jump_to_time(self, seconds):
+        if len(self.store):
+            self.jump_to(self.store.index_at(seconds))
+
+    def find_next(self, query):
+        start = self.highlight + 1 if self.highlight is not None else self.top
+        index = self.store.find(query, start)
+        if index is not None:
+            self.jump_to(index)
+        return index
+
+    def goto(self):
+        query = self.goto_entry.get().strip()
+        if not query:
+            return
+        seconds = parse_time(query)
+        if seconds is not None:
+            self.jump_to_time(seconds)
+        else:
+            self.find_next(query)
@@ -0,0 +1,63 @@
+"""
+JSONL manifest of batch runs.
+One file per batch run with one row per processed file: source, media length,
+model, precision, language, status, per-stage timings, real-time factor and peak memory.
+Used for capacity planning across the Macs that run the app.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import platform
+
+MANIFEST_DIR = os.path.expanduser("~/.mlx_whisper_runs")
+
+# Per-stage timings reported by the worker (seconds)
+STAGES = ["download", "model_load", "decode", "inference", "write"]
+
+
+class RunManifest:
+    """Append-only JSONL writer for a single batch run."""
+
+    def __init__(self, directory=MANIFEST_DIR):
+        os.makedirs(directory, exist_ok=True)
+        # Sortable by start time; the random suffix keeps runs started in the same second apart
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(directory, f"run-{self.run_id}.jsonl")
+        self.host = socket.gethostname()
+        self.machine = platform.machine()
+        self.macos_version = platform.mac_ver()[0] or None
+
+    def write(self, source_path, model, status, stats, precision=None, language=None, language_forced=False, attempts=None, error=None):
+        """Append one row. `stats` is the dict collected from the worker (timings, media_duration, memory)."""
+        timings = {stage: stats.get(stage) for stage in STAGES}
+        media_duration = stats.get("media_duration")
+        inference = timings["inference"]
+
+        row = {
+            "run_id": self.run_id,
+            "timestamp": time.time(),
+            "host": self.host,
+            "machine": self.machine,
+            "macos_version": self.macos_version,
+            "source_path": source_path,
+            "media_duration": media_duration,
+            "model": model,
+            "precision": precision,
+            "language": language,
+            "language_forced": language_forced,
+            "status": status,
+            "attempts": attempts,
+            "timings": timings,
+            "total_time": sum(t for t in timings.values() if t is not None),
+            # Inference time per second of audio (< 1.0 is faster than real time)
+            "rtf": inference / media_duration if inference is not None and media_duration else None,
+            "peak_memory": stats.get("peak_memory"),
+            # High-water mark of the worker process since it started, not of this file alone
+            "worker_peak_rss": stats.get("worker_peak_rss"),
+            "error": error,
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return row
@@ -0,0 +1,300 @@
+"""
+Compact storage for transcript segments and word timings.
+Segments are kept in flat columns (start/end times, token ids, word timings
+and offsets into UTF-8 text buffers) instead of one Python dict per segment
+and per word. A store can be saved to a binary file and memory-mapped back
+without parsing, so the result viewer, output writers and search index can
+read long transcripts at near-zero cost.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+from array import array
+from bisect import bisect_right
+
+SEGMENT_CACHE_DIR = os.path.expanduser("~/.mlx_whisper_segments")
+
+# Saved stores are pruned at startup once they are this old (seconds), and the
+# oldest go first while the cache is larger than SEGMENT_CACHE_MAX_BYTES
+SEGMENT_CACHE_MAX_AGE = 90 * 24 * 3600
+SEGMENT_CACHE_MAX_BYTES = 1024 ** 3
+
+MAGIC = b"MLXSEG01"
+ALIGNMENT = 8
+
+# Column name -> array typecode. Offsets columns have one more entry than
+# the rows they index (offsets[i]:offsets[i + 1] is row i).
+COLUMNS = {
+    # Per segment
+    "starts": "f",
+    "ends": "f",
+    "text_offsets": "Q",
+    "text": "B",
+    "token_offsets": "Q",
+    "tokens": "I",
+    "temperature": "f",
+    "avg_logprob": "f",
+    "compression_ratio": "f",
+    "no_speech_prob": "f",
+    "word_offsets": "Q",
+    # Per word
+    "word_starts": "f",
+    "word_ends": "f",
+    "word_probs": "f",
+    "word_text_offsets": "Q",
+    "word_text": "B",
+}
+OFFSET_COLUMNS = ["text_offsets", "token_offsets", "word_offsets", "word_text_offsets"]
+
+# Optional per-segment float fields of a transcribe result
+SEGMENT_FLOAT_FIELDS = ["temperature", "avg_logprob", "compression_ratio", "no_speech_prob"]
+
+
+def cache_path(source_path):
+    """Location of the saved segment store for a transcribed media file."""
+    digest = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()
+    return os.path.join(SEGMENT_CACHE_DIR, f"{digest}.seg")
+
+
+def prune_cache(directory=SEGMENT_CACHE_DIR, max_age=SEGMENT_CACHE_MAX_AGE, max_bytes=SEGMENT_CACHE_MAX_BYTES):
+    """
+    Delete saved stores (and leftover temporary files) older than `max_age`,
+    then the oldest remaining ones until the cache is at most `max_bytes`.
+    Returns the number of files removed.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries if entry.is_file()]
+    except FileNotFoundError:
+        return 0
+
+    now = time.time()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    # Oldest first; a temporary file left by an interrupted save is stale after an hour
+    for mtime, size, path in sorted(files):
+        stale = now - mtime > (3600 if path.endswith(".tmp") else max_age)
+        if not stale and total <= max_bytes:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class SegmentStore:
+    """Columnar, read-mostly list of segments (with tokens and word timings)."""
+
+    def __init__(self, language=None):
+        self.language = language
+        # Full text of the result when it differs from the joined segment texts
+        # (transcribe decodes it from all tokens at once)
+        self.result_text = None
+        for name, typecode in COLUMNS.items():
+            setattr(self, name, array(typecode, [0] if name in OFFSET_COLUMNS else []))
+        self._text_lower = None
+        self._mmap = None
+
+    @classmethod
+    def from_segments(cls, segments, language=None):
+        store = cls(language)
+        for segment in segments:
+            store.append(
+                segment["start"], segment["end"], segment["text"],
+                tokens=segment.get("tokens", ()),
+                words=segment.get("words", ()),
+                **{field: segment[field] for field in SEGMENT_FLOAT_FIELDS if field in segment}
+            )
+        return store
+
+    @classmethod
+    def from_result(cls, result):
+        """Build from a transcribe result. A result without segments becomes one segment."""
+        segments = result.get("segments") or []
+        if not segments and result.get("text"):
+            segments = [{"start": 0.0, "end": 0.0, "text": result["text"]}]
+        store = cls.from_segments(segments, result.get("language"))
+        if result.get("text") is not None and result["text"] != store.full_text():
+            store.result_text = result["text"]
+        return store
+
+    def append(self, start, end, text, tokens=(), words=(), **fields):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.text.frombytes(text.encode("utf-8"))
+        self.text_offsets.append(len(self.text))
+        self.tokens.extend(tokens)
+        self.token_offsets.append(len(self.tokens))
+        for field in SEGMENT_FLOAT_FIELDS:
+            getattr(self, field).append(fields.get(field, float("nan")))
+
+        for word in words:
+            self.word_starts.append(word["start"])
+            self.word_ends.append(word["end"])
+            self.word_probs.append(word.get("probability", float("nan")))
+            self.word_text.frombytes(word["word"].encode("utf-8"))
+            self.word_text_offsets.append(len(self.word_text))
+        self.word_offsets.append(len(self.word_starts))
+        self._text_lower = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    def start(self, i):
+        return self.starts[i]
+
+    def end(self, i):
+        return self.ends[i]
+
+    def raw_text(self, i):
+        """Segment text as produced by the model (usually with a leading space)."""
+        return bytes(self.text[self.text_offsets[i]:self.text_offsets[i + 1]]).decode("utf-8")
+
+    def text_at(self, i):
+        return self.raw_text(i).strip()
+
+    def full_text(self):
+        if self.result_text is not None:
+            return self.result_text
+        return bytes(self.text).decode("utf-8")
+
+    def segment_tokens(self, i):
+        return self.tokens[self.token_offsets[i]:self.token_offsets[i + 1]].tolist()
+
+    def words(self, i):
+        """Word timings of segment i as dicts (only built on request)."""
+        words = []
+        for w in range(self.word_offsets[i], self.word_offsets[i + 1]):
+            text = bytes(self.word_text[self.word_text_offsets[w]:self.word_text_offsets[w + 1]]).decode("utf-8")
+            words.append({
+                "word": text,
+                "start": round(self.word_starts[w], 3),
+                "end": round(self.word_ends[w], 3),
+                "probability": round(self.word_probs[w], 4),
+            })
+        return words
+
+    def segment(self, i):
+        """Segment i as a transcribe-style dict (float32 values rounded for output)."""
+        segment = {
+            "id": i,
+            "start": round(self.starts[i], 3),
+            "end": round(self.ends[i], 3),
+            "text": self.raw_text(i),
+            "tokens": self.segment_tokens(i),
+        }
+        for field in SEGMENT_FLOAT_FIELDS:
+            value = getattr(self, field)[i]
+            if value == value:  # not NaN
+                segment[field] = round(value, 4)
+        if self.word_offsets[i + 1] > self.word_offsets[i]:
+            segment["words"] = self.words(i)
+        return segment
+
+    def index_at(self, seconds):
+        """Index of the segment playing at `seconds` (the last one starting at or before it)."""
+        if not len(self):
+            return 0
+        return max(bisect_right(self.starts, seconds) - 1, 0)
+
+    def find(self, query, start_index=0):
+        """
+        Index of the first segment at or after `start_index` containing `query`
+        (ASCII case-insensitive), wrapping around. Returns None if there is no match.
+        """
+        needle = query.strip().encode("utf-8").lower()
+        if not needle or not len(self):
+            return None
+        if self._text_lower is None:
+            self._text_lower = bytes(self.text).lower()
+
+        for begin in (self.text_offsets[start_index % len(self)], 0):
+            pos = self._text_lower.find(needle, begin)
+            while pos != -1:
+                index = bisect_right(self.text_offsets, pos) - 1
+                # Skip matches spanning two segments
+                if pos + len(needle) <= self.text_offsets[index + 1]:
+                    return index
+                pos = self._text_lower.find(needle, pos + 1)
+        return None
+
+    def save(self, path):
+        """
+        Write the store as: magic, header length, JSON header, then each column
+        as raw native arrays aligned to 8 bytes. Written atomically.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        sections = []
+        offset = 0
+        for name, typecode in COLUMNS.items():
+            column = getattr(self, name)
+            sections.append([name, typecode, offset, len(column)])
+            offset += _aligned(len(column) * column.itemsize)
+
+        header = json.dumps({
+            "language": self.language,
+            "result_text": self.result_text,
+            "byteorder": sys.byteorder,
+            "sections": sections,
+        }).encode("utf-8")
+        header += b" " * (_aligned(len(header)) - len(header))
+        data_start = len(MAGIC) + 8 + len(header)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for name, typecode, section_offset, _ in sections:
+                f.seek(data_start + section_offset)
+                f.write(getattr(self, name))
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved store. Columns become read-only memoryviews into the file."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapped[:len(MAGIC)] != MAGIC:
+            mapped.close()
+            raise ValueError(f"Not a segment store file: {path}")
+        (header_len,) = struct.unpack_from("<Q", mapped, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(bytes(mapped[header_start:header_start + header_len]))
+        if header["byteorder"] != sys.byteorder:
+            mapped.close()
+            raise ValueError(f"Segment store was written on a {header['byteorder']}-endian machine")
+
+        store = cls(header.get("language"))
+        store.result_text = header.get("result_text")
+        store._mmap = mapped
+        view = memoryview(mapped)
+        data_start = header_start + header_len
+        for name, typecode, offset, count in header["sections"]:
+            start = data_start + offset
+            length = count * array(typecode).itemsize
+            setattr(store, name, view[start:start + length].cast(typecode))
+        return store
+
+    def close(self):
+        """Release a memory-mapped file (the store must not be used afterwards)."""
+        if self._mmap is not None:
+            for name in COLUMNS:
+                column = getattr(self, name)
+                if isinstance(column, memoryview):
+                    column.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def _aligned(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,41 @@
+import os
+import sys
+import json
+
+import pytest
+
+# The app is a set of top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A one-layer model with the real context sizes and multilingual vocabulary
+TINY_DIMS = {
+    "n_mels": 80, "n_audio_ctx": 1500, "n_audio_state": 64, "n_audio_head": 2, "n_audio_layer": 1,
+    "n_vocab": 51865, "n_text_ctx": 448, "n_text_state": 64, "n_text_head": 2, "n_text_layer": 1,
+}
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """Local model folder with a tiny, randomly initialised Whisper model."""
+    mx = pytest.importorskip("mlx.core")
+    pytest.importorskip("mlx_whisper")
+    from mlx.utils import tree_flatten
+    from mlx_whisper import whisper
+
+    # float16 weights, like the mlx-community checkpoints
+    model = whisper.Whisper(whisper.ModelDimensions(**TINY_DIMS))
+    model.set_dtype(mx.float16)
+    mx.save_safetensors(str(tmp_path / "weights.safetensors"), dict(tree_flatten(model.parameters())))
+    with open(tmp_path / "config.json", "w") as f:
+        json.dump(dict(TINY_DIMS, model_type="whisper"), f)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def holder():
+    """mlx_whisper's ModelHolder, reset after the test."""
+    pytest.importorskip("mlx_whisper")
+    from mlx_whisper.transcribe import ModelHolder
+
+    yield ModelHolder
+    ModelHolder.model = ModelHolder.model_path = None
@@ -0,0 +1,42 @@
+"""
+bf16 models must run through mlx_whisper.transcribe, which feeds the encoder
+float16 mel frames and rejects audio features of any other dtype.
+"""
+import pytest
+
+mx = pytest.importorskip("mlx.core")
+np = pytest.importorskip("numpy")
+pytest.importorskip("mlx_whisper")
+
+import model_loader  # noqa: E402
+from conftest import TINY_DIMS  # noqa: E402
+
+
+@pytest.mark.parametrize("precision", model_loader.PRECISIONS)
+def test_transcribe(model_path, holder, precision):
+    import mlx_whisper
+
+    model = model_loader.load_model(model_path, precision)
+    if precision == "bf16":
+        assert model.encoder.conv1.weight.dtype == mx.bfloat16
+    holder.model, holder.model_path = model, model_path
+
+    result = mlx_whisper.transcribe(
+        np.zeros(16000, dtype=np.float32),
+        path_or_hf_repo=model_path,
+        verbose=None,
+        temperature=0.0,
+        word_timestamps=True,
+    )
+    assert "text" in result and "segments" in result
+
+
+def test_bf16_boundary_dtypes(model_path):
+    model = model_loader.load_model(model_path, "bf16")
+    mel = mx.zeros((1, 3000, TINY_DIMS["n_mels"]), dtype=mx.float16)
+    features = model.encoder(mel)
+    assert features.dtype == mx.float16
+    logits, kv_cache, cross_qk = model.decoder(mx.array([[50258, 50259]]), features)
+    assert logits.dtype == mx.float16
+    assert all(qk.dtype == mx.float16 for qk in cross_qk)
+    assert kv_cache[0][0][0].dtype == mx.bfloat16
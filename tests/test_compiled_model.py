@@ -0,0 +1,42 @@
+"""
+mlx_whisper.transcribe decodes through model.decode / model.detect_language;
+with a CompiledWhisper installed those must reach the compiled graphs.
+"""
+import pytest
+
+mx = pytest.importorskip("mlx.core")
+np = pytest.importorskip("numpy")
+pytest.importorskip("mlx_whisper")
+
+import compiled_model  # noqa: E402
+import model_loader  # noqa: E402
+
+
+def transcribe(model_path, **options):
+    import mlx_whisper
+    return mlx_whisper.transcribe(
+        np.zeros(16000, dtype=np.float32), path_or_hf_repo=model_path, verbose=None, temperature=0.0, **options
+    )
+
+
+def test_transcribe_runs_compiled_graphs(model_path, holder):
+    model = compiled_model.CompiledWhisper(model_loader.load_model(model_path))
+    holder.model, holder.model_path = model, model_path
+
+    # Language detection, decoding and word alignment all go through the wrapper
+    result = transcribe(model_path, word_timestamps=True)
+    assert "text" in result
+    assert not model.failed
+    kinds = {kind for kind, _ in model.stats}
+    assert kinds == {"encoder", "decoder prompt"}
+    assert "encoder" in model.report() and "decoder prompt" in model.report()
+
+
+def test_compiled_matches_eager(model_path, holder):
+    eager = model_loader.load_model(model_path)
+    holder.model, holder.model_path = eager, model_path
+    expected = transcribe(model_path, language="en")
+
+    holder.model = compiled_model.CompiledWhisper(eager)
+    assert transcribe(model_path, language="en")["text"] == expected["text"]
+    assert holder.model.stats
@@ -0,0 +1,157 @@
+import os
+import json
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import downloader
+
+REPO = "mlx-community/whisper-test"
+COMMIT = "0123456789abcdef0123456789abcdef01234567"
+CHUNK = 1024
+
+
+class FakeHub(BaseHTTPRequestHandler):
+    """Hub API and file resolver for one repo; files are served from `hub.files`."""
+
+    hub = None
+
+    def do_GET(self):
+        hub = self.hub
+        path = self.path.split("?")[0]
+        with hub["lock"]:
+            hub["requests"].append((path, self.headers.get("Range"), self.headers.get("Authorization")))
+
+        if path == f"/api/models/{REPO}/revision/main":
+            siblings = []
+            for name, data in hub["published"].items():
+                if name.endswith(".safetensors"):
+                    siblings.append({"rfilename": name, "lfs": {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}})
+                else:
+                    blob_id = hashlib.sha1(f"blob {len(data)}\0".encode() + data).hexdigest()
+                    siblings.append({"rfilename": name, "size": len(data), "blobId": blob_id})
+            return self.reply(200, json.dumps({"sha": COMMIT, "siblings": siblings}).encode(), "application/json")
+
+        prefix = f"/{REPO}/resolve/{COMMIT}/"
+        if path.startswith(prefix):
+            # Like the Hub, large files live on another host
+            self.send_response(302)
+            self.send_header("Location", f"http://localhost:{self.server.server_address[1]}/storage/{path[len(prefix):]}")
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+
+        if path.startswith("/storage/"):
+            data = hub["files"][path[len("/storage/"):]]
+            byte_range = self.headers.get("Range")
+            if not byte_range:
+                return self.reply(200, data)
+            start, end = (int(x) for x in byte_range[len("bytes="):].split("-"))
+            if start in hub["fail_at"]:
+                return self.reply(500, b"")
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            return self.reply(None, data[start:end + 1])
+
+        self.reply(404, b"")
+
+    def reply(self, status, body, content_type="application/octet-stream"):
+        if status is not None:
+            self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    for name in ("http_proxy", "HTTP_PROXY", "https_proxy", "HTTPS_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HF_TOKEN", "secret")
+    monkeypatch.setattr(downloader, "CHUNK_SIZE", CHUNK)
+    monkeypatch.setattr(downloader, "CHUNK_ATTEMPTS", 1)
+
+    files = {"weights.safetensors": os.urandom(5 * CHUNK + 100), "config.json": b'{"n_mels": 80}'}
+    state = {"files": files, "published": dict(files), "fail_at": set(), "requests": [], "lock": threading.Lock()}
+    handler = type("Handler", (FakeHub,), {"hub": state})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    state["endpoint"] = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def download(hub, cache_dir):
+    return downloader.download_snapshot(REPO, cache_dir=str(cache_dir), endpoint=hub["endpoint"], max_workers=2)
+
+
+def storage_ranges(hub):
+    return sorted(r for path, r, _ in hub["requests"] if path == "/storage/weights.safetensors" and r != "bytes=0-0")
+
+
+def test_download_into_cache_layout(hub, tmp_path):
+    snapshot = download(hub, tmp_path)
+
+    assert snapshot == os.path.join(downloader.repo_cache_dir(REPO, str(tmp_path)), "snapshots", COMMIT)
+    for name, data in hub["files"].items():
+        path = os.path.join(snapshot, name)
+        assert os.path.islink(path)
+        with open(path, "rb") as f:
+            assert f.read() == data
+    with open(os.path.join(downloader.repo_cache_dir(REPO, str(tmp_path)), "refs", "main")) as f:
+        assert f.read() == COMMIT
+
+    # The token goes to the Hub but not to the storage host it redirects to
+    assert all(auth == "Bearer secret" for path, _, auth in hub["requests"] if not path.startswith("/storage/"))
+    assert all(auth is None for path, _, auth in hub["requests"] if path.startswith("/storage/"))
+
+    # Everything is cached: the second call only asks for the file list
+    hub["requests"].clear()
+    assert download(hub, tmp_path) == snapshot
+    assert [path for path, _, _ in hub["requests"]] == [f"/api/models/{REPO}/revision/main"]
+
+
+def test_interrupted_download_resumes(hub, tmp_path):
+    last = 5 * CHUNK
+    hub["fail_at"].add(last)
+    with pytest.raises(downloader.DownloadError):
+        download(hub, tmp_path)
+
+    blob = os.path.join(downloader.repo_cache_dir(REPO, str(tmp_path)), "blobs", hashlib.sha256(hub["files"]["weights.safetensors"]).hexdigest())
+    assert not os.path.exists(blob)
+    with open(blob + ".part.json") as f:
+        assert json.load(f)["done"] == [0, 1, 2, 3, 4]
+
+    hub["fail_at"].clear()
+    hub["requests"].clear()
+    snapshot = download(hub, tmp_path)
+    # Only the missing chunk is fetched again
+    assert storage_ranges(hub) == [f"bytes={last}-{last + 99}"]
+    assert not os.path.exists(blob + ".part") and not os.path.exists(blob + ".part.json")
+    with open(os.path.join(snapshot, "weights.safetensors"), "rb") as f:
+        assert f.read() == hub["files"]["weights.safetensors"]
+
+
+def test_hash_mismatch_is_rejected(hub, tmp_path):
+    good = hub["files"]["weights.safetensors"]
+    hub["files"]["weights.safetensors"] = bytes(len(good))
+    with pytest.raises(downloader.DownloadError, match="size/hash check"):
+        download(hub, tmp_path)
+
+    blobs = os.path.join(downloader.repo_cache_dir(REPO, str(tmp_path)), "blobs")
+    blob = os.path.join(blobs, hashlib.sha256(good).hexdigest())
+    # Bad data is neither kept for resuming nor moved into the cache
+    assert not os.path.exists(blob) and not os.path.exists(blob + ".part")
+    assert not os.path.exists(os.path.join(downloader.repo_cache_dir(REPO, str(tmp_path)), "refs", "main"))
+
+    hub["files"]["weights.safetensors"] = good
+    snapshot = download(hub, tmp_path)
+    with open(os.path.join(snapshot, "weights.safetensors"), "rb") as f:
+        assert f.read() == good
@@ -0,0 +1,35 @@
+import batch_policy
+from job_store import JobStore, QUEUED
+
+
+def test_stop_and_resume_keeps_retry_budget(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.add_jobs(["/media/a.wav"])[0]
+
+    # Started, stopped by the user, resumed after a restart
+    store.mark_running(job["id"], "model")
+    store.mark_queued(job["id"])
+    store.mark_running(job["id"], "model")
+    store.requeue_interrupted()
+    store.mark_running(job["id"], "model")
+    assert store.get(job["id"])["attempts"] == 0
+
+    store.mark_failed(job["id"], "boom")
+    attempts = store.get(job["id"])["attempts"]
+    assert attempts == 1
+    assert batch_policy.should_retry(batch_policy.RETRY, attempts, max_retries=1)
+    assert batch_policy.backoff_delay(attempts) == batch_policy.BACKOFF_BASE
+
+    store.mark_running(job["id"], "model")
+    store.mark_failed(job["id"], "boom")
+    assert not batch_policy.should_retry(batch_policy.RETRY, store.get(job["id"])["attempts"], max_retries=1)
+    store.close()
+
+
+def test_requeue_interrupted(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.add_jobs(["/media/a.wav"])[0]
+    store.mark_running(job["id"])
+    assert store.requeue_interrupted() == 1
+    assert store.get(job["id"])["state"] == QUEUED
+    store.close()
@@ -0,0 +1,65 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import network_probe
+
+# path -> (status, content type, body, extra headers)
+RESPONSES = {
+    "/ok": (200, "application/json", b'{"id": "mlx-community/whisper-tiny"}', {}),
+    "/umbrella": (200, "text/html", b"<html>Cisco Umbrella: Access Restricted Warning</html>", {}),
+    "/proxy-auth": (407, "text/plain", b"Proxy Authentication Required", {}),
+    "/forbidden": (403, "text/plain", b"Forbidden", {}),
+    "/hub-unauthorized": (401, "application/json", b'{"error": "Invalid credentials"}', {}),
+    "/hub-not-found": (404, "text/plain", b"Repository not found", {"X-Error-Code": "RepoNotFound"}),
+    "/unavailable": (503, "text/plain", b"Service Unavailable", {}),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, content_type, body, headers = RESPONSES[self.path]
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_proxy(monkeypatch):
+    for name in ("http_proxy", "HTTP_PROXY", "https_proxy", "HTTPS_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/ok", network_probe.ONLINE),
+    ("/umbrella", network_probe.BLOCKED),
+    ("/proxy-auth", network_probe.BLOCKED),
+    ("/forbidden", network_probe.BLOCKED),
+    ("/hub-unauthorized", network_probe.ONLINE),
+    ("/hub-not-found", network_probe.ONLINE),
+    ("/unavailable", network_probe.OFFLINE),
+])
+def test_probe_verdict(server, path, expected):
+    assert network_probe.probe(server + path)["verdict"] == expected
+
+
+def test_unreachable_is_offline():
+    assert network_probe.probe("http://127.0.0.1:9/")["verdict"] == network_probe.OFFLINE
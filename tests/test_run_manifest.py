@@ -0,0 +1,19 @@
+import json
+
+from run_manifest import RunManifest
+
+
+def test_runs_started_together_get_separate_files(tmp_path):
+    manifests = [RunManifest(str(tmp_path)) for _ in range(5)]
+    assert len({m.run_id for m in manifests}) == 5
+    assert len({m.path for m in manifests}) == 5
+
+
+def test_write_appends_row(tmp_path):
+    manifest = RunManifest(str(tmp_path))
+    manifest.write("/media/a.wav", "model", "done", {"inference": 2.0, "media_duration": 4.0}, attempts=1)
+    with open(manifest.path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 1
+    assert rows[0]["run_id"] == manifest.run_id
+    assert rows[0]["rtf"] == 0.5
@@ -0,0 +1,39 @@
+import os
+import time
+
+import segment_store
+
+
+def write(directory, name, size, age):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_prune_cache_by_age(tmp_path):
+    old = write(tmp_path, "old.seg", 10, 40 * 24 * 3600)
+    recent = write(tmp_path, "recent.seg", 10, 60)
+    stale_tmp = write(tmp_path, "stale.seg.tmp", 10, 2 * 3600)
+    fresh_tmp = write(tmp_path, "fresh.seg.tmp", 10, 60)
+
+    removed = segment_store.prune_cache(str(tmp_path), max_age=30 * 24 * 3600, max_bytes=1 << 20)
+
+    assert removed == 2
+    assert not os.path.exists(old) and not os.path.exists(stale_tmp)
+    assert os.path.exists(recent) and os.path.exists(fresh_tmp)
+
+
+def test_prune_cache_by_size_removes_oldest_first(tmp_path):
+    paths = [write(tmp_path, f"{i}.seg", 100, 3600 * (3 - i)) for i in range(3)]
+
+    removed = segment_store.prune_cache(str(tmp_path), max_age=30 * 24 * 3600, max_bytes=150)
+
+    assert removed == 2
+    assert [os.path.exists(p) for p in paths] == [False, False, True]
+
+
+def test_prune_cache_without_directory(tmp_path):
+    assert segment_store.prune_cache(str(tmp_path / "missing")) == 0
@@ -0,0 +1,37 @@
+import pytest
+
+import model_loader
+import transcribe
+
+
+@pytest.mark.parametrize("precision", model_loader.PRECISIONS)
+def test_model_resolved_locally_for_every_precision(tmp_path, monkeypatch, holder, precision):
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"")
+    resolved = str(tmp_path / "snapshot")
+    calls = {}
+
+    monkeypatch.setattr(transcribe.model_resolver, "resolve_model", lambda model: calls.setdefault("resolve", model) and resolved)
+    monkeypatch.setattr(transcribe.model_loader, "load_model", lambda path, precision: calls.setdefault("load", path))
+    monkeypatch.setattr(
+        transcribe.mlx_whisper, "transcribe",
+        lambda path, path_or_hf_repo: calls.setdefault("transcribe", path_or_hf_repo) and {"text": "", "segments": []}
+    )
+
+    transcribe.transcribe_audio(str(audio), ["txt"], "org/model", precision)
+
+    assert calls["resolve"] == "org/model"
+    assert calls["transcribe"] == resolved
+    assert ("load" in calls) == (precision != model_loader.DEFAULT_PRECISION)
+
+
+def test_unavailable_model_is_reported(tmp_path, monkeypatch, capsys):
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"")
+
+    def unavailable(model):
+        raise transcribe.model_resolver.ModelUnavailableError("Hugging Face is offline")
+
+    monkeypatch.setattr(transcribe.model_resolver, "resolve_model", unavailable)
+    transcribe.transcribe_audio(str(audio), ["txt"], "org/model")
+    assert "Hugging Face is offline" in capsys.readouterr().out
@@ -0,0 +1,61 @@
+import os
+import json
+import stat
+
+import writers
+from segment_store import SegmentStore
+
+RESULT = {
+    "text": " Hello there. General Kenobi.",
+    "language": "en",
+    "segments": [
+        {"start": 0.0, "end": 1.5, "text": " Hello there.", "tokens": [1, 2]},
+        {"start": 1.5, "end": 3.25, "text": " General Kenobi.", "tokens": [3, 4]},
+    ],
+}
+
+
+def test_txt_is_result_text(tmp_path):
+    # transcribe decodes the full text from all tokens at once; it can differ from the joined segments
+    result = dict(RESULT, text=" Hello there.  General Kenobi!")
+    store = SegmentStore.from_result(result)
+    outputs = writers.write_outputs(store, str(tmp_path / "clip"), ["txt", "json"])
+
+    with open(outputs["txt"], encoding="utf-8") as f:
+        assert f.read() == result["text"]
+    with open(outputs["json"], encoding="utf-8") as f:
+        assert json.load(f)["text"] == result["text"]
+
+    # The text survives the segment cache
+    store.save(str(tmp_path / "clip.seg"))
+    loaded = SegmentStore.load(str(tmp_path / "clip.seg"))
+    try:
+        assert loaded.full_text() == result["text"]
+    finally:
+        loaded.close()
+
+
+def test_txt_same_as_segments(tmp_path):
+    store = SegmentStore.from_result(RESULT)
+    assert store.result_text is None
+    outputs = writers.write_outputs(store, str(tmp_path / "clip"), ["txt"])
+    with open(outputs["txt"], encoding="utf-8") as f:
+        assert f.read() == RESULT["text"]
+
+
+def test_outputs_follow_umask(tmp_path):
+    old = os.umask(0o027)
+    try:
+        outputs = writers.write_outputs(SegmentStore.from_result(RESULT), str(tmp_path / "clip"), writers.FORMATS)
+    finally:
+        os.umask(old)
+    for path in outputs.values():
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    # No temporary files are left behind
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in outputs.values())
+
+
+def test_srt(tmp_path):
+    outputs = writers.write_outputs(SegmentStore.from_result(RESULT), str(tmp_path / "clip"), ["srt"])
+    with open(outputs["srt"], encoding="utf-8") as f:
+        assert f.read().startswith("1\n00:00:00,000 --> 00:00:01,500\nHello there.\n")
@@ -1,39 +1,68 @@
 import argparse
 import os
 import mlx_whisper
+import writers
+import downloader
+import model_loader
+import model_resolver
+from segment_store import SegmentStore
 
-def transcribe_audio(audio_path):
+DEFAULT_MODEL = "mlx-community/whisper-large-v3"
+
+def transcribe_audio(audio_path, formats=writers.DEFAULT_FORMATS, model=DEFAULT_MODEL, precision=model_loader.DEFAULT_PRECISION):
     if not os.path.exists(audio_path):
         print(f"Error: File '{audio_path}' not found.")
         return
 
-    print(f"Transcribing '{audio_path}' using mlx-whisper (large-v3)...")
-    
-    # Transcribe using mlx-community/whisper-large-v3
+    print(f"Transcribing '{audio_path}' using mlx-whisper ({model}, {precision} precision)...")
+
+    # Use the local cache (or the app's own downloader) rather than mlx_whisper's Hub lookup
+    try:
+        model_path = model_resolver.resolve_model(model)
+    except (model_resolver.ModelUnavailableError, downloader.DownloadError) as e:
+        print(f"Error: {e}")
+        return
+
+    if precision != model_loader.DEFAULT_PRECISION:
+        from mlx_whisper.transcribe import ModelHolder
+        # Load the weights in the requested precision and let transcribe use that instance
+        ModelHolder.model = model_loader.load_model(model_path, precision)
+        ModelHolder.model_path = model_path
+
     # mlx-whisper automatically uses Apple Silicon GPU
     result = mlx_whisper.transcribe(
         audio_path,
-        path_or_hf_repo="mlx-community/whisper-large-v3"
+        path_or_hf_repo=model_path
     )
     
-    text = result["text"]
-    
-    # Generate output filename (same name as input, but with .txt extension)
+    # Generate output filenames (same name as input, with one extension per format)
     base_name = os.path.splitext(audio_path)[0]
-    output_path = f"{base_name}.txt"
-    
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(text)
+    outputs = writers.write_outputs(SegmentStore.from_result(result), base_name, formats)
         
-    print(f"Transcription saved to '{output_path}'")
+    for output_path in outputs.values():
+        print(f"Transcription saved to '{output_path}'")
 
 def main():
     parser = argparse.ArgumentParser(description="Transcribe audio using mlx-whisper (v3) on Apple Silicon.")
     parser.add_argument("audio_file", help="Path to the audio file to transcribe.")
+    parser.add_argument(
+        "-f", "--output-format",
+        nargs="+",
+        choices=writers.FORMATS,
+        default=writers.DEFAULT_FORMATS,
+        help="Output formats to write next to the audio file (default: txt)."
+    )
+    parser.add_argument("-m", "--model", default=DEFAULT_MODEL, help=f"Hugging Face repo id or local model folder (default: {DEFAULT_MODEL}).")
+    parser.add_argument(
+        "-p", "--precision",
+        choices=model_loader.PRECISIONS,
+        default=model_loader.DEFAULT_PRECISION,
+        help="Convert the weights to this precision while loading (default: as stored in the checkpoint)."
+    )
     
     args = parser.parse_args()
     
-    transcribe_audio(args.audio_file)
+    transcribe_audio(args.audio_file, args.output_format, args.model, args.precision)
 
 if __name__ == "__main__":
     main()
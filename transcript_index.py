@@ -0,0 +1,205 @@
+"""
+Full-text search index over all produced transcripts.
+Segments are stored in an SQLite FTS5 table together with the source file and
+their start/end time in milliseconds. The GUI adds each transcript as its job
+completes; this module can also be run from the command line:
+
+    python transcript_index.py search "quarterly budget"
+    python transcript_index.py add ~/Recordings
+"""
+import os
+import sys
+import time
+import json
+import sqlite3
+import argparse
+import threading
+
+from segment_store import SegmentStore
+
+INDEX_DB_FILE = os.path.expanduser("~/.mlx_whisper_index.db")
+
+MEDIA_EXTENSIONS = [".mp3", ".wav", ".m4a", ".mp4", ".flac", ".mov"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_path TEXT NOT NULL UNIQUE,
+    model       TEXT,
+    language    TEXT,
+    indexed_at  REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text,
+    transcript_id UNINDEXED,
+    start_ms UNINDEXED,
+    end_ms UNINDEXED,
+    tokenize = 'unicode61'
+);
+"""
+
+
+def quote_query(text):
+    """Turn free text into an FTS5 query matching all words (no FTS syntax errors on user input)."""
+    words = text.split()
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def format_ms(ms):
+    seconds, ms = divmod(int(ms), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+class TranscriptIndex:
+    """SQLite FTS5 index of transcript segments."""
+
+    def __init__(self, path=INDEX_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add_transcript(self, source_path, store, model=None):
+        """Index (or re-index) one transcript given as a SegmentStore."""
+        source_path = os.path.abspath(source_path)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM transcripts WHERE source_path = ?", (source_path,)
+                ).fetchone()
+                if row:
+                    transcript_id = row["id"]
+                    self._conn.execute("DELETE FROM segments WHERE transcript_id = ?", (transcript_id,))
+                    self._conn.execute(
+                        "UPDATE transcripts SET model = ?, language = ?, indexed_at = ? WHERE id = ?",
+                        (model, store.language, time.time(), transcript_id),
+                    )
+                else:
+                    transcript_id = self._conn.execute(
+                        "INSERT INTO transcripts (source_path, model, language, indexed_at) VALUES (?, ?, ?, ?)",
+                        (source_path, model, store.language, time.time()),
+                    ).lastrowid
+
+                self._conn.executemany(
+                    "INSERT INTO segments (text, transcript_id, start_ms, end_ms) VALUES (?, ?, ?, ?)",
+                    (
+                        (store.text_at(i), transcript_id, round(store.start(i) * 1000), round(store.end(i) * 1000))
+                        for i in range(len(store))
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(store)
+
+    def remove_transcript(self, source_path):
+        source_path = os.path.abspath(source_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM transcripts WHERE source_path = ?", (source_path,)
+            ).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM segments WHERE transcript_id = ?", (row["id"],))
+                self._conn.execute("DELETE FROM transcripts WHERE id = ?", (row["id"],))
+
+    def search(self, text, limit=100):
+        """Return matching segments (best match first) as dicts with source_path, start_ms, end_ms, text."""
+        query = quote_query(text)
+        if not query:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.source_path, s.start_ms, s.end_ms, s.text "
+                "FROM segments s JOIN transcripts t ON t.id = s.transcript_id "
+                "WHERE segments MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def load_transcript_file(path):
+    """Read a transcript written by the writers module (JSON/TSV with timestamps, or plain TXT) into a SegmentStore."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext == ".json":
+            result = json.load(f)
+            if not isinstance(result, dict) or "segments" not in result:
+                raise ValueError("not a transcript JSON file")
+            return SegmentStore.from_result(result)
+        if ext == ".tsv":
+            segments = []
+            next(f, None)  # header
+            for line in f:
+                start, end, text = line.rstrip("\n").split("\t", 2)
+                segments.append({"start": int(start) / 1000, "end": int(end) / 1000, "text": text})
+            return SegmentStore.from_segments(segments)
+        return SegmentStore.from_result({"text": f.read()})
+
+
+def find_transcripts(root):
+    """
+    Yield (source_path, transcript_path) for transcripts under root, preferring
+    the format with the most timing detail when several exist for one source.
+    """
+    preference = [".json", ".tsv", ".txt"]
+    for dirpath, _, files in os.walk(root):
+        by_base = {}
+        media = {}
+        for name in files:
+            base, ext = os.path.splitext(name)
+            if ext.lower() in preference:
+                by_base.setdefault(base, []).append(ext)
+            elif ext.lower() in MEDIA_EXTENSIONS:
+                media[base] = name
+        for base, exts in by_base.items():
+            best = min(exts, key=lambda ext: preference.index(ext.lower()))
+            # Key by the media file next to the transcript, as the GUI does
+            source = media.get(base, base)
+            yield os.path.join(dirpath, source), os.path.join(dirpath, base + best)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search or update the transcript index.")
+    parser.add_argument("--db", default=INDEX_DB_FILE, help="Index database path.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = subparsers.add_parser("search", help="Search indexed transcripts.")
+    search_parser.add_argument("query", nargs="+", help="Words to search for.")
+    search_parser.add_argument("-n", "--limit", type=int, default=50)
+    search_parser.add_argument("--json", action="store_true", help="Print results as JSON lines.")
+
+    add_parser = subparsers.add_parser("add", help="Index existing transcripts (.json, .tsv, .txt) under folders.")
+    add_parser.add_argument("paths", nargs="+")
+
+    args = parser.parse_args()
+    index = TranscriptIndex(args.db)
+
+    if args.command == "search":
+        for hit in index.search(" ".join(args.query), args.limit):
+            if args.json:
+                print(json.dumps(hit, ensure_ascii=False))
+            else:
+                print(f"{hit['source_path']}\t{hit['start_ms']}\t{hit['end_ms']}\t[{format_ms(hit['start_ms'])}] {hit['text']}")
+    elif args.command == "add":
+        for root in args.paths:
+            for source_path, transcript_path in find_transcripts(root):
+                try:
+                    count = index.add_transcript(source_path, load_transcript_file(transcript_path))
+                    print(f"Indexed {count} segment(s) from {transcript_path}")
+                except Exception as e:
+                    print(f"Skipped {transcript_path}: {e}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Output writers for transcription results.
+Produces any selection of TXT, SRT, VTT, TSV and JSON from one SegmentStore
+in a single pass over the segments. Writers read the store's columns
+directly, so subtitles never need per-segment dicts.
+Every file is written to a temporary file first and renamed into place, so a
+crash never leaves a half-written transcript behind.
+"""
+import os
+import json
+
+FORMATS = ["txt", "srt", "vtt", "tsv", "json"]
+DEFAULT_FORMATS = ["txt"]
+
+
+def _create_temp(directory, suffix):
+    """
+    Create a hidden temporary file in `directory`. Unlike mkstemp (0600) it is
+    created with mode 0666, so the process umask gives it the usual permissions.
+    """
+    while True:
+        path = os.path.join(directory, f".{os.urandom(6).hex()}{suffix}")
+        try:
+            return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), path
+        except FileExistsError:
+            continue
+
+
+def format_timestamp(seconds, decimal_marker=".", always_include_hours=False):
+    milliseconds = round(seconds * 1000.0)
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1_000)
+    hours_marker = f"{hours:02d}:" if always_include_hours or hours > 0 else ""
+    return f"{hours_marker}{minutes:02d}:{seconds:02d}{decimal_marker}{milliseconds:03d}"
+
+
+class _TxtWriter:
+    """Plain transcript text, as returned by transcribe."""
+
+    def begin(self, f, store):
+        pass
+
+    def segment(self, f, store, i):
+        pass
+
+    def end(self, f, store):
+        f.write(store.full_text())
+
+
+class _SrtWriter:
+    def begin(self, f, store):
+        pass
+
+    def segment(self, f, store, i):
+        start = format_timestamp(store.start(i), ",", always_include_hours=True)
+        end = format_timestamp(store.end(i), ",", always_include_hours=True)
+        f.write(f"{i + 1}\n{start} --> {end}\n{store.text_at(i)}\n\n")
+
+    def end(self, f, store):
+        pass
+
+
+class _VttWriter:
+    def begin(self, f, store):
+        f.write("WEBVTT\n\n")
+
+    def segment(self, f, store, i):
+        start = format_timestamp(store.start(i))
+        end = format_timestamp(store.end(i))
+        f.write(f"{start} --> {end}\n{store.text_at(i)}\n\n")
+
+    def end(self, f, store):
+        pass
+
+
+class _TsvWriter:
+    """Tab separated start/end in integer milliseconds, like openai-whisper."""
+
+    def begin(self, f, store):
+        f.write("start\tend\ttext\n")
+
+    def segment(self, f, store, i):
+        text = store.text_at(i).replace("\t", " ")
+        f.write(f"{round(1000 * store.start(i))}\t{round(1000 * store.end(i))}\t{text}\n")
+
+    def end(self, f, store):
+        pass
+
+
+class _JsonWriter:
+    """Streams the segments array instead of building one large string with json.dumps."""
+
+    def begin(self, f, store):
+        f.write('{"segments": [')
+
+    def segment(self, f, store, i):
+        if i:
+            f.write(",")
+        f.write("\n")
+        json.dump(store.segment(i), f, ensure_ascii=False)
+
+    def end(self, f, store):
+        f.write("\n], ")
+        f.write(f'"text": {json.dumps(store.full_text(), ensure_ascii=False)}, ')
+        f.write(f'"language": {json.dumps(store.language)}}}\n')
+
+
+WRITERS = {
+    "txt": _TxtWriter,
+    "srt": _SrtWriter,
+    "vtt": _VttWriter,
+    "tsv": _TsvWriter,
+    "json": _JsonWriter,
+}
+
+
+def write_outputs(store, base_path, formats=DEFAULT_FORMATS):
+    """
+    Write the SegmentStore `store` as `<base_path>.<fmt>` for every requested format.
+    Returns a dict of format -> output path. Existing files are replaced atomically.
+    """
+    formats = [fmt for fmt in FORMATS if fmt in formats]
+    directory = os.path.dirname(os.path.abspath(base_path))
+
+    outputs = {}
+    writers = []
+    try:
+        for fmt in formats:
+            fd, tmp_path = _create_temp(directory, f".{fmt}.tmp")
+            f = os.fdopen(fd, "w", encoding="utf-8")
+            writer = WRITERS[fmt]()
+            writers.append((fmt, writer, f, tmp_path))
+            writer.begin(f, store)
+
+        # Single pass over the segments feeds every writer
+        for i in range(len(store)):
+            for _, writer, f, _ in writers:
+                writer.segment(f, store, i)
+
+        for fmt, writer, f, tmp_path in writers:
+            writer.end(f, store)
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+            output_path = f"{base_path}.{fmt}"
+            os.replace(tmp_path, output_path)
+            outputs[fmt] = output_path
+    except BaseException:
+        for _, _, f, tmp_path in writers:
+            f.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    return outputs